@@ -1,11 +1,13 @@
 #!/usr/bin/env python
 import argparse
+import concurrent.futures
 import glob
 import json
 import os
 import re
 import subprocess
 import sys
+import threading
 import time
 import unicodedata
 from sonic_py_common import device_info
@@ -15,6 +17,10 @@ cache = {}
 SONIC_CFGGEN_PATH = '/usr/local/bin/sonic-cfggen'
 HWSKU_KEY = 'DEVICE_METADATA.localhost.hwsku'
 PLATFORM_KEY = 'DEVICE_METADATA.localhost.platform'
+# Devices whose children sit on the i2c buses they create, mapped to their create handler
+PLAN_CONTAINER_TYPES = {'MUX': 'mux', 'CPLDMUX': 'cpldmux', 'FPGAPCIE': 'fpgapci', 'MULTIFPGAPCIE': 'multifpgapci'}
+# Devices created with a single new_device write, without the shared /sys/kernel/pddf staging nodes
+PLAN_PLAIN_I2C_TYPES = ['TEMP_SENSOR', 'DPM', 'DCDC']
 
 dirname = os.path.dirname(os.path.realpath(__file__))
 
@@ -34,16 +40,30 @@ class PddfParse():
 
         self.data_sysfs_obj = {}
         self.sysfs_obj = {}
+        self.dry_run = False
+        self.create_stats = {}
+        self.sysfs_writes = 0
+        self.stats_lock = threading.Lock()
 
 
     ###################################################################################################################
     #   GENERIC DEFS
     ###################################################################################################################
-    def runcmd(self, cmd):
-        rc = os.system(cmd)
-        if rc != 0:
-            print("%s -- command failed" % cmd)
-        return rc
+    def write_sysfs(self, path, val):
+        # Same as "echo 'val' > path" without forking a shell for it
+        if not self.dry_run:
+            try:
+                fd = os.open(path, os.O_WRONLY)
+                try:
+                    os.write(fd, ("%s\n" % val).encode())
+                finally:
+                    os.close(fd)
+            except OSError as e:
+                print("echo '%s' > %s -- command failed: %s" % (val, path, e.strerror))
+                return 1
+        with self.stats_lock:
+            self.sysfs_writes += 1
+        return 0
 
     def get_dev_idx(self, dev, ops):
         parent = dev['dev_info']['virt_parent']
@@ -137,8 +157,7 @@ class PddfParse():
             else:
                 val = attr[key]
 
-            cmd = "echo '%s' > /sys/kernel/%s/%s" % (val, path, key)
-            ret = self.runcmd(cmd)
+            ret = self.write_sysfs("/sys/kernel/%s/%s" % (path, key), val)
             if ret != 0:
                 return ret
         return ret
@@ -151,40 +170,35 @@ class PddfParse():
             ret = self.create_device(dev['i2c']['topo_info'], "pddf/devices/psu/i2c", ops)
             if ret != 0:
                 return create_ret.append(ret)
-            cmd = "echo '%s' > /sys/kernel/pddf/devices/psu/i2c/i2c_name" % (dev['dev_info']['device_name'])
-            ret = self.runcmd(cmd)
+            ret = self.write_sysfs("/sys/kernel/pddf/devices/psu/i2c/i2c_name", dev['dev_info']['device_name'])
             if ret != 0:
                 return create_ret.append(ret)
-            cmd = "echo '%s'  > /sys/kernel/pddf/devices/psu/i2c/psu_idx" % (self.get_dev_idx(dev, ops))
-            ret = self.runcmd(cmd)
+            ret = self.write_sysfs("/sys/kernel/pddf/devices/psu/i2c/psu_idx", self.get_dev_idx(dev, ops))
             if ret != 0:
                 return create_ret.append(ret)
-            cmd = "echo '%s' > /sys/kernel/pddf/devices/psu/i2c/psu_thermals" % (self.get_num_psu_thermals(dev['dev_info']['virt_parent']))
-            ret = self.runcmd(cmd)
+            ret = self.write_sysfs("/sys/kernel/pddf/devices/psu/i2c/psu_thermals",
+                                   self.get_num_psu_thermals(dev['dev_info']['virt_parent']))
             if ret != 0:
                 return create_ret.append(ret)
-            cmd = "echo '%s' > /sys/kernel/pddf/devices/psu/i2c/psu_temp_high_thresh_bitmap" % (self.get_psu_temp_high_thresh_bitmap(dev['dev_info']['device_name'],
-                                                                                                    int(self.get_num_psu_thermals(dev['dev_info']['virt_parent']))))
-            ret = self.runcmd(cmd)
+            ret = self.write_sysfs("/sys/kernel/pddf/devices/psu/i2c/psu_temp_high_thresh_bitmap",
+                                   self.get_psu_temp_high_thresh_bitmap(dev['dev_info']['device_name'],
+                                       int(self.get_num_psu_thermals(dev['dev_info']['virt_parent']))))
             if ret != 0:
                 return create_ret.append(ret)
             for attr in dev['i2c']['attr_list']:
                 ret = self.create_device(attr, "pddf/devices/psu/i2c", ops)
                 if ret != 0:
                     return create_ret.append(ret)
-                cmd = "echo 'add' > /sys/kernel/pddf/devices/psu/i2c/attr_ops"
-                ret = self.runcmd(cmd)
+                ret = self.write_sysfs("/sys/kernel/pddf/devices/psu/i2c/attr_ops", "add")
                 if ret != 0:
                     return create_ret.append(ret)
 
-            cmd = "echo 'add' > /sys/kernel/pddf/devices/psu/i2c/dev_ops"
-            ret = self.runcmd(cmd)
+            ret = self.write_sysfs("/sys/kernel/pddf/devices/psu/i2c/dev_ops", "add")
             if ret != 0:
                 return create_ret.append(ret)
         else:
-            cmd = "echo %s 0x%x > /sys/bus/i2c/devices/i2c-%d/new_device" % (dev['i2c']['topo_info']['dev_type'],
-                    int(dev['i2c']['topo_info']['dev_addr'], 0), int(dev['i2c']['topo_info']['parent_bus'], 0))
-            ret = self.runcmd(cmd)
+            ret = self.write_sysfs("/sys/bus/i2c/devices/i2c-%d/new_device" % (int(dev['i2c']['topo_info']['parent_bus'], 0)),
+                                   "%s 0x%x" % (dev['i2c']['topo_info']['dev_type'], int(dev['i2c']['topo_info']['dev_addr'], 0)))
             if ret != 0:
                 return create_ret.append(ret)
 
@@ -203,8 +217,7 @@ class PddfParse():
             ret = self.create_device(dev['i2c']['topo_info'], "pddf/devices/fan/i2c", ops)
             if ret != 0:
                 return create_ret.append(ret)
-            cmd = "echo '%s' > /sys/kernel/pddf/devices/fan/i2c/i2c_name" % (dev['dev_info']['device_name'])
-            ret = self.runcmd(cmd)
+            ret = self.write_sysfs("/sys/kernel/pddf/devices/fan/i2c/i2c_name", dev['dev_info']['device_name'])
             if ret != 0:
                 return create_ret.append(ret)
             ret = self.create_device(dev['i2c']['dev_attr'], "pddf/devices/fan/i2c", ops)
@@ -214,19 +227,16 @@ class PddfParse():
                 ret = self.create_device(attr, "pddf/devices/fan/i2c", ops)
                 if ret != 0:
                     return create_ret.append(ret)
-                cmd = "echo 'add' > /sys/kernel/pddf/devices/fan/i2c/attr_ops"
-                ret = self.runcmd(cmd)
+                ret = self.write_sysfs("/sys/kernel/pddf/devices/fan/i2c/attr_ops", "add")
                 if ret != 0:
                     return create_ret.append(ret)
 
-            cmd = "echo 'add' > /sys/kernel/pddf/devices/fan/i2c/dev_ops"
-            ret = self.runcmd(cmd)
+            ret = self.write_sysfs("/sys/kernel/pddf/devices/fan/i2c/dev_ops", "add")
             if ret != 0:
                 return create_ret.append(ret)
         else:
-            cmd = "echo %s 0x%x > /sys/bus/i2c/devices/i2c-%d/new_device" % (dev['i2c']['topo_info']['dev_type'],
-                    int(dev['i2c']['topo_info']['dev_addr'], 0), int(dev['i2c']['topo_info']['parent_bus'], 0))
-            ret = self.runcmd(cmd)
+            ret = self.write_sysfs("/sys/bus/i2c/devices/i2c-%d/new_device" % (int(dev['i2c']['topo_info']['parent_bus'], 0)),
+                                   "%s 0x%x" % (dev['i2c']['topo_info']['dev_type'], int(dev['i2c']['topo_info']['dev_addr'], 0)))
             if ret != 0:
                 return create_ret.append(ret)
 
@@ -236,9 +246,8 @@ class PddfParse():
         # Create i2c devices for which a PDDF specific driver is not needed
         create_ret = []
         ret = 0
-        cmd = "echo %s 0x%x > /sys/bus/i2c/devices/i2c-%d/new_device" % (dev['i2c']['topo_info']['dev_type'],
-                int(dev['i2c']['topo_info']['dev_addr'], 0), int(dev['i2c']['topo_info']['parent_bus'], 0))
-        ret = self.runcmd(cmd)
+        ret = self.write_sysfs("/sys/bus/i2c/devices/i2c-%d/new_device" % (int(dev['i2c']['topo_info']['parent_bus'], 0)),
+                               "%s 0x%x" % (dev['i2c']['topo_info']['dev_type'], int(dev['i2c']['topo_info']['dev_addr'], 0)))
         return create_ret.append(ret)
 
     def create_temp_sensor_device(self, dev, ops):
@@ -262,19 +271,16 @@ class PddfParse():
             if ret != 0:
                 return create_ret.append(ret)
 
-            cmd = "echo '%s' > /sys/kernel/pddf/devices/cpld/i2c_name" % (dev['dev_info']['device_name'])
-            ret = self.runcmd(cmd)
+            ret = self.write_sysfs("/sys/kernel/pddf/devices/cpld/i2c_name", dev['dev_info']['device_name'])
             if ret != 0:
                 return create_ret.append(ret)
             # TODO: If attributes are provided then, use 'self.create_device' for them too
-            cmd = "echo 'add' > /sys/kernel/pddf/devices/cpld/dev_ops"
-            ret = self.runcmd(cmd)
+            ret = self.write_sysfs("/sys/kernel/pddf/devices/cpld/dev_ops", "add")
             if ret != 0:
                 return create_ret.append(ret)
         else:
-            cmd = "echo %s 0x%x > /sys/bus/i2c/devices/i2c-%d/new_device" % (dev['i2c']['topo_info']['dev_type'],
-                    int(dev['i2c']['topo_info']['dev_addr'], 0), int(dev['i2c']['topo_info']['parent_bus'], 0))
-            ret = self.runcmd(cmd)
+            ret = self.write_sysfs("/sys/bus/i2c/devices/i2c-%d/new_device" % (int(dev['i2c']['topo_info']['parent_bus'], 0)),
+                                   "%s 0x%x" % (dev['i2c']['topo_info']['dev_type'], int(dev['i2c']['topo_info']['dev_addr'], 0)))
             if ret != 0:
                 return create_ret.append(ret)
 
@@ -288,17 +294,15 @@ class PddfParse():
             if ret!=0:
                 return create_ret.append(ret)
 
-            cmd= "echo '%s' > /sys/kernel/pddf/devices/fpgai2c/i2c_name"%(dev['dev_info']['device_name'])
-            ret = self.runcmd(cmd)
+            ret = self.write_sysfs("/sys/kernel/pddf/devices/fpgai2c/i2c_name", dev['dev_info']['device_name'])
             if ret!=0:
                 return create_ret.append(ret)
-            cmd= "echo 'add' > /sys/kernel/pddf/devices/fpgai2c/dev_ops"
-            ret = self.runcmd(cmd)
+            ret = self.write_sysfs("/sys/kernel/pddf/devices/fpgai2c/dev_ops", "add")
             if ret!=0:
                 return create_ret.append(ret)
         else:
-            cmd= "echo %s 0x%x > /sys/bus/i2c/devices/i2c-%d/new_device" % (dev['i2c']['topo_info']['dev_type'], int(dev['i2c']['topo_info']['dev_addr'], 0), int(dev['i2c']['topo_info']['parent_bus'], 0))
-            ret = self.runcmd(cmd)
+            ret = self.write_sysfs("/sys/bus/i2c/devices/i2c-%d/new_device" % (int(dev['i2c']['topo_info']['parent_bus'], 0)),
+                                   "%s 0x%x" % (dev['i2c']['topo_info']['dev_type'], int(dev['i2c']['topo_info']['dev_addr'], 0)))
             if ret!=0:
                 return create_ret.append(ret)
 
@@ -310,21 +314,18 @@ class PddfParse():
         ret = self.create_device(dev['i2c']['topo_info'], "pddf/devices/cpldmux", ops)
         if ret != 0:
             return create_ret.append(ret)
-        cmd = "echo '%s' > /sys/kernel/pddf/devices/cpldmux/i2c_name" % (dev['dev_info']['device_name'])
-        ret = self.runcmd(cmd)
+        ret = self.write_sysfs("/sys/kernel/pddf/devices/cpldmux/i2c_name", dev['dev_info']['device_name'])
         if ret != 0:
             return create_ret.append(ret)
         self.create_device(dev['i2c']['dev_attr'], "pddf/devices/cpldmux", ops)
         # Parse channel info
         for chan in dev['i2c']['channel']:
             self.create_device(chan, "pddf/devices/cpldmux", ops)
-            cmd = "echo 'add' > /sys/kernel/pddf/devices/cpldmux/chan_ops"
-            ret = self.runcmd(cmd)
+            ret = self.write_sysfs("/sys/kernel/pddf/devices/cpldmux/chan_ops", "add")
             if ret != 0:
                 return create_ret.append(ret)
 
-        cmd = "echo 'add' > /sys/kernel/pddf/devices/cpldmux/dev_ops"
-        ret = self.runcmd(cmd)
+        ret = self.write_sysfs("/sys/kernel/pddf/devices/cpldmux/dev_ops", "add")
         return create_ret.append(ret)
 
     def create_gpio_device(self, dev, ops):
@@ -333,41 +334,36 @@ class PddfParse():
         ret = self.create_device(dev['i2c']['topo_info'], "pddf/devices/gpio", ops)
         if ret != 0:
             return create_ret.append(ret)
-        cmd = "echo '%s' > /sys/kernel/pddf/devices/gpio/i2c_name" % (dev['dev_info']['device_name'])
-        ret = self.runcmd(cmd)
+        ret = self.write_sysfs("/sys/kernel/pddf/devices/gpio/i2c_name", dev['dev_info']['device_name'])
         if ret != 0:
             return create_ret.append(ret)
         ret = self.create_device(dev['i2c']['dev_attr'], "pddf/devices/gpio", ops)
         if ret != 0:
             return create_ret.append(ret)
-        cmd = "echo 'add' > /sys/kernel/pddf/devices/gpio/dev_ops"
-        ret = self.runcmd(cmd)
+        ret = self.write_sysfs("/sys/kernel/pddf/devices/gpio/dev_ops", "add")
         if ret != 0:
             return create_ret.append(ret)
 
-        time.sleep(2)
+        if not self.dry_run:
+            time.sleep(2)
         base = dev['i2c']['dev_attr']['gpio_base']
         for inst in dev['i2c']['ports']:
             if inst['port_num'] != "":
                 port_no = int(base, 16) + int(inst['port_num'])
-                cmd = "echo %d > /sys/class/gpio/export" % port_no
-                ret = self.runcmd(cmd)
+                ret = self.write_sysfs("/sys/class/gpio/export", port_no)
                 if ret != 0:
                     return create_ret.append(ret)
                 if inst['direction'] != "":
-                    cmd = "echo %s >/sys/class/gpio/gpio%d/direction" % (inst['direction'], port_no)
-                    ret = self.runcmd(cmd)
+                    ret = self.write_sysfs("/sys/class/gpio/gpio%d/direction" % (port_no), inst['direction'])
                     if ret != 0:
                         return create_ret.append(ret)
                     if inst['active_low'] == "1" :
-                        cmd = "echo %s >/sys/class/gpio/gpio%d/active_low" % (inst['active_low'], port_no)
-                        ret = self.runcmd(cmd)
+                        ret = self.write_sysfs("/sys/class/gpio/gpio%d/active_low" % (port_no), inst['active_low'])
                         if ret != 0:
                             return create_ret.append(ret)
                     if inst['value'] != "":
                         for i in inst['value'].split(','):
-                            cmd = "echo %s >/sys/class/gpio/gpio%d/value" % (i.rstrip(), port_no)
-                            ret = self.runcmd(cmd)
+                            ret = self.write_sysfs("/sys/class/gpio/gpio%d/value" % (port_no), i.rstrip())
                             if ret != 0:
                                 return create_ret.append(ret)
 
@@ -379,21 +375,18 @@ class PddfParse():
         ret = self.create_device(dev['i2c']['topo_info'], "pddf/devices/mux", ops)
         if ret != 0:
             return create_ret.append(ret)
-        cmd = "echo '%s' > /sys/kernel/pddf/devices/mux/i2c_name" % (dev['dev_info']['device_name'])
-        ret = self.runcmd(cmd)
+        ret = self.write_sysfs("/sys/kernel/pddf/devices/mux/i2c_name", dev['dev_info']['device_name'])
         if ret != 0:
             return create_ret.append(ret)
-        cmd = "echo %s > /sys/kernel/pddf/devices/mux/virt_bus" % (dev['i2c']['dev_attr']['virt_bus'])
-        ret = self.runcmd(cmd)
+        ret = self.write_sysfs("/sys/kernel/pddf/devices/mux/virt_bus", dev['i2c']['dev_attr']['virt_bus'])
         if ret != 0:
             return create_ret.append(ret)
-        cmd = "echo 'add' > /sys/kernel/pddf/devices/mux/dev_ops"
-        ret = self.runcmd(cmd)
+        ret = self.write_sysfs("/sys/kernel/pddf/devices/mux/dev_ops", "add")
         # Check if the dev_attr array contain idle_state
         if 'idle_state' in dev['i2c']['dev_attr']:
-            cmd = "echo {} > /sys/bus/i2c/devices/{}-00{:02x}/idle_state".format(dev['i2c']['dev_attr']['idle_state'],
-                    int(dev['i2c']['topo_info']['parent_bus'],0), int(dev['i2c']['topo_info']['dev_addr'],0))
-            ret = self.runcmd(cmd)
+            ret = self.write_sysfs("/sys/bus/i2c/devices/{}-00{:02x}/idle_state".format(
+                    int(dev['i2c']['topo_info']['parent_bus'],0), int(dev['i2c']['topo_info']['dev_addr'],0)),
+                                   dev['i2c']['dev_attr']['idle_state'])
 
         return create_ret.append(ret)
 
@@ -405,29 +398,24 @@ class PddfParse():
             return create_ret.append(ret)
         if dev['i2c']['topo_info']['dev_type'] in self.data['PLATFORM']['pddf_dev_types']['PORT_MODULE']:
             self.create_device(dev['i2c']['topo_info'], "pddf/devices/xcvr/i2c", ops)
-            cmd = "echo '%s' > /sys/kernel/pddf/devices/xcvr/i2c/i2c_name" % (dev['dev_info']['device_name'])
-            ret = self.runcmd(cmd)
+            ret = self.write_sysfs("/sys/kernel/pddf/devices/xcvr/i2c/i2c_name", dev['dev_info']['device_name'])
             if ret != 0:
                 return create_ret.append(ret)
-            cmd = "echo '%s'  > /sys/kernel/pddf/devices/xcvr/i2c/dev_idx" % (self.get_dev_idx(dev, ops))
-            ret = self.runcmd(cmd)
+            ret = self.write_sysfs("/sys/kernel/pddf/devices/xcvr/i2c/dev_idx", self.get_dev_idx(dev, ops))
             if ret != 0:
                 return create_ret.append(ret)
             for attr in dev['i2c']['attr_list']:
                 self.create_device(attr, "pddf/devices/xcvr/i2c", ops)
-                cmd = "echo 'add' > /sys/kernel/pddf/devices/xcvr/i2c/attr_ops"
-                ret = self.runcmd(cmd)
+                ret = self.write_sysfs("/sys/kernel/pddf/devices/xcvr/i2c/attr_ops", "add")
                 if ret != 0:
                     return create_ret.append(ret)
 
-            cmd = "echo 'add' > /sys/kernel/pddf/devices/xcvr/i2c/dev_ops"
-            ret = self.runcmd(cmd)
+            ret = self.write_sysfs("/sys/kernel/pddf/devices/xcvr/i2c/dev_ops", "add")
             if ret != 0:
                 return create_ret.append(ret)
         else:
-            cmd = "echo %s 0x%x > /sys/bus/i2c/devices/i2c-%d/new_device" % (dev['i2c']['topo_info']['dev_type'],
-                    int(dev['i2c']['topo_info']['dev_addr'], 0), int(dev['i2c']['topo_info']['parent_bus'], 0))
-            ret = self.runcmd(cmd)
+            ret = self.write_sysfs("/sys/bus/i2c/devices/i2c-%d/new_device" % (int(dev['i2c']['topo_info']['parent_bus'], 0)),
+                                   "%s 0x%x" % (dev['i2c']['topo_info']['dev_type'], int(dev['i2c']['topo_info']['dev_addr'], 0)))
             # print("\n")
             if ret != 0:
                 return create_ret.append(ret)
@@ -436,10 +424,9 @@ class PddfParse():
                 int(dev['i2c']['topo_info']['parent_bus'], 0), int(dev['i2c']['topo_info']['dev_addr'], 0))
 
             if os.path.exists(port_name_sysfs):
-                cmd = "echo {} > /sys/bus/i2c/devices/{}-00{:02x}/port_name".format(
-                    dev['dev_info']['virt_parent'].lower(), int(dev['i2c']['topo_info']['parent_bus'], 0),
-                    int(dev['i2c']['topo_info']['dev_addr'], 0))
-                ret = self.runcmd(cmd)
+                ret = self.write_sysfs("/sys/bus/i2c/devices/{}-00{:02x}/port_name".format(
+                    int(dev['i2c']['topo_info']['parent_bus'], 0), int(dev['i2c']['topo_info']['dev_addr'], 0)),
+                                       dev['dev_info']['virt_parent'].lower())
                 if ret != 0:
                     return create_ret.append(ret)
 
@@ -456,8 +443,7 @@ class PddfParse():
         ret = 0
         for attr in dev['attr_list']:
             self.create_device(attr, "pddf/devices/sysstatus", ops)
-            cmd = "echo 'add' > /sys/kernel/pddf/devices/sysstatus/attr_ops"
-            ret = self.runcmd(cmd)
+            ret = self.write_sysfs("/sys/kernel/pddf/devices/sysstatus/attr_ops", "add")
             if ret != 0:
                 return create_ret.append(ret)
 
@@ -467,20 +453,17 @@ class PddfParse():
         if "EEPROM" in self.data['PLATFORM']['pddf_dev_types'] and \
                 dev['i2c']['topo_info']['dev_type'] in self.data['PLATFORM']['pddf_dev_types']['EEPROM']:
             self.create_device(dev['i2c']['topo_info'], "pddf/devices/eeprom/i2c", ops)
-            cmd = "echo '%s' > /sys/kernel/pddf/devices/eeprom/i2c/i2c_name" % (dev['dev_info']['device_name'])
-            ret = self.runcmd(cmd)
+            ret = self.write_sysfs("/sys/kernel/pddf/devices/eeprom/i2c/i2c_name", dev['dev_info']['device_name'])
             if ret != 0:
                 return create_ret.append(ret)
             self.create_device(dev['i2c']['dev_attr'], "pddf/devices/eeprom/i2c", ops)
-            cmd = "echo 'add' > /sys/kernel/pddf/devices/eeprom/i2c/dev_ops"
-            ret = self.runcmd(cmd)
+            ret = self.write_sysfs("/sys/kernel/pddf/devices/eeprom/i2c/dev_ops", "add")
             if ret != 0:
                 return create_ret.append(ret)
 
         else:
-            cmd = "echo %s 0x%x > /sys/bus/i2c/devices/i2c-%d/new_device" % (dev['i2c']['topo_info']['dev_type'],
-                    int(dev['i2c']['topo_info']['dev_addr'], 0), int(dev['i2c']['topo_info']['parent_bus'], 0))
-            ret = self.runcmd(cmd)
+            ret = self.write_sysfs("/sys/bus/i2c/devices/i2c-%d/new_device" % (int(dev['i2c']['topo_info']['parent_bus'], 0)),
+                                   "%s 0x%x" % (dev['i2c']['topo_info']['dev_type'], int(dev['i2c']['topo_info']['dev_addr'], 0)))
             if ret != 0:
                 return create_ret.append(ret)
 
@@ -493,21 +476,19 @@ class PddfParse():
         if ret!=0:
             return create_ret.append(ret)
 
-        cmd = "echo 'fpgapci_init' > /sys/kernel/pddf/devices/fpgapci/dev_ops"
-        ret = self.runcmd(cmd)
+        ret = self.write_sysfs("/sys/kernel/pddf/devices/fpgapci/dev_ops", "fpgapci_init")
         return create_ret.append(ret)
 
     def create_multifpgapcisystem_device(self, dev, ops):
         create_ret = []
         ret = 0
         for i in dev['dev_attr']['PCI_DEVICE_IDS']:
-            cmd = "echo '{} {}' > /sys/kernel/pddf/devices/multifpgapci/register_pci_device_id".format(i['vendor'], i['device'])
-            ret = self.runcmd(cmd)
+            ret = self.write_sysfs("/sys/kernel/pddf/devices/multifpgapci/register_pci_device_id",
+                                   "{} {}".format(i['vendor'], i['device']))
             if ret != 0:
                 return create_ret.append(ret)
 
-        cmd = "echo 'multifpgapci_init' > /sys/kernel/pddf/devices/multifpgapci/dev_ops"
-        ret = self.runcmd(cmd)
+        ret = self.write_sysfs("/sys/kernel/pddf/devices/multifpgapci/dev_ops", "multifpgapci_init")
         return create_ret.append(ret)
 
     def create_multifpgapci_device(self, dev, ops):
@@ -521,8 +502,8 @@ class PddfParse():
             return create_ret.append(ret)
 
         # PDDF client data store
-        cmd = "echo '{}' > /sys/kernel/pddf/devices/multifpgapci/{}/i2c_name".format(dev['dev_info']['device_name'], bdf)
-        ret = self.runcmd(cmd)
+        ret = self.write_sysfs("/sys/kernel/pddf/devices/multifpgapci/{}/i2c_name".format(bdf),
+                               dev['dev_info']['device_name'])
         if ret != 0:
             return create_ret.append(ret)
 
@@ -539,14 +520,12 @@ class PddfParse():
 
         # TODO: add GPIO & SPI specific data stores
 
-        cmd = "echo 'fpgapci_init' > /sys/kernel/pddf/devices/multifpgapci/{}/dev_ops".format(bdf)
-        ret = self.runcmd(cmd)
+        ret = self.write_sysfs("/sys/kernel/pddf/devices/multifpgapci/{}/dev_ops".format(bdf), "fpgapci_init")
         if ret != 0:
             return create_ret.append(ret)
 
         for bus in range(int(dev['i2c']['dev_attr']['num_virt_ch'], 16)):
-            cmd = "echo {} > /sys/kernel/pddf/devices/multifpgapci/{}/i2c/new_i2c_adapter".format(bus, bdf)
-            ret = self.runcmd(cmd)
+            ret = self.write_sysfs("/sys/kernel/pddf/devices/multifpgapci/{}/i2c/new_i2c_adapter".format(bdf), bus)
             if ret != 0:
                 return create_ret.append(ret)
 
@@ -564,8 +543,7 @@ class PddfParse():
 
     def create_mdio_bus(self, bdf, mdio_dev, ops):
         for bus in range(int(mdio_dev['dev_attr']['num_virt_ch'], 16)):
-            cmd = "echo {} > /sys/kernel/pddf/devices/multifpgapci/{}/mdio/new_mdio_bus".format(bus, bdf)
-            ret = self.runcmd(cmd)
+            ret = self.write_sysfs("/sys/kernel/pddf/devices/multifpgapci/{}/mdio/new_mdio_bus".format(bdf), bus)
             if ret != 0:
                 return ret
 
@@ -581,13 +559,11 @@ class PddfParse():
                 if ret != 0:
                     return create_ret.append(ret)
 
-            cmd = "echo 'init' > /sys/kernel/pddf/devices/multifpgapci/{}/gpio/line/create_line".format(bdf)
-            ret = self.runcmd(cmd)
+            ret = self.write_sysfs("/sys/kernel/pddf/devices/multifpgapci/{}/gpio/line/create_line".format(bdf), "init")
             if ret != 0:
                 return create_ret.append(ret)
 
-        cmd = "echo 'init' > /sys/kernel/pddf/devices/multifpgapci/{}/gpio/create_chip".format(bdf)
-        ret = self.runcmd(cmd)
+        ret = self.write_sysfs("/sys/kernel/pddf/devices/multifpgapci/{}/gpio/create_chip".format(bdf), "init")
         if ret != 0:
             return create_ret.append(ret)
 
@@ -599,14 +575,11 @@ class PddfParse():
     def delete_eeprom_device(self, dev, ops):
         if "EEPROM" in self.data['PLATFORM']['pddf_dev_types'] and \
                 dev['i2c']['topo_info']['dev_type'] in self.data['PLATFORM']['pddf_dev_types']['EEPROM']:
-            cmd = "echo '%s' > /sys/kernel/pddf/devices/eeprom/i2c/i2c_name" % (dev['dev_info']['device_name'])
-            self.runcmd(cmd)
-            cmd = "echo 'delete' > /sys/kernel/pddf/devices/eeprom/i2c/dev_ops"
-            self.runcmd(cmd)
+            self.write_sysfs("/sys/kernel/pddf/devices/eeprom/i2c/i2c_name", dev['dev_info']['device_name'])
+            self.write_sysfs("/sys/kernel/pddf/devices/eeprom/i2c/dev_ops", "delete")
         else:
-            cmd = "echo 0x%x > /sys/bus/i2c/devices/i2c-%d/delete_device" % (
-                    int(dev['i2c']['topo_info']['dev_addr'], 0), int(dev['i2c']['topo_info']['parent_bus'], 0))
-            self.runcmd(cmd)
+            self.write_sysfs("/sys/bus/i2c/devices/i2c-%d/delete_device" % (int(dev['i2c']['topo_info']['parent_bus'], 0)),
+                             "0x%x" % (int(dev['i2c']['topo_info']['dev_addr'], 0)))
 
     def delete_sysstatus_device(self, dev, ops):
         # NOT A PHYSICAL DEVICE.... rmmod on module would remove all the artifacts
@@ -615,64 +588,49 @@ class PddfParse():
 
     def delete_xcvr_i2c_device(self, dev, ops):
         if dev['i2c']['topo_info']['dev_type'] in self.data['PLATFORM']['pddf_dev_types']['PORT_MODULE']:
-            cmd = "echo '%s' > /sys/kernel/pddf/devices/xcvr/i2c/i2c_name" % (dev['dev_info']['device_name'])
-            self.runcmd(cmd)
-            cmd = "echo 'delete' > /sys/kernel/pddf/devices/xcvr/i2c/dev_ops"
-            self.runcmd(cmd)
+            self.write_sysfs("/sys/kernel/pddf/devices/xcvr/i2c/i2c_name", dev['dev_info']['device_name'])
+            self.write_sysfs("/sys/kernel/pddf/devices/xcvr/i2c/dev_ops", "delete")
         else:
-            cmd = "echo 0x%x > /sys/bus/i2c/devices/i2c-%d/delete_device" % (
-                    int(dev['i2c']['topo_info']['dev_addr'], 0), int(dev['i2c']['topo_info']['parent_bus'], 0))
-            self.runcmd(cmd)
+            self.write_sysfs("/sys/bus/i2c/devices/i2c-%d/delete_device" % (int(dev['i2c']['topo_info']['parent_bus'], 0)),
+                             "0x%x" % (int(dev['i2c']['topo_info']['dev_addr'], 0)))
 
     def delete_xcvr_device(self, dev, ops):
         self.delete_xcvr_i2c_device(dev, ops)
         return
 
     def delete_gpio_device(self, dev, ops):
-        cmd = "echo '%s' > /sys/kernel/pddf/devices/gpio/i2c_name" % (dev['dev_info']['device_name'])
-        self.runcmd(cmd)
-        cmd = "echo 'delete' > /sys/kernel/pddf/devices/gpio/dev_ops"
-        self.runcmd(cmd)
+        self.write_sysfs("/sys/kernel/pddf/devices/gpio/i2c_name", dev['dev_info']['device_name'])
+        self.write_sysfs("/sys/kernel/pddf/devices/gpio/dev_ops", "delete")
 
     def delete_mux_device(self, dev, ops):
-        cmd = "echo '%s' > /sys/kernel/pddf/devices/mux/i2c_name" % (dev['dev_info']['device_name'])
-        self.runcmd(cmd)
-        cmd = "echo 'delete' > /sys/kernel/pddf/devices/mux/dev_ops"
-        self.runcmd(cmd)
+        self.write_sysfs("/sys/kernel/pddf/devices/mux/i2c_name", dev['dev_info']['device_name'])
+        self.write_sysfs("/sys/kernel/pddf/devices/mux/dev_ops", "delete")
 
     def delete_cpld_device(self, dev, ops):
         if dev['i2c']['topo_info']['dev_type'] in self.data['PLATFORM']['pddf_dev_types']['CPLD']:
-            cmd = "echo '%s' > /sys/kernel/pddf/devices/cpld/i2c_name" % (dev['dev_info']['device_name'])
-            self.runcmd(cmd)
-            cmd = "echo 'delete' > /sys/kernel/pddf/devices/cpld/dev_ops"
-            self.runcmd(cmd)
+            self.write_sysfs("/sys/kernel/pddf/devices/cpld/i2c_name", dev['dev_info']['device_name'])
+            self.write_sysfs("/sys/kernel/pddf/devices/cpld/dev_ops", "delete")
         else:
-            cmd = "echo 0x%x > /sys/bus/i2c/devices/i2c-%d/delete_device" % (
-                    int(dev['i2c']['topo_info']['dev_addr'], 0), int(dev['i2c']['topo_info']['parent_bus'], 0))
-            self.runcmd(cmd)
+            self.write_sysfs("/sys/bus/i2c/devices/i2c-%d/delete_device" % (int(dev['i2c']['topo_info']['parent_bus'], 0)),
+                             "0x%x" % (int(dev['i2c']['topo_info']['dev_addr'], 0)))
 
     def delete_fpgai2c_device(self, dev, ops):
         if dev['i2c']['topo_info']['dev_type'] in self.data['PLATFORM']['pddf_dev_types']['FPGAI2C']:
-            cmd= "echo '%s' > /sys/kernel/pddf/devices/fpgai2c/i2c_name"%(dev['dev_info']['device_name'])
-            self.runcmd(cmd)
-            cmd= "echo 'delete' > /sys/kernel/pddf/devices/fpgai2c/dev_ops"
-            self.runcmd(cmd)
+            self.write_sysfs("/sys/kernel/pddf/devices/fpgai2c/i2c_name", dev['dev_info']['device_name'])
+            self.write_sysfs("/sys/kernel/pddf/devices/fpgai2c/dev_ops", "delete")
         else:
-            cmd= "echo 0x%x > /sys/bus/i2c/devices/i2c-%d/delete_device" % (int(dev['i2c']['topo_info']['dev_addr'], 0), int(dev['i2c']['topo_info']['parent_bus'], 0))
-            self.runcmd(cmd)
+            self.write_sysfs("/sys/bus/i2c/devices/i2c-%d/delete_device" % (int(dev['i2c']['topo_info']['parent_bus'], 0)),
+                             "0x%x" % (int(dev['i2c']['topo_info']['dev_addr'], 0)))
 
     def delete_cpldmux_device(self, dev, ops):
         if dev['i2c']['topo_info']['dev_type'] in self.data['PLATFORM']['pddf_dev_types']['CPLDMUX']:
-            cmd = "echo '%s' > /sys/kernel/pddf/devices/cpldmux/i2c_name" % (dev['dev_info']['device_name'])
-            self.runcmd(cmd)
-            cmd = "echo 'delete' > /sys/kernel/pddf/devices/cpldmux/dev_ops"
-            self.runcmd(cmd)
+            self.write_sysfs("/sys/kernel/pddf/devices/cpldmux/i2c_name", dev['dev_info']['device_name'])
+            self.write_sysfs("/sys/kernel/pddf/devices/cpldmux/dev_ops", "delete")
 
     def delete_non_pddf_i2c_device(self, dev, ops):
         # Delete i2c devices for which a PDDF specific driver is not needed
-        cmd = "echo 0x%x > /sys/bus/i2c/devices/i2c-%d/delete_device" % (
-                int(dev['i2c']['topo_info']['dev_addr'], 0), int(dev['i2c']['topo_info']['parent_bus'], 0))
-        self.runcmd(cmd)
+        self.write_sysfs("/sys/bus/i2c/devices/i2c-%d/delete_device" % (int(dev['i2c']['topo_info']['parent_bus'], 0)),
+                         "0x%x" % (int(dev['i2c']['topo_info']['dev_addr'], 0)))
 
     def delete_temp_sensor_device(self, dev, ops):
         return self.delete_non_pddf_i2c_device(dev, ops)
@@ -689,26 +647,20 @@ class PddfParse():
 
     def delete_fan_device(self, dev, ops):
         if dev['i2c']['topo_info']['dev_type'] in self.data['PLATFORM']['pddf_dev_types']['FAN']:
-            cmd = "echo '%s' > /sys/kernel/pddf/devices/fan/i2c/i2c_name" % (dev['dev_info']['device_name'])
-            self.runcmd(cmd)
-            cmd = "echo 'delete' > /sys/kernel/pddf/devices/fan/i2c/dev_ops"
-            self.runcmd(cmd)
+            self.write_sysfs("/sys/kernel/pddf/devices/fan/i2c/i2c_name", dev['dev_info']['device_name'])
+            self.write_sysfs("/sys/kernel/pddf/devices/fan/i2c/dev_ops", "delete")
         else:
-            cmd = "echo 0x%x > /sys/bus/i2c/devices/i2c-%d/delete_device" % (
-                    int(dev['i2c']['topo_info']['dev_addr'], 0), int(dev['i2c']['topo_info']['parent_bus'], 0))
-            self.runcmd(cmd)
+            self.write_sysfs("/sys/bus/i2c/devices/i2c-%d/delete_device" % (int(dev['i2c']['topo_info']['parent_bus'], 0)),
+                             "0x%x" % (int(dev['i2c']['topo_info']['dev_addr'], 0)))
 
 
     def delete_psu_i2c_device(self, dev, ops):
         if dev['i2c']['topo_info']['dev_type'] in self.data['PLATFORM']['pddf_dev_types']['PSU']:
-            cmd = "echo '%s' > /sys/kernel/pddf/devices/psu/i2c/i2c_name" % (dev['dev_info']['device_name'])
-            self.runcmd(cmd)
-            cmd = "echo 'delete' > /sys/kernel/pddf/devices/psu/i2c/dev_ops"
-            self.runcmd(cmd)
+            self.write_sysfs("/sys/kernel/pddf/devices/psu/i2c/i2c_name", dev['dev_info']['device_name'])
+            self.write_sysfs("/sys/kernel/pddf/devices/psu/i2c/dev_ops", "delete")
         else:
-            cmd = "echo 0x%x > /sys/bus/i2c/devices/i2c-%d/delete_device" % (
-                    int(dev['i2c']['topo_info']['dev_addr'], 0), int(dev['i2c']['topo_info']['parent_bus'], 0))
-            self.runcmd(cmd)
+            self.write_sysfs("/sys/bus/i2c/devices/i2c-%d/delete_device" % (int(dev['i2c']['topo_info']['parent_bus'], 0)),
+                             "0x%x" % (int(dev['i2c']['topo_info']['dev_addr'], 0)))
 
     def delete_psu_device(self, dev, ops):
         self.delete_psu_i2c_device(dev, ops)
@@ -720,10 +672,9 @@ class PddfParse():
     def delete_multifpgapci_device(self, dev, ops):
         bdf = dev['dev_info']['device_bdf']
 
-        cmd = "echo '{}' > /sys/kernel/pddf/devices/multifpgapci/{}/i2c_name".format(dev['dev_info']['device_name'], bdf)
-        self.runcmd(cmd)
-        cmd = "echo 'fpgapci_deinit' > /sys/kernel/pddf/devices/multifpgapci/{}/dev_ops".format(bdf)
-        self.runcmd(cmd)
+        self.write_sysfs("/sys/kernel/pddf/devices/multifpgapci/{}/i2c_name".format(bdf),
+                         dev['dev_info']['device_name'])
+        self.write_sysfs("/sys/kernel/pddf/devices/multifpgapci/{}/dev_ops".format(bdf), "fpgapci_deinit")
 
     #################################################################################################################################
     #   SHOW ATTRIBIUTES DEFS
@@ -1411,8 +1362,7 @@ class PddfParse():
     def get_led_device(self, device_name):
         self.create_attr('device_name', self.data[device_name]['dev_info']['device_name'], "pddf/devices/led")
         self.create_attr('index', self.data[device_name]['dev_attr']['index'], "pddf/devices/led")
-        cmd = "echo 'verify'  > /sys/kernel/pddf/devices/led/dev_ops"
-        self.runcmd(cmd)
+        self.write_sysfs("/sys/kernel/pddf/devices/led/dev_ops", "verify")
 
     def validate_sysfs_creation(self, obj, validate_type):
         dir = '/sys/kernel/pddf/devices/'+validate_type
@@ -1966,8 +1916,7 @@ class PddfParse():
 
     def create_attr(self, key, value, path, exceptions=[]):
         if key not in exceptions:
-            cmd = "echo '%s' > /sys/kernel/%s/%s" % (value,  path, key)
-            self.runcmd(cmd)
+            self.write_sysfs("/sys/kernel/%s/%s" % (path, key), value)
 
     def create_led_platform_device(self, key, ops):
         if ops['attr'] == 'all' or ops['attr'] == 'PLATFORM':
@@ -1994,8 +1943,7 @@ class PddfParse():
                     elif attr_key not in ['attr_name', 'descr', 'state']:
                         state_path = path+'/state_attr'
                         self.create_attr(attr_key, attr[attr_key],state_path)
-                cmd="echo '"  + attr['attr_name']+"' > /sys/kernel/pddf/devices/led/dev_ops"
-                self.runcmd(cmd)
+                self.write_sysfs("/sys/kernel/pddf/devices/led/dev_ops", attr['attr_name'])
 
 
 
@@ -2016,24 +1964,125 @@ class PddfParse():
                     list.append(self.data[key])
 
 
-    def create_pddf_devices(self):
+    def plan_pddf_devices(self, key, parent=None, plan=None):
+        """
+        Flattens the creation order of dev_parse() for the subtree rooted at key into a
+        list of (device, device type, parent device) steps. A device is always planned
+        after the mux/bus device its parent bus comes from.
+        """
+        if plan is None:
+            plan = []
+        dev = self.data[key]
+        dev_type = dev['dev_info']['device_type']
+        children = []
+        if dev_type == 'CPU':
+            for ctrl in dev['i2c']['CONTROLLERS']:
+                children.extend([d['dev'] for d in self.data[ctrl['dev']]['i2c']['DEVICES']])
+        else:
+            plan.append((key, dev_type, parent))
+            parent = key
+            if dev_type == 'CPLDMUX':
+                children = [d for chan in dev['i2c']['channel'] for d in chan['dev']]
+            elif dev_type in PLAN_CONTAINER_TYPES:
+                children = [ch['dev'] for ch in dev['i2c']['channel']]
+
+        for child in children:
+            self.plan_pddf_devices(child, parent, plan)
+        return plan
+
+    def record_create_stats(self, dev_type, start):
+        with self.stats_lock:
+            stats = self.create_stats.setdefault(dev_type, [0, 0.0])
+            stats[0] += 1
+            stats[1] += time.time() - start
+
+    def create_plan_step(self, step):
+        key, dev_type, parent = step
+        ops = {"cmd": "create", "target": "all", "attr": "all"}
+        start = time.time()
+        if dev_type in PLAN_CONTAINER_TYPES:
+            ret = getattr(self, "create_%s_device" % PLAN_CONTAINER_TYPES[dev_type])(self.data[key], ops)
+            if ret and str(ret[0]).isdigit() and ret[0] != 0:
+                print("create_{}_device() cmd failed for {}".format(PLAN_CONTAINER_TYPES[dev_type], key))
+        else:
+            ret = self.dev_parse(self.data[key], ops)
+        self.record_create_stats(dev_type, start)
+
+        if ret and str(ret[0]).isdigit():
+            return ret[0]
+        return 0
+
+    def create_plain_i2c_steps(self, steps, jobs):
+        # new_device writes on different i2c buses do not depend on each other
+        buses = {}
+        for step in steps:
+            bus = self.data[step[0]]['i2c']['topo_info']['parent_bus']
+            buses.setdefault(bus, []).append(step)
+
+        def create_bus_steps(bus_steps):
+            for step in bus_steps:
+                ret = self.create_plan_step(step)
+                if ret != 0:
+                    return ret
+            return 0
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+            for ret in executor.map(create_bus_steps, buses.values()):
+                if ret != 0:
+                    return ret
+        return 0
+
+    def create_planned_devices(self, plan, jobs=1):
+        """
+        Creates the devices of plan in order. With jobs > 1 consecutive plain i2c
+        clients are created in parallel across their i2c buses, everything else goes
+        through the shared /sys/kernel/pddf staging nodes and is created serially.
+        """
+        batch = []
+        for step in plan + [None]:
+            if step is not None and jobs > 1 and step[1] in PLAN_PLAIN_I2C_TYPES:
+                batch.append(step)
+                continue
+            if batch:
+                ret = self.create_plain_i2c_steps(batch, jobs)
+                if ret != 0:
+                    return ret
+                batch = []
+            if step is not None:
+                ret = self.create_plan_step(step)
+                if ret != 0:
+                    return ret
+        return 0
+
+    def create_pddf_devices(self, jobs=1):
+        start = time.time()
         ret = self.multifpgapcisystem_parse({"cmd": "create", "target": "all", "attr": "all"})
+        self.record_create_stats('MULTIFPGAPCIESYSTEM', start)
         if ret:
             if ret[0] != 0:
                 return ret[0]
+        start = time.time()
         self.led_parse({"cmd": "create", "target": "all", "attr": "all"})
+        self.record_create_stats('LED', start)
         create_ret = 0
-        ret = self.dev_parse(self.data['SYSTEM'], {"cmd": "create", "target": "all", "attr": "all"})
-        if ret:
-            if ret[0] != 0:
-                return ret[0]
+        ret = self.create_planned_devices(self.plan_pddf_devices('SYSTEM'), jobs)
+        if ret != 0:
+            return ret
         if 'SYSSTATUS' in self.data:
-            ret = self.dev_parse(self.data['SYSSTATUS'], {"cmd": "create", "target": "all", "attr": "all"})
-            if ret:
-                if ret[0] != 0:
-                    return ret[0]
+            ret = self.create_planned_devices(self.plan_pddf_devices('SYSSTATUS'), jobs)
+            if ret != 0:
+                return ret
         return create_ret
 
+    def print_create_report(self):
+        print("%-24s %8s %12s" % ("Device class", "Count", "Time(ms)"))
+        total = 0.0
+        for dev_type, stats in sorted(self.create_stats.items(), key=lambda x: x[1][1], reverse=True):
+            print("%-24s %8d %12.1f" % (dev_type, stats[0], stats[1] * 1000))
+            total += stats[1]
+        print("Total: %.1f ms, %d sysfs writes%s" % (total * 1000, self.sysfs_writes,
+                                                     " (dry run)" if self.dry_run else ""))
+
     def create_subtree(self, device_name):
         subtree = self.data.get(device_name)
         if not subtree:
@@ -2295,6 +2344,11 @@ class PddfParse():
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--create", action='store_true', help="create the I2C topology")
+    parser.add_argument("--dry-run", action='store_true',
+        help="with --create, walk the device creation plan without writing to sysfs and print the timing report")
+    parser.add_argument("--report", action='store_true', help="with --create, print the per device class timing report")
+    parser.add_argument("--jobs", type=int, default=1,
+        help="with --create, number of i2c buses plain i2c clients are created on in parallel")
     parser.add_argument("--sysfs", action='store', nargs="+",  help="show access-attributes sysfs for the I2C topology")
     parser.add_argument("--dsysfs", action='store', nargs="+",  help="show data-attributes sysfs for the I2C topology")
     parser.add_argument("--delete", action='store_true', help="Remove all the created I2C clients from topology")
@@ -2316,7 +2370,10 @@ def main():
         sys.exit()
 
     if args.create:
-        pddf_obj.create_pddf_devices()
+        pddf_obj.dry_run = args.dry_run
+        pddf_obj.create_pddf_devices(args.jobs)
+        if args.report or args.dry_run:
+            pddf_obj.print_create_report()
 
     if args.sysfs:
         if args.sysfs[0] == 'all':
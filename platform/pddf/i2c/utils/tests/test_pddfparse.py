@@ -0,0 +1,52 @@
+import hashlib
+import json
+import os
+import sys
+
+import pytest
+
+test_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(test_path))
+repo_path = os.path.abspath(os.path.join(test_path, "..", "..", "..", "..", ".."))
+
+import pddfparse
+
+# sysfs writes of create_pddf_devices() for every pddf-device.json in the tree, recorded from
+# the echo commands of the recursive dev_parse() walk which created the devices before
+with open(os.path.join(test_path, "create_writes.json")) as f:
+    EXPECTED_WRITES = json.load(f)
+
+
+def create_writes(device_json, jobs=1):
+    obj = pddfparse.PddfParse.__new__(pddfparse.PddfParse)
+    with open(os.path.join(repo_path, device_json)) as f:
+        obj.data = json.load(f)
+    obj.data_sysfs_obj = {}
+    obj.sysfs_obj = {}
+    obj.dry_run = True
+    obj.create_stats = {}
+    obj.sysfs_writes = 0
+    obj.stats_lock = pddfparse.threading.Lock()
+    pddfparse.cache.clear()
+
+    writes = []
+    def write_sysfs(path, val):
+        with obj.stats_lock:
+            writes.append([path, str(val)])
+        return 0
+    obj.write_sysfs = write_sysfs
+    assert obj.create_pddf_devices(jobs) == 0
+    return writes
+
+
+@pytest.mark.parametrize("device_json", sorted(EXPECTED_WRITES))
+def test_create_writes(device_json):
+    writes = create_writes(device_json)
+    assert len(writes) == EXPECTED_WRITES[device_json]["writes"]
+    assert hashlib.sha256(json.dumps(writes).encode()).hexdigest() == EXPECTED_WRITES[device_json]["sha256"]
+
+
+@pytest.mark.parametrize("device_json", sorted(EXPECTED_WRITES))
+def test_create_writes_parallel(device_json):
+    # plain i2c clients are created out of order, but nothing is missing or written twice
+    assert sorted(create_writes(device_json, jobs=4)) == sorted(create_writes(device_json))
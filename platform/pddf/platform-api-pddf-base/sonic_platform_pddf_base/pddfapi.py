@@ -1,11 +1,15 @@
 #!/usr/bin/env python
 
+import collections
+import ctypes
 import fcntl
 import glob
 import json
 import os
 import re
+import resource
 import subprocess
+import threading
 import time
 import unicodedata
 from sonic_py_common import device_info
@@ -16,9 +20,24 @@ SONIC_CFGGEN_PATH = '/usr/local/bin/sonic-cfggen'
 LED_CTRL_LOCK_PATH = '/var/lock/pddf-locks/pddf-api-led.lock'
 HWSKU_KEY = 'DEVICE_METADATA.localhost.hwsku'
 PLATFORM_KEY = 'DEVICE_METADATA.localhost.platform'
+ATTR_READ_SIZE = 4096
+# Upper bound of the attr fds kept open, further limited to a quarter of RLIMIT_NOFILE
+MAX_ATTR_FDS = 256
+I2C_RDWR = 0x0707
+I2C_M_RD = 0x0001
 
 dirname = os.path.dirname(os.path.realpath(__file__))
 
+class i2c_msg(ctypes.Structure):
+    _fields_ = [('addr', ctypes.c_uint16),
+                ('flags', ctypes.c_uint16),
+                ('len', ctypes.c_uint16),
+                ('buf', ctypes.POINTER(ctypes.c_uint8))]
+
+class i2c_rdwr_ioctl_data(ctypes.Structure):
+    _fields_ = [('msgs', ctypes.POINTER(i2c_msg)),
+                ('nmsgs', ctypes.c_uint32)]
+
 class PddfApi():
     def __init__(self):
         if not os.path.exists("/usr/share/sonic/platform"):
@@ -35,6 +54,8 @@ class PddfApi():
         self.data_sysfs_obj = {}
         self.sysfs_obj = {}
 
+        self.init_attr_cache()
+
         os.makedirs(os.path.dirname(LED_CTRL_LOCK_PATH), exist_ok=True)
 
     def _acquire_led_ctrl_lock(self):
@@ -1118,15 +1139,22 @@ class PddfApi():
             # bmc_attr is either None or {}. In both the cases, its highly likely that the attribute
             # is i2c based
             output['mode']="i2c"
-            node = self.get_path(device_name, attr_name)
-            if node is None:
-                return {}
-            try:
-                # Seen some errors in case of unencodable characters hence ignoring them in python3
-                with open(node, 'r', errors='ignore') as f:
-                    output['status'] = f.read()
-            except IOError:
-                return {}
+            status = self.get_cached_attr(device_name, attr_name)
+            if status is None and self.get_attr_cache_ttl(attr_name) > 0:
+                # Fetch the whole CPLD register once for all the ports sharing it
+                group = self.get_attr_reg_group(device_name, attr_name)
+                if group is not None:
+                    self.read_attr_reg_group(attr_name, group)
+                    status = self.get_cached_attr(device_name, attr_name)
+            if status is None:
+                node = self.get_path(device_name, attr_name)
+                if node is None:
+                    return {}
+                status = self.read_attr_node(node)
+                if status is None:
+                    return {}
+                self.set_cached_attr(device_name, attr_name, status)
+            output['status'] = status
         return output
 
     def set_attr_name_output(self, device_name, attr_name, val):
@@ -1148,7 +1176,177 @@ class PddfApi():
                     f.write(str(val))
             except IOError:
                 return {}
+            finally:
+                self.attr_cache.pop((device_name, attr_name), None)
 
             output['status'] = True
 
         return output
+
+    ###################################################################################################################
+    #   ATTR CACHE APIs
+    ###################################################################################################################
+    def init_attr_cache(self):
+        # LRU of opened sysfs/i2c-dev fds, cached attr values and CPLD register groups per attr
+        self.attr_fds = collections.OrderedDict()
+        self.attr_cache = {}
+        self.attr_reg_groups = {}
+        self.attr_reg_failed = set()
+        self.attr_lock = threading.Lock()
+        soft_limit = resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+        self.max_attr_fds = MAX_ATTR_FDS
+        if soft_limit != resource.RLIM_INFINITY:
+            self.max_attr_fds = max(1, min(MAX_ATTR_FDS, soft_limit // 4))
+
+    def get_attr_cache_ttl(self, attr_name):
+        # Seconds for which a read value of attr_name is reused, from
+        # "PLATFORM": { "attr_cache_ttl": { "<attr_name>": <seconds> } } in pddf-device.json
+        try:
+            return float(self.data['PLATFORM'].get('attr_cache_ttl', {}).get(attr_name, 0))
+        except (KeyError, AttributeError, ValueError):
+            return 0
+
+    def is_attr_bulk_read(self, attr_name):
+        """
+        CPLD register bits are decoded here only for the attrs listed in
+        "PLATFORM": { "xcvr_bulk_read_attrs": [ "<attr_name>", ... ] } in pddf-device.json.
+        The decode bypasses the pre/do/post ops of the pddf xcvr driver, so it is
+        never used on platforms loading a custom xcvr module which may override them
+        """
+        platform = self.data.get('PLATFORM', {})
+        if attr_name not in platform.get('xcvr_bulk_read_attrs', []):
+            return False
+        return not any('xcvr' in ko for ko in platform.get('custom_kos', []))
+
+    def get_cached_attr(self, device_name, attr_name):
+        entry = self.attr_cache.get((device_name, attr_name))
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def set_cached_attr(self, device_name, attr_name, value):
+        ttl = self.get_attr_cache_ttl(attr_name)
+        if ttl > 0:
+            self.attr_cache[(device_name, attr_name)] = (time.monotonic() + ttl, value)
+
+    def clear_attr_cache(self):
+        with self.attr_lock:
+            for fd in self.attr_fds.values():
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+            self.attr_fds.clear()
+        self.attr_cache = {}
+
+    def _get_attr_fd(self, path, flags):
+        # Called with attr_lock held
+        fd = self.attr_fds.get(path)
+        if fd is not None:
+            self.attr_fds.move_to_end(path)
+            return fd
+        while len(self.attr_fds) >= self.max_attr_fds:
+            _, old_fd = self.attr_fds.popitem(last=False)
+            try:
+                os.close(old_fd)
+            except OSError:
+                pass
+        fd = os.open(path, flags)
+        self.attr_fds[path] = fd
+        return fd
+
+    def _drop_attr_fd(self, path):
+        # Called with attr_lock held
+        fd = self.attr_fds.pop(path, None)
+        if fd is not None:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def read_attr_node(self, node):
+        # sysfs regenerates the attribute on every read at offset 0, so the fd is kept open.
+        # The lock is held while reading, so that an evicted fd is never read after its close
+        with self.attr_lock:
+            try:
+                buf = os.pread(self._get_attr_fd(node, os.O_RDONLY), ATTR_READ_SIZE, 0)
+            except OSError:
+                self._drop_attr_fd(node)
+                return None
+        # Seen some errors in case of unencodable characters hence ignoring them in python3
+        return buf.decode('utf-8', errors='ignore')
+
+    def get_cpld_attr(self, device_name, attr_name):
+        dev = self.data.get(device_name)
+        if dev is None or 'i2c' not in dev or 'interface' not in dev['i2c']:
+            return None
+        for ifce in dev['i2c']['interface']:
+            ifce_dev = self.data.get(ifce['dev'], {})
+            for attr in ifce_dev.get('i2c', {}).get('attr_list', []):
+                if attr['attr_name'] == attr_name:
+                    if attr.get('attr_devtype') == 'cpld' and 'attr_devname' in attr:
+                        return attr
+                    return None
+        return None
+
+    def get_attr_reg_group(self, device_name, attr_name):
+        """
+        Returns the (register, device names) group of the CPLD register backing
+        attr_name on device_name, or None if the attr is not a bulk read CPLD bit
+        """
+        if not self.is_attr_bulk_read(attr_name):
+            return None
+        if attr_name not in self.attr_reg_groups:
+            groups = {}
+            for key in self.data.keys():
+                attr = self.get_cpld_attr(key, attr_name)
+                if attr is None:
+                    continue
+                reg = (attr['attr_devname'], int(attr['attr_devaddr'], 0),
+                       int(attr['attr_offset'], 0), int(attr.get('attr_len', '1'), 0))
+                groups.setdefault(reg, []).append(key)
+            self.attr_reg_groups[attr_name] = {}
+            for reg, names in groups.items():
+                for name in names:
+                    self.attr_reg_groups[attr_name][name] = (reg, tuple(names))
+        group = self.attr_reg_groups[attr_name].get(device_name)
+        if group is None or group[0] in self.attr_reg_failed:
+            return None
+        return group
+
+    def read_cpld_reg(self, devname, devaddr, offset, length):
+        bus = int(self.data[devname]['i2c']['topo_info']['parent_bus'], 0)
+        path = "/dev/i2c-%d" % bus
+        wbuf = (ctypes.c_uint8 * 1)(offset)
+        rbuf = (ctypes.c_uint8 * length)()
+        msgs = (i2c_msg * 2)(i2c_msg(devaddr, 0, 1, wbuf),
+                             i2c_msg(devaddr, I2C_M_RD, length, rbuf))
+        ioctl_data = i2c_rdwr_ioctl_data(msgs, 2)
+        with self.attr_lock:
+            try:
+                fcntl.ioctl(self._get_attr_fd(path, os.O_RDWR), I2C_RDWR, ioctl_data)
+            except OSError:
+                self._drop_attr_fd(path)
+                return None
+        # Word registers are read swapped by the pddf drivers
+        return int.from_bytes(bytes(rbuf), 'big')
+
+    def read_attr_reg_group(self, attr_name, group):
+        """
+        Reads the CPLD register of group once and decodes attr_name for every
+        device sharing it the same way the pddf xcvr driver does
+        """
+        reg, device_names = group
+        status = self.read_cpld_reg(*reg)
+        if status is None:
+            # No i2c-dev access to this CPLD, use the per device sysfs nodes from now on
+            self.attr_reg_failed.add(reg)
+            return None
+
+        values = {}
+        for device_name in device_names:
+            attr = self.get_cpld_attr(device_name, attr_name)
+            val = 1 if (status & (1 << int(attr['attr_mask'], 0))) == int(attr['attr_cmpval'], 0) else 0
+            values[device_name] = "%d\n" % val
+            self.set_cached_attr(device_name, attr_name, values[device_name])
+        return values
@@ -0,0 +1,156 @@
+import os
+import sys
+from unittest import mock
+
+import pytest
+
+test_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(test_path))
+
+from sonic_platform_pddf_base import pddfapi
+
+
+def make_port(idx, mask):
+    port = "PORT%d" % idx
+    return {
+        port: {
+            "dev_info": {"device_type": "QSFP28", "device_name": port, "device_parent": "MUX1"},
+            "dev_attr": {"dev_idx": str(idx)},
+            "i2c": {"interface": [{"itf": "control", "dev": port + "-CTRL"}]}
+        },
+        port + "-CTRL": {
+            "dev_info": {"device_type": "", "device_name": port + "-CTRL", "virt_parent": port},
+            "i2c": {
+                "topo_info": {"parent_bus": "0x15", "dev_addr": "0x53", "dev_type": "pddf_xcvr"},
+                "attr_list": [
+                    {"attr_name": "xcvr_present", "attr_devaddr": "0x60", "attr_devtype": "cpld",
+                     "attr_devname": "CPLD1", "attr_offset": "0x30", "attr_mask": mask,
+                     "attr_cmpval": "0x0", "attr_len": "1"},
+                    {"attr_name": "xcvr_lpmode", "attr_devaddr": "0x60", "attr_devtype": "cpld",
+                     "attr_devname": "CPLD1", "attr_offset": "0x31", "attr_mask": mask,
+                     "attr_cmpval": "0x0", "attr_len": "1"}
+                ]
+            }
+        }
+    }
+
+
+@pytest.fixture
+def api(tmp_path):
+    obj = pddfapi.PddfApi.__new__(pddfapi.PddfApi)
+    obj.data = {
+        "PLATFORM": {"attr_cache_ttl": {"xcvr_present": 1}},
+        "CPLD1": {
+            "dev_info": {"device_type": "CPLD", "device_name": "CPLD1", "device_parent": "MUX1"},
+            "i2c": {"topo_info": {"parent_bus": "0xb", "dev_addr": "0x60", "dev_type": "i2c_cpld"}}
+        }
+    }
+    for idx in range(1, 5):
+        obj.data.update(make_port(idx, "0x%x" % (idx - 1)))
+    obj.data_sysfs_obj = {}
+    obj.sysfs_obj = {}
+    obj.init_attr_cache()
+
+    nodes = {}
+    for idx in range(1, 5):
+        for attr in ["xcvr_present", "xcvr_lpmode"]:
+            node = tmp_path / ("PORT%d-%s" % (idx, attr))
+            node.write_text("1\n")
+            nodes[("PORT%d" % idx, attr)] = str(node)
+    obj.get_path = lambda device, attr: nodes.get((device, attr))
+    obj.test_nodes = nodes
+    yield obj
+    obj.clear_attr_cache()
+
+
+def test_attr_fd_cached(api):
+    node = api.test_nodes[("PORT1", "xcvr_lpmode")]
+    assert api.get_attr_name_output("PORT1", "xcvr_lpmode") == {"mode": "i2c", "status": "1\n"}
+    fd = api.attr_fds[node]
+    with open(node, "w") as f:
+        f.write("0\n")
+    # no ttl for xcvr_lpmode, the node is read again through the same fd
+    assert api.get_attr_name_output("PORT1", "xcvr_lpmode")["status"] == "0\n"
+    assert api.attr_fds[node] == fd
+    assert api.get_attr_name_output("PORT9", "xcvr_lpmode") == {}
+
+
+def test_attr_fd_lru(api):
+    api.max_attr_fds = 2
+    for idx in range(1, 4):
+        api.get_attr_name_output("PORT%d" % idx, "xcvr_lpmode")
+    assert list(api.attr_fds) == [api.test_nodes[("PORT2", "xcvr_lpmode")],
+                                  api.test_nodes[("PORT3", "xcvr_lpmode")]]
+    # the evicted node is reopened on the next read
+    assert api.get_attr_name_output("PORT1", "xcvr_lpmode")["status"] == "1\n"
+    assert api.test_nodes[("PORT1", "xcvr_lpmode")] in api.attr_fds
+    assert len(api.attr_fds) == 2
+
+
+def test_attr_fd_read_error(api):
+    node = api.test_nodes[("PORT1", "xcvr_lpmode")]
+    api.get_attr_name_output("PORT1", "xcvr_lpmode")
+    os.close(api.attr_fds[node])
+    assert api.get_attr_name_output("PORT1", "xcvr_lpmode") == {}
+    assert node not in api.attr_fds
+    assert api.get_attr_name_output("PORT1", "xcvr_lpmode")["status"] == "1\n"
+
+
+def test_attr_ttl(api):
+    node = api.test_nodes[("PORT1", "xcvr_present")]
+    with mock.patch("sonic_platform_pddf_base.pddfapi.time.monotonic", return_value=100.0) as monotonic:
+        assert api.get_attr_name_output("PORT1", "xcvr_present")["status"] == "1\n"
+        with open(node, "w") as f:
+            f.write("0\n")
+        monotonic.return_value = 100.5
+        assert api.get_attr_name_output("PORT1", "xcvr_present")["status"] == "1\n"
+        monotonic.return_value = 101.5
+        assert api.get_attr_name_output("PORT1", "xcvr_present")["status"] == "0\n"
+
+
+def test_attr_write_invalidates(api):
+    with mock.patch("sonic_platform_pddf_base.pddfapi.PddfApi.check_bmc_based_attr", return_value=None):
+        assert api.get_attr_name_output("PORT1", "xcvr_present")["status"] == "1\n"
+        assert api.set_attr_name_output("PORT1", "xcvr_present", 0)["status"] is True
+        assert api.get_attr_name_output("PORT1", "xcvr_present")["status"] == "0"
+
+
+def test_cpld_bit_decode(api):
+    api.data["PLATFORM"]["xcvr_bulk_read_attrs"] = ["xcvr_present"]
+    with mock.patch.object(api, "read_cpld_reg", return_value=0b1010) as read_reg:
+        # bit clear == cmpval 0 -> present
+        assert api.get_attr_name_output("PORT1", "xcvr_present")["status"] == "1\n"
+        assert api.get_attr_name_output("PORT2", "xcvr_present")["status"] == "0\n"
+        assert api.get_attr_name_output("PORT3", "xcvr_present")["status"] == "1\n"
+        assert api.get_attr_name_output("PORT4", "xcvr_present")["status"] == "0\n"
+        # the register is read once for all the ports sharing it
+        read_reg.assert_called_once_with("CPLD1", 0x60, 0x30, 1)
+    assert not api.attr_fds
+
+
+def test_cpld_bit_decode_cmpval(api):
+    api.data["PLATFORM"]["xcvr_bulk_read_attrs"] = ["xcvr_present"]
+    api.data["PORT2-CTRL"]["i2c"]["attr_list"][0]["attr_cmpval"] = "0x2"
+    with mock.patch.object(api, "read_cpld_reg", return_value=0b0010):
+        values = api.read_attr_reg_group("xcvr_present", api.get_attr_reg_group("PORT2", "xcvr_present"))
+    assert values == {"PORT1": "1\n", "PORT2": "1\n", "PORT3": "1\n", "PORT4": "1\n"}
+
+
+def test_cpld_bit_decode_not_opted_in(api):
+    with mock.patch.object(api, "read_cpld_reg") as read_reg:
+        assert api.get_attr_name_output("PORT2", "xcvr_present")["status"] == "1\n"
+        read_reg.assert_not_called()
+    # a custom xcvr module may override the driver ops
+    api.data["PLATFORM"]["xcvr_bulk_read_attrs"] = ["xcvr_present"]
+    api.data["PLATFORM"]["custom_kos"] = ["pddf_custom_xcvr"]
+    assert api.get_attr_reg_group("PORT2", "xcvr_present") is None
+
+
+def test_cpld_read_failure(api):
+    api.data["PLATFORM"]["xcvr_bulk_read_attrs"] = ["xcvr_present"]
+    with mock.patch.object(api, "read_cpld_reg", return_value=None) as read_reg:
+        assert api.get_attr_name_output("PORT2", "xcvr_present")["status"] == "1\n"
+        api.attr_cache.clear()
+        assert api.get_attr_name_output("PORT3", "xcvr_present")["status"] == "1\n"
+        # the register falls back to the sysfs nodes after a failure
+        assert read_reg.call_count == 1
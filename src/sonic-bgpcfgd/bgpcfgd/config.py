@@ -1,11 +1,21 @@
+import time
+
+from .config_model import FRRConfigModel
+from .log import log_debug
+
+
 class ConfigMgr(object):
     """ The class represents frr configuration """
+    MODEL_RESYNC_INTERVAL = 300  # seconds
+
     def __init__(self, frr):
         self.frr = frr
         self.current_config = None
         self.current_config_raw = None
         self.changes = ""
         self.peer_groups_to_restart = []
+        self.model = FRRConfigModel()
+        self.model_synced_at = None  # None means the model must be rebuilt from FRR running configuration
 
     def reset(self):
         """ Reset stored config """
@@ -27,6 +37,22 @@ class ConfigMgr(object):
         text += ["     "]  # Add empty line to have something to work on, if there is no text
         self.current_config_raw = text
         self.current_config = self.to_canonical(out)  # FIXME: use text as an input
+        self.model.load(text)
+        self.model_synced_at = time.time()
+
+    def update_model(self, force=False):
+        """
+        Make sure the config model is in sync with FRR. The running configuration is read from FRR only
+        when the model can't follow the committed changes, or the model wasn't resynced for MODEL_RESYNC_INTERVAL
+        :param force: read the running configuration from FRR unconditionally
+        """
+        synced_at = self.model_synced_at
+        if force or synced_at is None or time.time() - synced_at >= self.MODEL_RESYNC_INTERVAL:
+            self.update()
+
+    def get_model(self):
+        """ Return FRRConfigModel object which represents FRR configuration """
+        return self.model
 
     def push_list(self, cmdlist):
         """
@@ -58,6 +84,9 @@ class ConfigMgr(object):
         if self.changes.strip() == "":
             return True
         rc_write = self.frr.write(self.changes)
+        if not rc_write or not self.model.apply(self.changes.split("\n")):
+            log_debug("ConfigMgr::commit. The config model will be rebuilt from FRR running configuration")
+            self.model_synced_at = None
         rc_restart = self.frr.restart_peer_groups(self.peer_groups_to_restart)
         self.reset()
         return rc_write and rc_restart
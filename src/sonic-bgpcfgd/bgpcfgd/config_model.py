@@ -0,0 +1,320 @@
+"""
+Indexed model of the FRR configuration objects used by the managers
+"""
+import re
+from collections import OrderedDict
+
+from .log import log_debug
+
+
+class FRRConfigModel(object):
+    """ The class keeps route-maps, prefix-lists, community-lists and peer-groups of FRR configuration
+        indexed by name. The model is built from FRR running configuration and then kept up to date
+        with the configuration commands which bgpcfgd writes to FRR """
+    RE_ROUTE_MAP = re.compile(r'^route-map (\S+) (permit|deny) (\d+)$')
+    RE_NO_ROUTE_MAP = re.compile(r'^no route-map (\S+)(?: (permit|deny) (\d+))?$')
+    RE_PREFIX_LIST = re.compile(r'^(ip|ipv6) prefix-list (\S+) seq (\d+) (.+)$')
+    RE_NO_PREFIX_LIST = re.compile(r'^no (ip|ipv6) prefix-list (\S+)(?: seq (\d+)(?: .*)?)?$')
+    RE_COMMUNITY_LIST = re.compile(r'^bgp community-list (standard|expanded) (\S+) (permit|deny) (.+)$')
+    RE_NO_COMMUNITY_LIST = re.compile(r'^no bgp community-list (standard|expanded) (\S+)$')
+    RE_ROUTER_BGP = re.compile(r'^router bgp(?: .*)?$')
+    RE_NO_ROUTER_BGP = re.compile(r'^no router bgp(?: .*)?$')
+    RE_PEER_GROUP = re.compile(r'^neighbor (\S+) peer-group$')
+    RE_NO_NEIGHBOR = re.compile(r'^no neighbor (\S+)(?: peer-group)?$')
+    RE_ROUTE_MAP_IN = re.compile(r'^neighbor (\S+) route-map (\S+) in$')
+    RE_NO_ROUTE_MAP_IN = re.compile(r'^no neighbor (\S+) route-map (\S+) in$')
+    ROUTE_MAP_COMMANDS = {'match', 'set', 'call', 'on-match', 'continue', 'description'}
+    # Route-map entry commands which FRR keeps one line of. A new line of the command replaces the existing one.
+    # A line which doesn't start with any of them replaces the existing line with the same first two words
+    ROUTE_MAP_LINE_KEYWORDS = tuple(tuple(keyword.split()) for keyword in (
+        'match ip address', 'match ip address prefix-list', 'match ip address prefix-len',
+        'match ip next-hop', 'match ip next-hop prefix-list', 'match ip next-hop type', 'match ip next-hop address',
+        'match ip route-source', 'match ip route-source prefix-list',
+        'match ipv6 address', 'match ipv6 address prefix-list', 'match ipv6 address prefix-len',
+        'match ipv6 next-hop', 'match ipv6 next-hop prefix-list', 'match ipv6 next-hop type',
+        'match ipv6 next-hop address',
+        'match as-path', 'match community', 'match large-community', 'match extcommunity', 'match interface',
+        'match local-preference', 'match metric', 'match tag', 'match origin', 'match peer', 'match source-protocol',
+        'match source-vrf', 'match rpki', 'match evpn vni', 'match evpn route-type', 'match evpn default-route',
+        'match alias', 'match script', 'match mac address',
+        'set ip next-hop', 'set ipv6 next-hop global', 'set ipv6 next-hop local', 'set ipv6 next-hop peer-address',
+        'set ipv6 next-hop prefer-global', 'set ipv4 vpn next-hop', 'set ipv6 vpn next-hop',
+        'set as-path prepend', 'set as-path exclude', 'set as-path replace', 'set community', 'set large-community',
+        'set comm-list', 'set large-comm-list', 'set extcommunity rt', 'set extcommunity soo',
+        'set extcommunity bandwidth', 'set extcommunity none', 'set local-preference', 'set metric', 'set weight',
+        'set tag', 'set origin', 'set src', 'set aggregator as', 'set atomic-aggregate', 'set originator-id',
+        'set label-index', 'set distance', 'set evpn gateway-ip ipv4', 'set evpn gateway-ip ipv6',
+        'set l3vpn next-hop encapsulation',
+        'call', 'on-match', 'continue', 'description'))
+    DEFAULT_AF = 'ipv4 unicast'  # address-family of neighbor commands outside of address-family section
+
+    def __init__(self, lines=None):
+        """
+        Initialize the object
+        :param lines: FRR running configuration as a list of lines. Empty model if None
+        """
+        self.route_maps = {}       # name -> OrderedDict: seq -> { 'action': permit|deny, 'lines': [entry lines] }
+        self.prefix_lists = {}     # (ip|ipv6, name) -> OrderedDict: seq -> rule
+        self.community_lists = {}  # name -> [(standard|expanded, permit|deny, value)]
+        self.peer_groups = OrderedDict()  # peer-group name -> True
+        self.route_maps_in = OrderedDict()  # (address-family, neighbor or peer-group name) -> inbound route-map
+        if lines is not None:
+            self.load(lines)
+
+    def reset(self):
+        """ Remove everything from the model """
+        self.route_maps = {}
+        self.prefix_lists = {}
+        self.community_lists = {}
+        self.peer_groups = OrderedDict()
+        self.route_maps_in = OrderedDict()
+
+    def load(self, lines):
+        """
+        Rebuild the model from FRR running configuration
+        :param lines: FRR running configuration as a list of lines
+        """
+        self.reset()
+        entry = None
+        inside_bgp = False
+        af = None
+        for line in lines:
+            s_line = line.strip()
+            if s_line == '' or s_line.startswith('!'):
+                continue
+            if line[0].isspace():
+                if entry is not None:
+                    entry['lines'].append(s_line)
+                elif inside_bgp:
+                    if s_line.startswith('address-family '):
+                        af = self.__get_af(s_line)
+                    elif s_line == 'exit-address-family':
+                        af = None
+                    else:
+                        self.__apply_neighbor(s_line, af)
+                continue
+            entry = None
+            inside_bgp = False
+            af = None
+            if self.RE_ROUTER_BGP.match(s_line):
+                inside_bgp = True
+            else:
+                entry = self.__apply_global(s_line)
+
+    def apply(self, cmds):
+        """
+        Update the model with configuration commands which were successfully written to FRR
+        :param cmds: list of FRR configuration commands
+        :return: True if the model follows the change. False if a command changes the model in a way
+                 which can't be followed, so the model must be rebuilt from FRR running configuration
+        """
+        entry = None
+        inside_bgp = False
+        af = None
+        for line in cmds:
+            s_line = line.strip()
+            if s_line == '' or s_line.startswith('!'):
+                continue
+            words = s_line.split()
+            if s_line == 'end':
+                entry, inside_bgp, af = None, False, None
+            elif s_line == 'exit' and af is not None:
+                af = None
+            elif s_line == 'exit':
+                entry, inside_bgp = None, False
+            elif entry is not None and words[0] in self.ROUTE_MAP_COMMANDS:
+                if not self.__add_route_map_line(entry, s_line):
+                    return False
+            elif entry is not None and words[0] == 'no' and len(words) > 1 and words[1] in self.ROUTE_MAP_COMMANDS:
+                log_debug("FRRConfigModel: can't follow route-map command '%s'" % s_line)
+                return False
+            elif self.RE_ROUTER_BGP.match(s_line):
+                entry, inside_bgp, af = None, True, None
+            elif self.RE_NO_ROUTER_BGP.match(s_line):
+                entry, inside_bgp, af = None, False, None
+                self.peer_groups = OrderedDict()
+                self.route_maps_in = OrderedDict()
+            elif self.__is_global(s_line):
+                entry, inside_bgp, af = self.__apply_global(s_line), False, None
+            elif inside_bgp:
+                entry = None
+                if words[0] == 'address-family':
+                    af = self.__get_af(s_line)
+                elif words[0] == 'exit-address-family':
+                    af = None
+                else:
+                    self.__apply_neighbor(s_line, af)
+            else:
+                entry = None  # a command which doesn't change objects kept in the model
+        return True
+
+    def __is_global(self, line):
+        """ Check that the line is a global command which changes objects kept in the model """
+        for regex in (self.RE_ROUTE_MAP, self.RE_NO_ROUTE_MAP, self.RE_PREFIX_LIST, self.RE_NO_PREFIX_LIST,
+                      self.RE_COMMUNITY_LIST, self.RE_NO_COMMUNITY_LIST):
+            if regex.match(line):
+                return True
+        return False
+
+    def __apply_global(self, line):
+        """
+        Apply a global configuration command
+        :param line: configuration command
+        :return: route-map entry if the command opens a route-map entry, None otherwise
+        """
+        result = self.RE_ROUTE_MAP.match(line)
+        if result:
+            name, action, seq = result.group(1), result.group(2), int(result.group(3))
+            entries = self.route_maps.setdefault(name, OrderedDict())
+            if seq not in entries or entries[seq]['action'] != action:
+                entries[seq] = {'action': action, 'lines': []}
+            return entries[seq]
+        result = self.RE_NO_ROUTE_MAP.match(line)
+        if result:
+            name, seq = result.group(1), result.group(3)
+            if seq is None:
+                self.route_maps.pop(name, None)
+            elif name in self.route_maps:
+                self.route_maps[name].pop(int(seq), None)
+                if not self.route_maps[name]:
+                    del self.route_maps[name]
+            return None
+        result = self.RE_PREFIX_LIST.match(line)
+        if result:
+            key = result.group(1), result.group(2)
+            self.prefix_lists.setdefault(key, OrderedDict())[int(result.group(3))] = result.group(4)
+            return None
+        result = self.RE_NO_PREFIX_LIST.match(line)
+        if result:
+            key, seq = (result.group(1), result.group(2)), result.group(3)
+            if seq is None:
+                self.prefix_lists.pop(key, None)
+            elif key in self.prefix_lists:
+                self.prefix_lists[key].pop(int(seq), None)
+                if not self.prefix_lists[key]:
+                    del self.prefix_lists[key]
+            return None
+        result = self.RE_COMMUNITY_LIST.match(line)
+        if result:
+            entry = result.group(1), result.group(3), result.group(4)
+            entries = self.community_lists.setdefault(result.group(2), [])
+            if entry not in entries:
+                entries.append(entry)
+            return None
+        result = self.RE_NO_COMMUNITY_LIST.match(line)
+        if result:
+            self.community_lists.pop(result.group(2), None)
+        return None
+
+    @staticmethod
+    def __get_af(line):
+        """
+        Get the address-family name from 'address-family' command
+        :param line: 'address-family' command
+        :return: address-family name, e.g. 'ipv4 unicast'
+        """
+        words = line.split()[1:]
+        if len(words) == 1:
+            words.append('unicast')
+        return " ".join(words)
+
+    def __apply_neighbor(self, line, af):
+        """
+        Apply a command from 'router bgp' section
+        :param line: configuration command
+        :param af: address-family of the command. None if the command is outside of address-family section
+        """
+        if af is None:
+            af = self.DEFAULT_AF
+        result = self.RE_PEER_GROUP.match(line)
+        if result:
+            self.peer_groups[result.group(1)] = True
+            return
+        result = self.RE_ROUTE_MAP_IN.match(line)
+        if result:
+            self.route_maps_in[(af, result.group(1))] = result.group(2)
+            return
+        result = self.RE_NO_ROUTE_MAP_IN.match(line)
+        if result:
+            if self.route_maps_in.get((af, result.group(1))) == result.group(2):
+                del self.route_maps_in[(af, result.group(1))]
+            return
+        result = self.RE_NO_NEIGHBOR.match(line)
+        if result:
+            self.peer_groups.pop(result.group(1), None)
+            for key in [key for key in self.route_maps_in if key[1] == result.group(1)]:
+                del self.route_maps_in[key]
+
+    @staticmethod
+    def __add_route_map_line(entry, line):
+        """
+        Add a match/set/call line to a route-map entry
+        :param entry: route-map entry
+        :param line: route-map entry command
+        :return: False if the line replaces an existing line of the entry, which can't be followed
+        """
+        if line in entry['lines']:
+            return True
+        keyword = FRRConfigModel.__get_route_map_line_keyword(line)
+        if any(FRRConfigModel.__get_route_map_line_keyword(existing) == keyword for existing in entry['lines']):
+            log_debug("FRRConfigModel: can't follow route-map command '%s'" % line)
+            return False
+        entry['lines'].append(line)
+        return True
+
+    @staticmethod
+    def __get_route_map_line_keyword(line):
+        """
+        Get the command keyword of a route-map entry line. Two lines with the same keyword can't be in one entry
+        :param line: route-map entry command
+        :return: tuple of the keyword words
+        """
+        words = tuple(line.split())
+        keywords = [keyword for keyword in FRRConfigModel.ROUTE_MAP_LINE_KEYWORDS if words[:len(keyword)] == keyword]
+        if keywords:
+            return max(keywords, key=len)
+        return words[:2]
+
+    def get_route_map(self, name):
+        """
+        Get route-map entries
+        :param name: route-map name
+        :return: OrderedDict: seq -> { 'action': permit|deny, 'lines': [entry lines] }. Empty if not found
+        """
+        return self.route_maps.get(name, OrderedDict())
+
+    def get_prefix_list(self, family, name):
+        """
+        Get prefix-list rules
+        :param family: 'ip' or 'ipv6'
+        :param name: prefix-list name
+        :return: OrderedDict: seq -> rule. Empty if not found
+        """
+        return self.prefix_lists.get((family, name), OrderedDict())
+
+    def get_community_list(self, name):
+        """
+        Get community-list entries
+        :param name: community-list name
+        :return: list of tuples (standard|expanded, permit|deny, value). Empty if not found
+        """
+        return self.community_lists.get(name, [])
+
+    def get_peer_groups(self):
+        """ Get names of all defined peer-groups """
+        return list(self.peer_groups.keys())
+
+    def get_route_map_in(self, name, af=None):
+        """
+        Get inbound route-map of a neighbor or a peer-group
+        :param name: neighbor or peer-group name
+        :param af: address-family name, e.g. 'ipv6 unicast'. None to get the route-map of the first
+                   address-family where it is set, in the order of FRR configuration
+        :return: route-map name, or None if the inbound route-map isn't set
+        """
+        if af is not None:
+            return self.route_maps_in.get((af, name))
+        for (_, neighbor), route_map in self.route_maps_in.items():
+            if neighbor == name:
+                return route_map
+        return None
@@ -9,6 +9,14 @@ class Directory(object):
     def __init__(self):
         self.data = defaultdict(dict)  # storage. A key is a slot name, a value is a dictionary with data
         self.notify = defaultdict(lambda: defaultdict(list))  # registered callbacks: slot -> path -> handlers[]
+        self.notify_index = defaultdict(lambda: defaultdict(dict))  # slot -> first path component -> {path: subscription order}
+        self.notify_order = 0
+        self.pending_handlers = None  # handlers to run at the end of the batch, None if no batch is open
+
+    @staticmethod
+    def get_path_key(path):
+        """ Return the storage key a path starts with. An empty path covers every key of the slot """
+        return path.split("/", 1)[0]
 
     @staticmethod
     def get_slot_name(db, table):
@@ -71,16 +79,41 @@ class Directory(object):
         """
         slot = self.get_slot_name(db, table)
         self.data[slot][key] = value
-        if slot in self.notify:
-            handlers_to_run = []
+        if slot in self.notify_index:
+            index = self.notify_index[slot]
+            # Only the paths starting with the updated key, or covering the whole slot, can be affected
+            paths = list(index.get(key, {}).items())
+            if key != "":
+                paths += list(index.get("", {}).items())
+            paths.sort(key=lambda item: item[1])
 
-            for path in self.notify[slot].keys():
+            handlers_to_run = []
+            for path, _ in paths:
                 if self.path_exist(db, table, path):
-                    handlers_to_run += self.notify[slot][path]
+                    for handler in self.notify[slot][path]:
+                        if handler not in handlers_to_run:  # a handler subscribed to several paths runs once
+                            handlers_to_run.append(handler)
+
+            if self.pending_handlers is not None:
+                for handler in handlers_to_run:
+                    if handler not in self.pending_handlers:  # a handler notified by several updates of the batch runs once
+                        self.pending_handlers.append(handler)
+                return
 
             for handler in handlers_to_run:
                 handler()
 
+    def begin_batch(self):
+        """ Hold the notifications of the following updates until end_batch() is called """
+        if self.pending_handlers is None:
+            self.pending_handlers = []
+
+    def end_batch(self):
+        """ Run the handlers notified since begin_batch(), each handler once, in the order they were notified """
+        handlers, self.pending_handlers = self.pending_handlers, None
+        for handler in handlers or []:
+            handler()
+
     def get(self, db, table, key):
         """
         Get a value from the storage
@@ -161,10 +194,16 @@ class Directory(object):
         for db, table, path in deps:
             slot = self.get_slot_name(db, table)
             self.notify[slot][path].append(handler)
+            path_key = self.get_path_key(path)
+            if path not in self.notify_index[slot][path_key]:
+                self.notify_index[slot][path_key][path] = self.notify_order
+                self.notify_order += 1
 
     def unsubscribe(self, deps):
         for db, table, path in deps:
             slot = self.get_slot_name(db, table)
             if slot in self.notify:
                 if path in self.notify[slot]:
-                    del self.notify[slot][path]
\ No newline at end of file
+                    del self.notify[slot][path]
+            if slot in self.notify_index:
+                self.notify_index[slot][self.get_path_key(path)].pop(path, None)
\ No newline at end of file
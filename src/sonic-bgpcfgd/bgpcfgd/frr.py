@@ -1,17 +1,131 @@
 import os
 import datetime
+import socket
 import time
 import tempfile
 
-from bgpcfgd.log import log_err, log_info, log_warn, log_crit
+from bgpcfgd.log import log_debug, log_err, log_info, log_warn, log_crit
 from .vars import g_debug
 from .utils import run_command
 
 
+class FRRClient(object):
+    """ Long-lived connections to the vty sockets of FRR daemons. vtysh uses the same sockets.
+        A command is sent as a NUL terminated string. A reply is terminated by three NUL bytes
+        followed by the command return code """
+    VTY_SOCKET_TMPL = '/run/frr/%s.vty'
+    SOCKET_TIMEOUT = 120  # seconds
+    REPLY_MARK = b'\0\0\0'
+
+    def __init__(self, vty_socket_tmpl=VTY_SOCKET_TMPL):
+        """
+        Initialize the object
+        :param vty_socket_tmpl: template of the vty socket path. The template parameter is a daemon name
+        """
+        self.vty_socket_tmpl = vty_socket_tmpl
+        self.socks = {}  # daemon -> connected socket
+
+    def connect(self, daemon):
+        """
+        Connect to the daemon vty socket, if the connection isn't established yet
+        :param daemon: FRR daemon name
+        :return: True if the connection is ready for commands, False otherwise
+        """
+        if daemon in self.socks:
+            return True
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(self.SOCKET_TIMEOUT)
+            sock.connect(self.vty_socket_tmpl % daemon)
+            self.socks[daemon] = sock
+            replies = self.__exchange(daemon, ['enable'])
+        except (socket.error, socket.timeout) as e:
+            log_debug("FRRClient: can't connect to '%s': %s" % (daemon, str(e)))
+            self.close(daemon)
+            sock.close()
+            return False
+        if replies[0][0] != 0:
+            log_err("FRRClient: 'enable' command failed on '%s': rc=%d out='%s'" % (daemon, replies[0][0], replies[0][1]))
+            self.close(daemon)
+            return False
+        return True
+
+    def close(self, daemon=None):
+        """
+        Close the connection to the daemon
+        :param daemon: FRR daemon name. All connections are closed if None
+        """
+        daemons = list(self.socks.keys()) if daemon is None else [daemon]
+        for name in daemons:
+            sock = self.socks.pop(name, None)
+            if sock is not None:
+                sock.close()
+
+    def run_commands(self, daemon, cmds):
+        """
+        Send the commands to the daemon in one write and read all replies afterwards
+        :param daemon: FRR daemon name
+        :param cmds: list of commands
+        :return: list of tuples (return code, output) in the order of the commands.
+                 None if the daemon isn't reachable. The caller should fall back to vtysh then
+        """
+        if not self.connect(daemon):
+            return None
+        try:
+            return self.__exchange(daemon, cmds)
+        except (socket.error, socket.timeout) as e:
+            log_warn("FRRClient: connection to '%s' is broken: %s" % (daemon, str(e)))
+            self.close(daemon)
+            return None
+
+    def __exchange(self, daemon, cmds):
+        """
+        Send the commands and read the replies
+        :param daemon: FRR daemon name
+        :param cmds: list of commands
+        :return: list of tuples (return code, output) in the order of the commands
+        """
+        sock = self.socks[daemon]
+        sock.sendall(b"".join(cmd.encode('utf-8') + b'\0' for cmd in cmds))
+        replies = []
+        buf = b""
+        while len(replies) < len(cmds):
+            pos = buf.find(self.REPLY_MARK)
+            if pos != -1 and len(buf) >= pos + len(self.REPLY_MARK) + 1:
+                rc = buf[pos + len(self.REPLY_MARK)]
+                replies.append((rc, buf[:pos].decode('utf-8', 'replace')))
+                buf = buf[pos + len(self.REPLY_MARK) + 1:]
+                continue
+            data = sock.recv(16384)
+            if not data:
+                raise socket.error("connection closed by '%s'" % daemon)
+            buf += data
+        return replies
+
+
 class FRR(object):
     """Proxy object with FRR"""
-    def __init__(self, daemons):
+    # Top level commands which are handled by bgpd only. A configuration which consists of the commands
+    # can be written to bgpd directly. Everything else is written through vtysh, which knows what daemons
+    # need a command
+    BGPD_ONLY_COMMANDS = ('router bgp', 'no router bgp', 'bgp community-list', 'no bgp community-list',
+                          'bgp extcommunity-list', 'no bgp extcommunity-list',
+                          'bgp large-community-list', 'no bgp large-community-list',
+                          'bgp as-path access-list', 'no bgp as-path access-list', 'exit')
+    # Commands which enter a configuration node of bgpd, with the level of the node. The commands following them
+    # are applied inside the node
+    BGPD_NODE_COMMANDS = {'router bgp': 0, 'address-family': 1, 'bmp targets': 1, 'vni': 2}
+    # Commands which leave a node of bgpd, with the number of nodes kept entered
+    BGPD_EXIT_COMMANDS = {'exit-address-family': 1, 'exit-vni': 2, 'end': 0}
+
+    def __init__(self, daemons, client=None):
+        """
+        Initialize the object
+        :param daemons: list of FRR daemons bgpcfgd requires
+        :param client: FRRClient object used to talk to the daemons without running vtysh. vtysh is used if None
+        """
         self.daemons = daemons
+        self.client = client
 
     def wait_for_daemons(self, seconds):
         """
@@ -21,8 +135,14 @@ class FRR(object):
         stop_time = datetime.datetime.now() + datetime.timedelta(seconds=seconds)
         log_info("Start waiting for FRR daemons: %s" % str(datetime.datetime.now()))
         while datetime.datetime.now() < stop_time:
+            daemons = self.daemons
+            if self.client is not None and 'bgpd' in daemons and self.client.connect('bgpd'):
+                daemons = [daemon for daemon in daemons if daemon != 'bgpd']
+                if not daemons:
+                    log_info("All required daemons accept connections: %s" % str(datetime.datetime.now()))
+                    return
             ret_code, out, err = run_command(["vtysh", "-c", "show daemons"], hide_errors=True)
-            if ret_code == 0 and all(daemon in out for daemon in self.daemons):
+            if ret_code == 0 and all(daemon in out for daemon in daemons):
                 log_info("All required daemons have connected to vtysh: %s" % str(datetime.datetime.now()))
                 return
             else:
@@ -38,8 +158,91 @@ class FRR(object):
             return ""
         return out
 
+    def write(self, config_text):
+        """
+        Write configuration to FRR
+        :param config_text: FRR configuration
+        :return: True if the configuration was applied successfully, False otherwise
+        """
+        if self.client is not None and self.__is_bgpd_only(config_text):
+            cmds = [line.strip() for line in config_text.split("\n")]
+            cmds = ['configure terminal'] + [cmd for cmd in cmds if cmd and not cmd.startswith('!')] + ['end']
+            res, unapplied = self.__write_bgpd(cmds)
+            if unapplied is None:
+                return res
+            if res is not None:
+                # A part of the configuration was applied by bgpd. Write the rest, inside the node it belongs to
+                log_warn("ConfigMgr::commit(): connection to bgpd is lost, writing the rest of the configuration with vtysh")
+                return self.write_file("\n".join(unapplied)) and res
+        return self.write_file(config_text)
+
+    def __write_bgpd(self, cmds):
+        """
+        Write configuration commands to bgpd. The commands are sent in batches, which end with a command entering
+        a configuration node. When the command fails, the rest of the configuration isn't applied to a wrong node
+        :param cmds: list of configuration commands, starting with 'configure terminal' and ending with 'end'
+        :return: a pair (result, unapplied). result is True if the configuration was applied successfully,
+                 False otherwise. When bgpd isn't reachable, unapplied is the list of commands which still must be
+                 written, preceded by the commands entering their node, and result is None if nothing was applied
+        """
+        res = True
+        batch = []
+        start = 0
+        node = []  # commands entering the node the next command is applied in
+        batch_node = []
+        for pos, cmd in enumerate(cmds):
+            batch.append(cmd)
+            node, is_node_cmd = self.__get_node(node, cmd)
+            if not is_node_cmd and pos != len(cmds) - 1:
+                continue
+            replies = self.client.run_commands('bgpd', batch)
+            if replies is None:
+                # The commands of the broken batch could be applied or not, they are written again
+                return (None if start == 0 else res), batch_node + cmds[start:-1]
+            for batch_cmd, (rc, out) in zip(batch, replies):
+                if rc != 0:
+                    log_err("ConfigMgr::commit(): can't push configuration command '%s' to bgpd, rc='%d', out='%s'" % (batch_cmd, rc, out))
+                    res = False
+            if is_node_cmd and replies[-1][0] != 0:
+                self.client.run_commands('bgpd', ['end'])
+                return False, None
+            batch = []
+            start = pos + 1
+            batch_node = node
+        return res, None
+
+    def __get_node(self, node, cmd):
+        """
+        Follow the node of bgpd configuration the commands are applied in
+        :param node: list of commands entering the current node
+        :param cmd: configuration command
+        :return: a pair: list of commands entering the node after the command, True if the command enters a node
+        """
+        for node_cmd, level in self.BGPD_NODE_COMMANDS.items():
+            if cmd == node_cmd or cmd.startswith(node_cmd + " "):
+                return node[:level] + [cmd], True
+        if cmd in self.BGPD_EXIT_COMMANDS:
+            return node[:self.BGPD_EXIT_COMMANDS[cmd]], False
+        if cmd == 'exit':
+            return node[:-1], False
+        return node, False
+
+    def __is_bgpd_only(self, config_text):
+        """ Check that the configuration has only top level commands from BGPD_ONLY_COMMANDS """
+        for line in config_text.split("\n"):
+            if line.strip() == "" or line.strip().startswith('!') or line[0].isspace():
+                continue
+            if not any(line == cmd or line.startswith(cmd + " ") for cmd in self.BGPD_ONLY_COMMANDS):
+                return False
+        return True
+
     @staticmethod
-    def write(config_text):
+    def write_file(config_text):
+        """
+        Write configuration to FRR with 'vtysh -f'
+        :param config_text: FRR configuration
+        :return: True if the configuration was applied successfully, False otherwise
+        """
         fd, tmp_filename = tempfile.mkstemp(dir='/tmp')
         os.close(fd)
         with open(tmp_filename, 'w') as fp:
@@ -54,15 +257,24 @@ class FRR(object):
                 os.remove(tmp_filename)
         return ret_code == 0
 
-    @staticmethod
-    def restart_peer_groups(peer_groups):
+    def restart_peer_groups(self, peer_groups):
         """ Restart peer-groups which support BBR
         :param peer_groups: List of peer_groups to restart
         :return: True if restart of all peer-groups was successful, False otherwise
         """
+        peer_groups = sorted(peer_groups)
+        cmds = ["clear bgp peer-group %s soft in" % peer_group for peer_group in peer_groups]
+        replies = self.client.run_commands('bgpd', cmds) if self.client is not None and cmds else None
+        if replies is not None:
+            res = True
+            for peer_group, (rc, out) in zip(peer_groups, replies):
+                if rc != 0:
+                    log_crit("Can't restart bgp peer-group '%s'. rc='%d', out='%s'" % (peer_group, rc, out))
+                res = res and (rc == 0)
+            return res
         res = True
-        for peer_group in sorted(peer_groups):
-            rc, out, err = run_command(["vtysh", "-c", "clear bgp peer-group %s soft in" % peer_group])
+        for peer_group, cmd in zip(peer_groups, cmds):
+            rc, out, err = run_command(["vtysh", "-c", cmd])
             if rc != 0:
                 log_value = peer_group, rc, out, err
                 log_crit("Can't restart bgp peer-group '%s'. rc='%d', out='%s', err='%s'" % log_value)
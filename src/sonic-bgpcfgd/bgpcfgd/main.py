@@ -34,7 +34,7 @@ from .static_rt_timer import StaticRouteTimer
 from .runner import Runner, signal_handler
 from .template import TemplateFabric
 from .utils import read_constants
-from .frr import FRR
+from .frr import FRR, FRRClient
 from .vars import g_debug
 
 
@@ -43,7 +43,7 @@ def do_work():
     st_rt_timer = StaticRouteTimer()
     thr = threading.Thread(target = st_rt_timer.run)
     thr.start()
-    frr = FRR(["bgpd", "zebra", "staticd"])
+    frr = FRR(["bgpd", "zebra", "staticd"], FRRClient())
     frr.wait_for_daemons(seconds=20)
 
     # Wait for mgmtd initial config load to avoid "Lock already taken on DS" error
@@ -131,7 +131,12 @@ def do_work():
         managers.append(AsPathMgr(common_objs, "CONFIG_DB", "DEVICE_METADATA"))
         log_notice("Prefix List Manager and AsPath Manager are enabled for UpperSpineRouter/UpstreamLC")
 
-    runner = Runner(common_objs['cfg_mgr'])
+    batch_cfg = common_objs['constants'].get('bgp', {}).get('batch', {})
+    runner = Runner(common_objs['cfg_mgr'],
+                    batch_enabled=batch_cfg.get('enabled', False),
+                    batch_max_size=batch_cfg.get('max_size', 1000),
+                    batch_max_time=batch_cfg.get('max_time_ms', 200) / 1000.0,
+                    directory=common_objs['directory'])
     for mgr in managers:
         runner.add_manager(mgr)
     runner.run()
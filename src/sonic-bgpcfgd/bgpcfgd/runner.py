@@ -1,7 +1,8 @@
-from collections import defaultdict
+import time
+from collections import defaultdict, OrderedDict
 from swsscommon import swsscommon
 
-from .log import log_debug, log_crit
+from .log import log_debug, log_info, log_crit
 
 
 g_run = True
@@ -19,14 +20,39 @@ class Runner(object):
         when corresponding db/table is updated
     """
     SELECT_TIMEOUT = 1000
+    STATS_LOG_INTERVAL = 60  # seconds
 
-    def __init__(self, cfg_manager):
-        """ Constructor """
+    def __init__(self, cfg_manager, batch_enabled=False, batch_max_size=1000, batch_max_time=0.2, directory=None):
+        """
+        Constructor
+        :param cfg_manager: ConfigMgr object used to commit the changes to FRR
+        :param directory: Directory object. Its notifications are run once per batch, after the events of the batch
+        :param batch_enabled: collect events from all subscribers into one batch before running the handlers
+        :param batch_max_size: maximum number of events in one batch
+        :param batch_max_time: maximum time in seconds spent collecting one batch
+        """
         self.cfg_manager = cfg_manager
         self.db_connectors = {}
         self.selector = swsscommon.Select()
         self.callbacks = defaultdict(lambda: defaultdict(list))  # db -> table -> handlers[]
-        self.subscribers = set()
+        self.subscribers = []  # in the order the managers were added
+        self.batch_enabled = batch_enabled
+        self.batch_max_size = batch_max_size
+        self.batch_max_time = batch_max_time
+        self.directory = directory
+        self.counters = {
+            'batches': 0,
+            'events': 0,
+            'coalesced_events': 0,
+            'last_batch_size': 0,
+            'max_batch_size': 0,
+            'commits': 0,
+            'failed_commits': 0,
+            'last_commit_latency': 0.0,
+            'max_commit_latency': 0.0,
+            'total_commit_latency': 0.0,
+        }
+        self.last_stats_log = time.time()
 
     def add_manager(self, manager):
         """
@@ -47,7 +73,7 @@ class Runner(object):
         if table_name not in self.callbacks[db]:
             conn = self.db_connectors[db]
             subscriber = swsscommon.SubscriberStateTable(conn, table_name)
-            self.subscribers.add(subscriber)
+            self.subscribers.append(subscriber)
             self.selector.addSelectable(subscriber)
         self.callbacks[db][table_name].append(manager.handler)
 
@@ -60,14 +86,120 @@ class Runner(object):
             elif state == self.selector.ERROR:
                 raise Exception("Received error from select")
 
-            for subscriber in self.subscribers:
-                while True:
+            if self.batch_enabled:
+                self.dispatch_batch(self.collect_batch())
+            else:
+                for subscriber in self.subscribers:
+                    while True:
+                        key, op, fvs = subscriber.pop()
+                        if not key:
+                            break
+                        log_debug("Received message : '%s'" % str((key, op, fvs)))
+                        for callback in self.get_callbacks(subscriber):
+                            callback(key, op, dict(fvs))
+            self.commit()
+
+    def get_callbacks(self, subscriber):
+        """ Return the manager handlers registered for the subscriber table """
+        return self.callbacks[subscriber.getDbConnector().getDbId()][subscriber.getTableName()]
+
+    def collect_batch(self):
+        """
+        Pop events from all subscribers until they are drained and no new event arrives,
+        the batch has batch_max_size events, or batch_max_time is spent.
+        Events for the same key are coalesced, see Runner.coalesce()
+        :return: a list of pairs (subscriber, events), in the order the subscribers were added.
+                 events is an ordered dictionary: key -> list of (op, fvs)
+        """
+        batch = OrderedDict((subscriber, OrderedDict()) for subscriber in self.subscribers)
+        n_events = 0
+        deadline = time.time() + self.batch_max_time
+        while g_run:
+            for subscriber, events in batch.items():
+                while n_events < self.batch_max_size:
                     key, op, fvs = subscriber.pop()
                     if not key:
                         break
                     log_debug("Received message : '%s'" % str((key, op, fvs)))
-                    for callback in self.callbacks[subscriber.getDbConnector().getDbId()][subscriber.getTableName()]:
-                        callback(key, op, dict(fvs))
-            rc = self.cfg_manager.commit()
-            if not rc:
-                log_crit("Runner::commit was unsuccessful")
+                    n_events += 1
+                    if not self.coalesce(events, key, op, dict(fvs)):
+                        self.counters['coalesced_events'] += 1
+            timeout = int((deadline - time.time()) * 1000)
+            if n_events >= self.batch_max_size or timeout <= 0:
+                break
+            # All subscribers are drained. Wait for more events within the batch time budget
+            state, _ = self.selector.select(timeout)
+            if state == self.selector.TIMEOUT:
+                break
+            elif state == self.selector.ERROR:
+                raise Exception("Received error from select")
+
+        self.counters['batches'] += 1
+        self.counters['events'] += n_events
+        self.counters['last_batch_size'] = n_events
+        self.counters['max_batch_size'] = max(self.counters['max_batch_size'], n_events)
+        return [(subscriber, events) for subscriber, events in batch.items() if events]
+
+    @staticmethod
+    def coalesce(events, key, op, fvs):
+        """
+        Add an event to the events of a table, merging it with the events already queued for the key.
+        SubscriberStateTable reports the whole entry on 'SET', so only the last 'SET' is kept.
+        A 'DEL' replaces everything queued for the key. A 'SET' after a 'DEL' is kept with the 'DEL',
+        so the handlers see the entry removed before it is created again.
+        :param events: ordered dictionary: key -> list of (op, fvs)
+        :param key: key of the table entry
+        :param op: operation on the table entry
+        :param fvs: associated data of the event
+        :return: True if the event was added, False if it was merged with a queued event
+        """
+        queued = events.get(key)
+        if not queued:
+            events[key] = [(op, fvs)]
+            return True
+        if op == swsscommon.SET_COMMAND and queued[-1][0] == swsscommon.SET_COMMAND:
+            queued[-1] = (op, fvs)
+            return False
+        if op == swsscommon.DEL_COMMAND:
+            events[key] = [(op, fvs)]
+            return False
+        queued.append((op, fvs))
+        return True
+
+    def dispatch_batch(self, batch):
+        """
+        Run the manager handlers for a collected batch
+        :param batch: list of pairs (subscriber, events) returned by Runner.collect_batch()
+        """
+        if self.directory is not None:
+            self.directory.begin_batch()
+        try:
+            for subscriber, events in batch:
+                callbacks = self.get_callbacks(subscriber)
+                for key, ops in events.items():
+                    for op, fvs in ops:
+                        for callback in callbacks:
+                            callback(key, op, fvs)
+        finally:
+            if self.directory is not None:
+                self.directory.end_batch()
+
+    def commit(self):
+        """ Commit changes accumulated by the handlers to FRR and update the commit counters """
+        start = time.time()
+        rc = self.cfg_manager.commit()
+        latency = time.time() - start
+        self.counters['commits'] += 1
+        self.counters['last_commit_latency'] = latency
+        self.counters['max_commit_latency'] = max(self.counters['max_commit_latency'], latency)
+        self.counters['total_commit_latency'] += latency
+        if not rc:
+            self.counters['failed_commits'] += 1
+            log_crit("Runner::commit was unsuccessful")
+        if self.batch_enabled and start - self.last_stats_log >= Runner.STATS_LOG_INTERVAL:
+            self.last_stats_log = start
+            log_info("Runner counters: %s" % ", ".join("%s=%s" % item for item in self.counters.items()))
+
+    def get_counters(self):
+        """ Return a copy of the batch and commit counters """
+        return dict(self.counters)
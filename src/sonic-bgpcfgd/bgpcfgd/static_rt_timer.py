@@ -7,6 +7,9 @@ class StaticRouteTimer(object):
     def __init__(self):
         self.db = swsscommon.SonicV2Connector()
         self.db.connect(self.db.APPL_DB)
+        self.pipe = None
+        self.sweep_sha = None
+        self.load_script()
         self.timer = None
         self.start = None
 
@@ -14,6 +17,23 @@ class StaticRouteTimer(object):
     DEFAULT_SLEEP = 60
     # keep same range as value defined in sonic-restapi/sonic_api.yaml
     MAX_TIMER     = 172800
+    # number of keys returned by one SCAN call and checked by one script call
+    SCAN_COUNT    = 1000
+    # Check the static routes passed as KEYS: skip routes without expiry,
+    # reset the refresh flag of refreshed routes, and delete the rest
+    SWEEP_SCRIPT  = """
+for i = 1, #KEYS do
+    local values = redis.call('HMGET', KEYS[i], 'expiry', 'refresh')
+    if values[1] ~= 'false' then
+        if values[2] == 'true' then
+            redis.call('HSET', KEYS[i], 'refresh', 'false')
+        else
+            redis.call('DEL', KEYS[i])
+        end
+    end
+end
+return #KEYS
+"""
 
     def set_timer(self):
         """ Check for custom route expiry time in STATIC_ROUTE_EXPIRY_TIME """
@@ -27,24 +47,56 @@ class StaticRouteTimer(object):
                 log_err("Custom static route expiry time of {}s is invalid!".format(timer))
         return
 
+    def load_script(self):
+        """ Create the pipeline and load the sweep script. The script is sent with EVAL if it can't be loaded """
+        try:
+            self.pipe = swsscommon.RedisPipeline(self.db.get_redis_client(self.db.APPL_DB))
+            self.sweep_sha = self.pipe.loadRedisScript(self.SWEEP_SCRIPT)
+        except Exception as e:
+            log_err("Can't load the static route expiry script: {}".format(str(e)))
+            self.sweep_sha = None
+
     def alarm(self):
         """ Clear unrefreshed static routes """
-        static_routes = self.db.keys(self.db.APPL_DB, "STATIC_ROUTE:*")
-        if static_routes is not None:
-            for sr in static_routes:
-                expiry = self.db.get(self.db.APPL_DB, sr, "expiry")
-                if expiry == "false":
-                    continue
-                refresh = self.db.get(self.db.APPL_DB, sr, "refresh")
-                if refresh == "true":
-                    self.db.set(self.db.APPL_DB, sr, "refresh", "false")
-                    log_debug("Refresh status of static route {} is set to false".format(sr))
-                else:
-                    self.db.delete(self.db.APPL_DB, sr)
-                    log_debug("Static route {} deleted".format(sr))
-        self.start = time.time()
+        try:
+            self.sweep_all()
+        except Exception as e:
+            # The script is lost when redis restarts. The sweep is not repeated right away,
+            # because a part of it could be applied already and a route refreshed once
+            # would be deleted by the second pass. The next alarm repeats it.
+            log_err("Expiry check of static routes failed: {}".format(str(e)))
+            self.load_script()
+        finally:
+            # The next alarm is a full expiry period later, after a failed sweep too
+            self.start = time.time()
         return
 
+    def sweep_all(self):
+        """ Check the expiry of all static routes """
+        # SCAN returns the keys page by page, and can return a key more than once.
+        # A key must be checked once per sweep, otherwise a refreshed route is deleted
+        swept = set()
+        cursor = 0
+        while True:
+            cursor, keys = self.db.scan(self.db.APPL_DB, cursor, "STATIC_ROUTE:*", self.SCAN_COUNT)
+            keys = [key for key in keys if key not in swept]
+            if keys:
+                swept.update(keys)
+                self.sweep(keys)
+            if cursor == 0:
+                break
+        self.pipe.flush()
+        log_debug("Expiry of {} static routes checked".format(len(swept)))
+
+    def sweep(self, keys):
+        """ Queue the expiry check of the static routes to the pipeline """
+        command = swsscommon.RedisCommand()
+        if self.sweep_sha:
+            command.format(["EVALSHA", self.sweep_sha, str(len(keys))] + keys)
+        else:
+            command.format(["EVAL", self.SWEEP_SCRIPT, str(len(keys))] + keys)
+        self.pipe.push(command)
+
     def run(self):
         self.start = time.time()
         while True:
@@ -23,9 +23,18 @@ Description: bgpmon.py -- populating bgp related information in stateDB.
     "previous" neighbor dictionary will be kept and used to determine if there
     is a need to perform update or the peer is stale to be removed from the
     state DB
+
+    In the "stream" mode the daemon follows frr.log instead of checking its
+    timestamp. Only the neighbors reported in "%ADJCHANGE" log messages are
+    requested from FRR with "show bgp summary neighbor <peer> json" and updated in the
+    state DB. The full snapshot is still requested every resync interval to
+    catch the state changes which are not logged, and when the log was rotated
+    or too many neighbors changed at once
 """
+import argparse
 import json
 import os
+import re
 import sys
 import syslog
 from swsscommon import swsscommon
@@ -33,6 +42,9 @@ import time
 from sonic_py_common.general import getstatusoutput_noshell
 
 PIPE_BATCH_MAX_COUNT = 50
+FRR_LOG_FILE = "/var/log/frr/frr.log"
+FRR_LOG_MAX_READ = 4 * 1024 * 1024  # read at most this number of bytes from frr.log at once
+RE_ADJCHANGE = re.compile(r'%ADJCHANGE: neighbor (\S+?)(?:\(\S*\))? in vrf (\S+) (Up|Down)')
 
 class BgpStateGet:
     def __init__(self):
@@ -50,6 +62,16 @@ class BgpStateGet:
         self.pipe = swsscommon.RedisPipeline(self.db.get_redis_client(self.db.STATE_DB))
         self.db.delete_all_by_pattern(self.db.STATE_DB, "NEIGH_STATE_TABLE|*" )
         self.MAX_RETRY_ATTEMPTS = 3
+        # position in frr.log used in the stream mode
+        self.log_inode = None
+        self.log_offset = 0
+        self.counters = {
+            'full_updates': 0,
+            'delta_updates': 0,
+            'delta_peers': 0,
+            'log_bytes_read': 0,
+            'state_db_updates': 0,
+        }
 
     # A quick way to check if there are anything happening within BGP is to
     # check its log file has any activities. This is by checking its modified
@@ -67,6 +89,106 @@ class BgpStateGet:
         except (IOError, OSError):
             return True
 
+    def read_changed_peers(self):
+        """Read new frr.log messages and extract neighbors which changed their state.
+        Returns:
+            a set of neighbor addresses from %ADJCHANGE messages of the default vrf.
+            None if the messages could be lost: the log file is read for the first time,
+            the log file was rotated or removed, or too much was written since the last read.
+        """
+        try:
+            st = os.stat(FRR_LOG_FILE)
+        except (IOError, OSError):
+            self.log_inode = None
+            return None
+        if st.st_ino != self.log_inode or st.st_size < self.log_offset or st.st_size - self.log_offset > FRR_LOG_MAX_READ:
+            self.log_inode = st.st_ino
+            self.log_offset = st.st_size
+            return None
+        if st.st_size == self.log_offset:
+            return set()
+        try:
+            with open(FRR_LOG_FILE, 'rb') as fp:
+                fp.seek(self.log_offset)
+                data = fp.read(st.st_size - self.log_offset)
+        except (IOError, OSError):
+            self.log_inode = None
+            return None
+        data = data[:data.rfind(b'\n') + 1]  # leave the incomplete line for the next read
+        self.log_offset += len(data)
+        self.counters['log_bytes_read'] += len(data)
+        peers = set()
+        for line in data.decode('utf-8', 'replace').splitlines():
+            m = RE_ADJCHANGE.search(line)
+            if m and m.group(2) == "default":
+                peers.add(m.group(1))
+        return peers
+
+    # Get states of the neighbors with one vtysh call
+    def get_neigh_states(self, peers):
+        """Request states of the neighbors from FRR.
+        The states are taken from "show bgp summary neighbor <peer> json", so they are
+        the same strings as in the full update, e.g. "Idle (Admin)", and only the
+        ipv4Unicast and ipv6Unicast neighbors are reported as in the full update.
+        Args:
+            peers: a list of neighbor addresses
+        Returns:
+            a dictionary: neighbor -> (state, remoteAs, localAs). None if FRR request failed.
+        """
+        cmd = ["vtysh", "-H", "/dev/null"]
+        for peer in peers:
+            cmd += ["-c", "show bgp summary neighbor %s json" % peer]
+        rc, output = getstatusoutput_noshell(cmd)
+        if rc:
+            syslog.syslog(syslog.LOG_WARNING, "*WARNING* Failed with rc:{} when execute: {}".format(rc, cmd))
+            return None
+        states = {}
+        decoder = json.JSONDecoder()
+        pos = 0
+        try:
+            while True:
+                while pos < len(output) and output[pos].isspace():
+                    pos += 1
+                if pos == len(output):
+                    break
+                peer_info, pos = decoder.raw_decode(output, pos)
+                for key, value in peer_info.items():
+                    if key == "ipv4Unicast" or key == "ipv6Unicast":
+                        for peer, peer_value in value.get("peers", {}).items():
+                            states[peer] = (peer_value["state"], peer_value["remoteAs"], peer_value["localAs"])
+        except (ValueError, KeyError, AttributeError) as decode_error:
+            syslog.syslog(syslog.LOG_WARNING, "*WARNING* JSONDecodeError: {} when execute: {}".format(decode_error, cmd))
+            return None
+        return states
+
+    def update_changed_neigh_states(self, peers):
+        """Update the state DB entries of the changed neighbors only.
+        Args:
+            peers: a list of neighbor addresses
+        Returns:
+            True if the entries were updated, False if a full update is required.
+        """
+        states = self.get_neigh_states(peers)
+        if states is None:
+            return False
+        # a known neighbor which isn't reported anymore has to be removed by the full update
+        if any(peer not in states and peer in self.peer_l for peer in peers):
+            return False
+        data = {}
+        for peer, (state, remote_as, local_as) in states.items():
+            if peer in self.peer_l and self.peer_state[peer] == state:
+                continue
+            peerType = "i-BGP" if remote_as == local_as else "e-BGP"
+            data["NEIGH_STATE_TABLE|%s" % peer] = {'state':state, 'peerType':peerType}
+            self.peer_state[peer] = state
+            self.peer_l.add(peer)
+        self.counters['delta_updates'] += 1
+        self.counters['delta_peers'] += len(peers)
+        self.counters['state_db_updates'] += len(data)
+        if len(data) > 0:
+            self.flush_pipe(data)
+        return True
+
     def update_new_peer_states(self, peer_dict):
         peer_l = peer_dict["peers"].keys()
         self.new_peer_l.update(peer_l)
@@ -185,7 +307,42 @@ class BgpStateGet:
         # Save the new set
         self.peer_l = self.new_peer_l.copy()
 
+def run_poll(bgp_state_get, interval):
+    # periodically obtain the new neighbor information and update if necessary
+    while True:
+        time.sleep(interval)
+        if bgp_state_get.bgp_activity_detected():
+            bgp_state_get.get_all_neigh_states()
+            bgp_state_get.update_neigh_states()
+
+def run_stream(bgp_state_get, interval, resync_interval, max_delta_peers):
+    # follow frr.log and update only the neighbors which changed their state
+    next_resync = 0
+    while True:
+        now = time.time()
+        peers = bgp_state_get.read_changed_peers()
+        if peers is None or now >= next_resync or len(peers) > max_delta_peers or \
+           (peers and not bgp_state_get.update_changed_neigh_states(sorted(peers))):
+            bgp_state_get.get_all_neigh_states()
+            bgp_state_get.update_neigh_states()
+            bgp_state_get.counters['full_updates'] += 1
+            next_resync = now + resync_interval
+            syslog.syslog(syslog.LOG_INFO, "bgpmon counters: {}".format(
+                ", ".join("%s=%s" % item for item in bgp_state_get.counters.items())))
+        time.sleep(interval)
+
 def main():
+    parser = argparse.ArgumentParser(description="Populate BGP neighbor states in the state DB")
+    parser.add_argument("--mode", choices=["poll", "stream"], default="poll",
+                        help="poll: request all neighbors when frr.log is modified; "
+                             "stream: request only neighbors reported as changed in frr.log")
+    parser.add_argument("--interval", type=float, default=None,
+                        help="seconds between checks. Default: 15 for poll mode, 1 for stream mode")
+    parser.add_argument("--resync-interval", type=float, default=300,
+                        help="seconds between full updates in stream mode")
+    parser.add_argument("--max-delta-peers", type=int, default=100,
+                        help="do a full update in stream mode if more neighbors changed")
+    args = parser.parse_args()
 
     syslog.syslog(syslog.LOG_INFO, "bgpmon service started")
     bgp_state_get = None
@@ -195,12 +352,12 @@ def main():
         syslog.syslog(syslog.LOG_ERR, "{}: error exit 1, reason {}".format("THIS_MODULE", str(e)))
         sys.exit(1)
 
-    # periodically obtain the new neighbor information and update if necessary
-    while True:
-        time.sleep(15)
-        if bgp_state_get.bgp_activity_detected():
-            bgp_state_get.get_all_neigh_states()
-            bgp_state_get.update_neigh_states()
+    if args.mode == "stream":
+        interval = args.interval if args.interval is not None else 1
+        run_stream(bgp_state_get, interval, args.resync_interval, args.max_delta_peers)
+    else:
+        interval = args.interval if args.interval is not None else 15
+        run_poll(bgp_state_get, interval)
 
 if __name__ == '__main__':
     main()
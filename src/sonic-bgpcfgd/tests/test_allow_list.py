@@ -1,6 +1,7 @@
 from unittest.mock import MagicMock, patch
 
 import bgpcfgd.frr
+from bgpcfgd.config_model import FRRConfigModel
 from bgpcfgd.directory import Directory
 from bgpcfgd.template import TemplateFabric
 import bgpcfgd
@@ -58,7 +59,7 @@ def set_del_test(op, args, currect_config, expected_config, update_global_defaul
     cfg_mgr = MagicMock()
     cfg_mgr.update.return_value = None
     cfg_mgr.push_list = push_list
-    cfg_mgr.get_text.return_value = currect_config
+    cfg_mgr.get_model.return_value = FRRConfigModel(currect_config)
     common_objs = {
         'directory': Directory(),
         'cfg_mgr':   cfg_mgr,
@@ -651,7 +652,7 @@ def test_set_handler_no_community_data_is_already_presented():
     from bgpcfgd.managers_allow_list import BGPAllowListMgr
     cfg_mgr = MagicMock()
     cfg_mgr.update.return_value = None
-    cfg_mgr.get_text.return_value = [
+    cfg_mgr.get_model.return_value = FRRConfigModel([
         'ip prefix-list PL_ALLOW_LIST_DEPLOYMENT_ID_5_COMMUNITY_empty_V4 seq 10 deny 0.0.0.0/0 le 17',
         'ip prefix-list PL_ALLOW_LIST_DEPLOYMENT_ID_5_COMMUNITY_empty_V4 seq 20 permit 20.20.30.0/24 le 32',
         'ip prefix-list PL_ALLOW_LIST_DEPLOYMENT_ID_5_COMMUNITY_empty_V4 seq 30 permit 40.50.0.0/16 le 32',
@@ -668,7 +669,7 @@ def test_set_handler_no_community_data_is_already_presented():
         'route-map ALLOW_LIST_DEPLOYMENT_ID_5_V6 permit 65535',
         ' set community 123:123 additive',
         ""
-    ]
+    ])
     common_objs = {
             'directory': Directory(),
             'cfg_mgr': cfg_mgr,
@@ -1023,7 +1024,7 @@ def test___find_peer_group():
     from bgpcfgd.managers_allow_list import BGPAllowListMgr
     cfg_mgr = MagicMock()
     cfg_mgr.update.return_value = None
-    cfg_mgr.get_text.return_value = [
+    cfg_mgr.get_model.return_value = FRRConfigModel([
         'router bgp 64601',
         ' neighbor BGPSLBPassive peer-group',
         ' neighbor BGPSLBPassive remote-as 65432',
@@ -1101,7 +1102,7 @@ def test___find_peer_group():
         'route-map TO_BGP_PEER_V4 permit 100',
         'route-map TO_BGP_PEER_V6 permit 100',
         'route-map TO_BGP_SPEAKER deny 1',
-    ]
+    ])
     common_objs = {
         'directory': Directory(),
         'cfg_mgr':   cfg_mgr,
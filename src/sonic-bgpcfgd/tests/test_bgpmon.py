@@ -0,0 +1,153 @@
+import json
+import pytest
+from unittest.mock import MagicMock, patch
+import bgpmon.bgpmon
+from bgpmon.bgpmon import BgpStateGet
+
+
+def summary(peers, af="ipv4Unicast"):
+    return json.dumps({af: {"peers": {peer: {"state": state, "remoteAs": remote_as, "localAs": 65100}
+                                      for peer, (state, remote_as) in peers.items()}}})
+
+@pytest.fixture
+@patch('swsscommon.swsscommon.RedisPipeline')
+@patch('swsscommon.swsscommon.SonicV2Connector')
+def bgp_state_get(mock_conn, mock_pipe):
+    m = BgpStateGet()
+    m.flushed = {}
+    def flush_pipe(data):
+        m.flushed.update(data)
+        data.clear()
+    m.flush_pipe = flush_pipe
+    return m
+
+@pytest.fixture
+def frr_log(tmp_path):
+    log = tmp_path / "frr.log"
+    log.write_text("")
+    with patch('bgpmon.bgpmon.FRR_LOG_FILE', str(log)):
+        yield log
+
+def append_log(log, text):
+    with open(str(log), "a") as fp:
+        fp.write(text)
+
+def test_read_changed_peers(bgp_state_get, frr_log):
+    # the first read only remembers the log position
+    assert bgp_state_get.read_changed_peers() is None
+    assert bgp_state_get.read_changed_peers() == set()
+    append_log(frr_log,
+               "2024/01/01 00:00:01 BGP: [M59KS-A3ZXZ] %ADJCHANGE: neighbor 10.0.0.1(ARISTA01T2) in vrf default Down Peer closed the session\n"
+               "2024/01/01 00:00:02 BGP: [M59KS-A3ZXZ] %ADJCHANGE: neighbor fc00::2 in vrf default Up\n"
+               "2024/01/01 00:00:03 BGP: [M59KS-A3ZXZ] %ADJCHANGE: neighbor 10.0.0.3 in vrf Vrf1 Up\n"
+               "2024/01/01 00:00:04 BGP: [RZMGQ-A03CG] 10.0.0.5 fd 26 went from Established to Clearing\n"
+               "2024/01/01 00:00:05 BGP: [M59KS-A3ZXZ] %ADJCHANGE: neighbor 10.0.0.7 in vrf def")
+    assert bgp_state_get.read_changed_peers() == {"10.0.0.1", "fc00::2"}
+    # the incomplete line is parsed when it is finished
+    append_log(frr_log, "ault Up\n")
+    assert bgp_state_get.read_changed_peers() == {"10.0.0.7"}
+    assert bgp_state_get.read_changed_peers() == set()
+
+def test_read_changed_peers_rotated(bgp_state_get, frr_log):
+    append_log(frr_log, "2024/01/01 00:00:01 BGP: started\n")
+    assert bgp_state_get.read_changed_peers() is None
+    frr_log.unlink()
+    assert bgp_state_get.read_changed_peers() is None
+    frr_log.write_text("")
+    assert bgp_state_get.read_changed_peers() is None
+    append_log(frr_log, "2024/01/01 00:00:02 BGP: %ADJCHANGE: neighbor 10.0.0.1 in vrf default Up\n")
+    assert bgp_state_get.read_changed_peers() == {"10.0.0.1"}
+
+def test_read_changed_peers_too_much(bgp_state_get, frr_log):
+    assert bgp_state_get.read_changed_peers() is None
+    append_log(frr_log, "2024/01/01 00:00:02 BGP: %ADJCHANGE: neighbor 10.0.0.1 in vrf default Up\n")
+    with patch('bgpmon.bgpmon.FRR_LOG_MAX_READ', 10):
+        assert bgp_state_get.read_changed_peers() is None
+    assert bgp_state_get.read_changed_peers() == set()
+
+@patch('bgpmon.bgpmon.getstatusoutput_noshell')
+def test_get_neigh_states(mocked_getstatusoutput, bgp_state_get):
+    mocked_getstatusoutput.return_value = (0, summary({"10.0.0.1": ("Idle (Admin)", 65200)}) + "\n" +
+                                              summary({"fc00::2": ("Established", 65100)}, "ipv6Unicast") + "\n" +
+                                              summary({"10.0.0.9": ("Established", 65200)}, "l2VpnEvpn") + "\n")
+    states = bgp_state_get.get_neigh_states(["10.0.0.1", "fc00::2", "10.0.0.9"])
+    assert states == {"10.0.0.1": ("Idle (Admin)", 65200, 65100), "fc00::2": ("Established", 65100, 65100)}
+    cmd = mocked_getstatusoutput.call_args[0][0]
+    assert cmd == ["vtysh", "-H", "/dev/null",
+                   "-c", "show bgp summary neighbor 10.0.0.1 json",
+                   "-c", "show bgp summary neighbor fc00::2 json",
+                   "-c", "show bgp summary neighbor 10.0.0.9 json"]
+
+@patch('bgpmon.bgpmon.getstatusoutput_noshell')
+def test_get_neigh_states_failure(mocked_getstatusoutput, bgp_state_get):
+    mocked_getstatusoutput.return_value = (1, "")
+    assert bgp_state_get.get_neigh_states(["10.0.0.1"]) is None
+    mocked_getstatusoutput.return_value = (0, "{\"ipv4Unicast\": ")
+    assert bgp_state_get.get_neigh_states(["10.0.0.1"]) is None
+
+@patch('bgpmon.bgpmon.getstatusoutput_noshell')
+def test_delta_and_full_states_match(mocked_getstatusoutput, bgp_state_get):
+    mocked_getstatusoutput.return_value = (0, summary({"10.0.0.1": ("Established", 65200),
+                                                       "10.0.0.3": ("Established", 65100)}))
+    bgp_state_get.get_all_neigh_states()
+    bgp_state_get.update_neigh_states()
+    assert bgp_state_get.flushed == {
+        "NEIGH_STATE_TABLE|10.0.0.1": {"state": "Established", "peerType": "e-BGP"},
+        "NEIGH_STATE_TABLE|10.0.0.3": {"state": "Established", "peerType": "i-BGP"},
+    }
+    bgp_state_get.flushed.clear()
+    mocked_getstatusoutput.return_value = (0, summary({"10.0.0.1": ("Idle (PfxCt)", 65200)}))
+    assert bgp_state_get.update_changed_neigh_states(["10.0.0.1"])
+    assert bgp_state_get.flushed == {"NEIGH_STATE_TABLE|10.0.0.1": {"state": "Idle (PfxCt)", "peerType": "e-BGP"}}
+    # the full update doesn't rewrite the state written by the delta update
+    bgp_state_get.flushed.clear()
+    mocked_getstatusoutput.return_value = (0, summary({"10.0.0.1": ("Idle (PfxCt)", 65200),
+                                                       "10.0.0.3": ("Established", 65100)}))
+    bgp_state_get.get_all_neigh_states()
+    bgp_state_get.update_neigh_states()
+    assert bgp_state_get.flushed == {}
+
+@patch('bgpmon.bgpmon.getstatusoutput_noshell')
+def test_delta_unknown_peer(mocked_getstatusoutput, bgp_state_get):
+    bgp_state_get.peer_l = {"10.0.0.1"}
+    bgp_state_get.peer_state = {"10.0.0.1": "Established"}
+    # a neighbor which isn't in the ipv4 or ipv6 unicast summary isn't added
+    mocked_getstatusoutput.return_value = (0, summary({"10.0.0.9": ("Established", 65200)}, "l2VpnEvpn"))
+    assert bgp_state_get.update_changed_neigh_states(["10.0.0.9"])
+    assert bgp_state_get.flushed == {}
+    assert bgp_state_get.peer_l == {"10.0.0.1"}
+    # a known neighbor which disappeared requires the full update
+    mocked_getstatusoutput.return_value = (0, summary({}))
+    assert not bgp_state_get.update_changed_neigh_states(["10.0.0.1"])
+    assert bgp_state_get.peer_l == {"10.0.0.1"}
+
+class StopLoop(Exception):
+    pass
+
+def run_stream(bgp_state_get, changed_peers, max_delta_peers=2, delta_result=True):
+    bgp_state_get.read_changed_peers = MagicMock(side_effect=changed_peers)
+    bgp_state_get.get_all_neigh_states = MagicMock()
+    bgp_state_get.update_neigh_states = MagicMock()
+    bgp_state_get.update_changed_neigh_states = MagicMock(return_value=delta_result)
+    with patch('bgpmon.bgpmon.time.sleep', side_effect=[None] * (len(changed_peers) - 1) + [StopLoop()]), \
+         patch('bgpmon.bgpmon.time.time', return_value=1000):
+        with pytest.raises(StopLoop):
+            bgpmon.bgpmon.run_stream(bgp_state_get, 1, 300, max_delta_peers)
+
+def test_run_stream_delta(bgp_state_get):
+    run_stream(bgp_state_get, [set(), set(), {"10.0.0.2", "10.0.0.1"}])
+    # the first iteration is the initial full update
+    assert bgp_state_get.get_all_neigh_states.call_count == 1
+    bgp_state_get.update_changed_neigh_states.assert_called_once_with(["10.0.0.1", "10.0.0.2"])
+    assert bgp_state_get.counters['full_updates'] == 1
+
+def test_run_stream_full_fallback(bgp_state_get):
+    # log lost, too many changed neighbors
+    run_stream(bgp_state_get, [set(), None, {"10.0.0.1", "10.0.0.2", "10.0.0.3"}])
+    assert bgp_state_get.get_all_neigh_states.call_count == 3
+    bgp_state_get.update_changed_neigh_states.assert_not_called()
+
+def test_run_stream_delta_failure(bgp_state_get):
+    run_stream(bgp_state_get, [set(), {"10.0.0.1"}], delta_result=False)
+    bgp_state_get.update_changed_neigh_states.assert_called_once_with(["10.0.0.1"])
+    assert bgp_state_get.get_all_neigh_states.call_count == 2
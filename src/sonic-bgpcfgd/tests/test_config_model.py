@@ -0,0 +1,169 @@
+from unittest.mock import MagicMock
+
+from bgpcfgd.config import ConfigMgr
+from bgpcfgd.config_model import FRRConfigModel
+
+
+running_config = [
+    'ip prefix-list PL_V4 seq 10 deny 0.0.0.0/0 le 17',
+    'ip prefix-list PL_V4 seq 20 permit 10.0.0.0/8 le 32',
+    'ipv6 prefix-list PL_V6 seq 10 deny ::/0 le 59',
+    'bgp community-list standard COMMUNITY_1 permit 1010:2020',
+    'route-map ALLOW_V4 permit 10',
+    ' match ip address prefix-list PL_V4',
+    ' match community COMMUNITY_1',
+    'route-map ALLOW_V4 permit 65535',
+    ' set community 123:123 additive',
+    'route-map FROM_PEER_V4 permit 100',
+    ' call ALLOW_V4',
+    'router bgp 64601',
+    ' neighbor PEER_V4 peer-group',
+    ' neighbor PEER_V6 peer-group',
+    ' address-family ipv4',
+    '  neighbor PEER_V4 route-map FROM_PEER_V4 in',
+    ' exit-address-family',
+    '     ',
+]
+
+
+def test_load():
+    model = FRRConfigModel(running_config)
+    assert list(model.get_prefix_list('ip', 'PL_V4').items()) == [(10, 'deny 0.0.0.0/0 le 17'), (20, 'permit 10.0.0.0/8 le 32')]
+    assert list(model.get_prefix_list('ipv6', 'PL_V6').values()) == ['deny ::/0 le 59']
+    assert not model.get_prefix_list('ipv6', 'PL_V4')
+    assert model.get_community_list('COMMUNITY_1') == [('standard', 'permit', '1010:2020')]
+    assert model.get_route_map('ALLOW_V4')[10] == {
+        'action': 'permit',
+        'lines': ['match ip address prefix-list PL_V4', 'match community COMMUNITY_1'],
+    }
+    assert model.get_route_map('FROM_PEER_V4')[100]['lines'] == ['call ALLOW_V4']
+    assert model.get_peer_groups() == ['PEER_V4', 'PEER_V6']
+    assert model.get_route_map_in('PEER_V4') == 'FROM_PEER_V4'
+    assert model.get_route_map_in('PEER_V6') is None
+
+
+def test_apply():
+    model = FRRConfigModel(running_config)
+    assert model.apply([
+        'no ip prefix-list PL_V4 seq 20',
+        'ip prefix-list PL_V4 seq 30 permit 20.0.0.0/8 le 32',
+        'no bgp community-list standard COMMUNITY_1',
+        'bgp community-list standard COMMUNITY_1 permit 3030:4040',
+        'no route-map ALLOW_V4 permit 10',
+        'route-map ALLOW_V4 permit 30000',
+        ' match ip address prefix-list PL_V4',
+        'router bgp 64601',
+        ' no neighbor PEER_V6 peer-group',
+        ' address-family ipv4',
+        '  no neighbor PEER_V4 route-map FROM_PEER_V4 in',
+        ' exit-address-family',
+        'exit',
+        'no ipv6 prefix-list PL_V6',
+    ])
+    assert list(model.get_prefix_list('ip', 'PL_V4').keys()) == [10, 30]
+    assert not model.get_prefix_list('ipv6', 'PL_V6')
+    assert model.get_community_list('COMMUNITY_1') == [('standard', 'permit', '3030:4040')]
+    assert list(model.get_route_map('ALLOW_V4').keys()) == [65535, 30000]
+    assert model.get_route_map('ALLOW_V4')[30000]['lines'] == ['match ip address prefix-list PL_V4']
+    assert model.get_peer_groups() == ['PEER_V4']
+    assert model.get_route_map_in('PEER_V4') is None
+
+
+def test_apply_route_map_in():
+    model = FRRConfigModel(running_config + [
+        'router bgp 64601',
+        ' address-family ipv6 unicast',
+        '  neighbor PEER_V6 route-map FROM_PEER_V6 in',
+        '  neighbor PEER_V4 route-map FROM_PEER_V4_V6 in',
+        ' exit-address-family',
+    ])
+    assert model.get_route_map_in('PEER_V4') == 'FROM_PEER_V4'
+    assert model.get_route_map_in('PEER_V4', 'ipv6 unicast') == 'FROM_PEER_V4_V6'
+    assert model.get_route_map_in('PEER_V6') == 'FROM_PEER_V6'
+    assert model.apply([
+        'router bgp 64601',
+        ' address-family ipv4',
+        '  neighbor PEER_V4 route-map NEW_FROM_PEER_V4 in',
+        ' exit-address-family',
+        ' address-family ipv6',
+        '  no neighbor PEER_V4 route-map FROM_PEER_V4_V6 in',
+        ' exit-address-family',
+        ' neighbor PEER_V6 route-map FROM_PEER_V6_V4 in',
+    ])
+    assert model.get_route_map_in('PEER_V4') == 'NEW_FROM_PEER_V4'
+    assert model.get_route_map_in('PEER_V4', 'ipv6 unicast') is None
+    assert model.get_route_map_in('PEER_V6', 'ipv4 unicast') == 'FROM_PEER_V6_V4'
+    assert model.get_route_map_in('PEER_V6', 'ipv6 unicast') == 'FROM_PEER_V6'
+    assert model.apply([
+        'router bgp 64601',
+        ' no neighbor PEER_V6 peer-group',
+    ])
+    assert model.get_route_map_in('PEER_V6') is None
+
+
+def test_apply_not_followed():
+    model = FRRConfigModel(running_config)
+    assert not model.apply([
+        'route-map ALLOW_V4 permit 65535',
+        ' set community 321:321 additive',
+    ])
+    model = FRRConfigModel(running_config)
+    assert not model.apply([
+        'route-map ALLOW_V4 permit 10',
+        ' no match community COMMUNITY_1',
+    ])
+
+
+def test_apply_route_map_sibling_lines():
+    model = FRRConfigModel(running_config)
+    # the lines share the first words, but are different commands
+    assert model.apply([
+        'route-map ALLOW_V4 permit 10',
+        ' match ip next-hop prefix-list PL_NH_V4',
+        ' match ip address PL_ACL',
+        'route-map ALLOW_V6 permit 10',
+        ' set ipv6 next-hop global fc00::1',
+        ' set ipv6 next-hop prefer-global',
+    ])
+    assert model.get_route_map('ALLOW_V4')[10]['lines'] == [
+        'match ip address prefix-list PL_V4', 'match community COMMUNITY_1',
+        'match ip next-hop prefix-list PL_NH_V4', 'match ip address PL_ACL',
+    ]
+    assert model.get_route_map('ALLOW_V6')[10]['lines'] == [
+        'set ipv6 next-hop global fc00::1', 'set ipv6 next-hop prefer-global',
+    ]
+    # the same command with another value replaces the line
+    assert not model.apply([
+        'route-map ALLOW_V4 permit 10',
+        ' match ip address prefix-list PL_V4_OTHER',
+    ])
+    model = FRRConfigModel(running_config)
+    assert not model.apply([
+        'route-map ALLOW_V6 permit 10',
+        ' set ipv6 next-hop global fc00::1',
+        ' set ipv6 next-hop global fc00::2',
+    ])
+
+
+def test_config_mgr_model_sync():
+    frr = MagicMock()
+    frr.get_config.return_value = "\n".join(running_config)
+    frr.write.return_value = True
+    frr.restart_peer_groups.return_value = True
+    c = ConfigMgr(frr)
+    c.update_model()
+    assert frr.get_config.call_count == 1
+    c.update_model()
+    assert frr.get_config.call_count == 1
+    c.push_list(['ip prefix-list PL_NEW seq 10 permit 30.0.0.0/8'])
+    assert c.commit()
+    assert list(c.get_model().get_prefix_list('ip', 'PL_NEW').values()) == ['permit 30.0.0.0/8']
+    c.update_model()
+    assert frr.get_config.call_count == 1
+    frr.write.return_value = False
+    c.push_list(['ip prefix-list PL_NEW seq 20 permit 40.0.0.0/8'])
+    assert not c.commit()
+    c.update_model()
+    assert frr.get_config.call_count == 2
+    c.update_model(force=True)
+    assert frr.get_config.call_count == 3
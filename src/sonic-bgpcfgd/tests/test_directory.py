@@ -55,3 +55,56 @@ def test_directory(mocked_log_err):
     # Test remove_slot() with nonexist table
     directory.remove_slot("db_name", "table_nonexist")
     mocked_log_err.assert_called_with("Directory: Can't remove slot 'db_name__table_nonexist'. The slot doesn't exist")
+
+def test_directory_notify():
+    directory = Directory()
+    handler_all = MagicMock()
+    handler_key1 = MagicMock()
+    handler_key2 = MagicMock()
+    directory.subscribe([("db_name", "table", "")], handler_all)
+    directory.subscribe([("db_name", "table", "key1/field")], handler_key1)
+    directory.subscribe([("db_name", "table", "key2"), ("db_name", "table", "key2/field")], handler_key2)
+
+    # Only the handlers subscribed to the updated key or to the whole slot are run
+    directory.put("db_name", "table", "key1", {"field": "value"})
+    assert handler_all.call_count == 1
+    assert handler_key1.call_count == 1
+    assert handler_key2.call_count == 0
+
+    # A handler subscribed to several paths of the key is run once
+    directory.put("db_name", "table", "key2", {"field": "value"})
+    assert handler_all.call_count == 2
+    assert handler_key1.call_count == 1
+    assert handler_key2.call_count == 1
+
+    # The handler isn't run until its path exists
+    directory.put("db_name", "table", "key1", {})
+    assert handler_key1.call_count == 1
+
+    directory.unsubscribe([("db_name", "table", "key1/field")])
+    directory.put("db_name", "table", "key1", {"field": "value"})
+    assert handler_key1.call_count == 1
+    assert handler_all.call_count == 4
+
+def test_directory_notify_batch():
+    directory = Directory()
+    calls = []
+    handler_all = MagicMock(side_effect=lambda: calls.append("all"))
+    handler_key1 = MagicMock(side_effect=lambda: calls.append("key1"))
+    directory.subscribe([("db_name", "table", "key1/field")], handler_key1)
+    directory.subscribe([("db_name", "table", "")], handler_all)
+
+    # The handlers are run once at the end of the batch, in the order they were notified
+    directory.begin_batch()
+    directory.put("db_name", "table", "key2", {"field": "value"})
+    directory.put("db_name", "table", "key1", {"field": "value"})
+    directory.put("db_name", "table", "key1", {"field": "other value"})
+    assert calls == []
+    directory.end_batch()
+    assert calls == ["all", "key1"]
+
+    # Outside of a batch every update notifies the handlers
+    directory.put("db_name", "table", "key1", {"field": "value"})
+    assert calls == ["all", "key1", "key1", "all"]
+    directory.end_batch()
+    assert handler_all.call_count == 2
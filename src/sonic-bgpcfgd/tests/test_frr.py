@@ -1,3 +1,5 @@
+import socket
+import threading
 from unittest.mock import patch
 import bgpcfgd.frr
 import pytest
@@ -66,3 +68,128 @@ def test_restart_peer_groups_fail(mocked_log_crit):
     res = f.restart_peer_groups(["pg_1", "pg_2"])
     assert not res, "Expect False return value"
     mocked_log_crit.assert_called_with("Can't restart bgp peer-group 'pg_2'. rc='1', out='some output', err='some error'")
+
+class FakeVtyServer(object):
+    """ Reply to every command like an FRR daemon. Commands which have 'fail' inside return rc=1.
+        The connection is closed without a reply on a command which has 'drop' inside """
+    def __init__(self, path):
+        self.commands = []
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(path)
+        self.sock.listen(1)
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        conn, _ = self.sock.accept()
+        buf = b""
+        while True:
+            data = conn.recv(4096)
+            if not data:
+                break
+            buf += data
+            while b'\0' in buf:
+                cmd, buf = buf.split(b'\0', 1)
+                self.commands.append(cmd.decode())
+                if b'drop' in cmd:
+                    conn.close()
+                    return
+                rc = 1 if b'fail' in cmd else 0
+                conn.sendall(b'out:' + cmd + b'\0\0\0' + bytes([rc]))
+        conn.close()
+
+def test_client_run_commands(tmp_path):
+    server = FakeVtyServer(str(tmp_path / "bgpd.vty"))
+    client = bgpcfgd.frr.FRRClient(str(tmp_path / "%s.vty"))
+    assert client.connect("bgpd")
+    assert not client.connect("zebra")
+    replies = client.run_commands("bgpd", ["show version", "fail command"])
+    assert replies == [(0, "out:show version"), (1, "out:fail command")]
+    assert client.run_commands("zebra", ["show version"]) is None
+    client.close()
+    server.thread.join(5)
+    assert server.commands == ["enable", "show version", "fail command"]
+
+def test_write_and_restart_with_client(tmp_path):
+    server = FakeVtyServer(str(tmp_path / "bgpd.vty"))
+    bgpcfgd.frr.run_command = lambda cmd: (0, "", "")
+    f = bgpcfgd.frr.FRR(["bgpd"], bgpcfgd.frr.FRRClient(str(tmp_path / "%s.vty")))
+    f.wait_for_daemons(5)
+    assert f.write("router bgp 65100\n neighbor 10.0.0.1 remote-as 65200\n!\nexit")
+    assert f.write("route-map RM permit 10\n set local-preference 100")  # written by vtysh
+    assert f.restart_peer_groups(["PEER_V6", "PEER_V4"])
+    assert not f.write("router bgp 65100\n fail neighbor")
+    f.client.close()
+    server.thread.join(5)
+    assert server.commands == [
+        "enable",
+        "configure terminal", "router bgp 65100", "neighbor 10.0.0.1 remote-as 65200", "exit", "end",
+        "clear bgp peer-group PEER_V4 soft in", "clear bgp peer-group PEER_V6 soft in",
+        "configure terminal", "router bgp 65100", "fail neighbor", "end",
+    ]
+
+def test_write_with_client_node_failed(tmp_path):
+    server = FakeVtyServer(str(tmp_path / "bgpd.vty"))
+    f = bgpcfgd.frr.FRR(["bgpd"], bgpcfgd.frr.FRRClient(str(tmp_path / "%s.vty")))
+    assert not f.write("router bgp 65100 vrf fail\n neighbor 10.0.0.1 remote-as 65200\n address-family ipv4\n  neighbor 10.0.0.1 activate\n exit\nexit")
+    assert not f.write("router bgp 65100\n address-family fail\n  neighbor 10.0.0.1 activate\n exit\nexit")
+    f.client.close()
+    server.thread.join(5)
+    # the commands after the failed node command aren't sent
+    assert server.commands == [
+        "enable",
+        "configure terminal", "router bgp 65100 vrf fail", "end",
+        "configure terminal", "router bgp 65100", "address-family fail", "end",
+    ]
+
+def test_wait_for_daemons_with_client(tmp_path):
+    server = FakeVtyServer(str(tmp_path / "bgpd.vty"))
+    commands = []
+    def run_command(cmd, **kwargs):
+        commands.append(cmd)
+        return 0, "zebra staticd", ""
+    bgpcfgd.frr.run_command = run_command
+    client = bgpcfgd.frr.FRRClient(str(tmp_path / "%s.vty"))
+    f = bgpcfgd.frr.FRR(["bgpd", "zebra", "staticd"], client)
+    f.wait_for_daemons(5)
+    # only bgpd is used through the client, the other daemons are checked by vtysh
+    assert list(client.socks.keys()) == ["bgpd"]
+    assert commands == [["vtysh", "-c", "show daemons"]]
+    client.close()
+    server.thread.join(5)
+
+def test_write_with_client_connection_lost(tmp_path):
+    server = FakeVtyServer(str(tmp_path / "bgpd.vty"))
+    written = []
+    def run_command(cmd, **kwargs):
+        with open(cmd[2]) as fp:
+            written.append(fp.read())
+        return 0, "", ""
+    bgpcfgd.frr.run_command = run_command
+    f = bgpcfgd.frr.FRR(["bgpd"], bgpcfgd.frr.FRRClient(str(tmp_path / "%s.vty")))
+    assert f.write("router bgp 65100\n neighbor 10.0.0.1 remote-as 65200\n address-family ipv4\n"
+                   "  neighbor 10.0.0.1 drop\n  neighbor 10.0.0.1 activate\n exit-address-family\nexit")
+    server.thread.join(5)
+    assert server.commands == [
+        "enable",
+        "configure terminal", "router bgp 65100", "neighbor 10.0.0.1 remote-as 65200", "address-family ipv4",
+        "neighbor 10.0.0.1 drop",
+    ]
+    # only the commands after the last applied batch are written with vtysh, inside their node
+    assert written == ["router bgp 65100\naddress-family ipv4\nneighbor 10.0.0.1 drop\n"
+                       "neighbor 10.0.0.1 activate\nexit-address-family\nexit\n"]
+
+def test_write_with_client_connection_lost_first_batch(tmp_path):
+    server = FakeVtyServer(str(tmp_path / "bgpd.vty"))
+    written = []
+    def run_command(cmd, **kwargs):
+        with open(cmd[2]) as fp:
+            written.append(fp.read())
+        return 0, "", ""
+    bgpcfgd.frr.run_command = run_command
+    f = bgpcfgd.frr.FRR(["bgpd"], bgpcfgd.frr.FRRClient(str(tmp_path / "%s.vty")))
+    config = "router bgp 65100 drop\n neighbor 10.0.0.1 remote-as 65200\nexit"
+    assert f.write(config)
+    server.thread.join(5)
+    # nothing was applied, the whole configuration is written with vtysh
+    assert written == [config + "\n"]
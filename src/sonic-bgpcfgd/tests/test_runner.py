@@ -0,0 +1,124 @@
+from unittest.mock import MagicMock, patch
+from collections import OrderedDict
+
+from . import swsscommon_test
+
+import sys
+sys.modules["swsscommon"] = swsscommon_test
+
+from bgpcfgd.directory import Directory
+from bgpcfgd.runner import Runner
+from swsscommon import swsscommon
+
+SET = swsscommon.SET_COMMAND
+DEL = swsscommon.DEL_COMMAND
+
+
+class FakeSubscriber(object):
+    def __init__(self, db, table, messages):
+        self.db = db
+        self.table = table
+        self.messages = list(messages)
+
+    def pop(self):
+        if self.messages:
+            return self.messages.pop(0)
+        return "", "", ()
+
+    def getDbConnector(self):
+        return MagicMock(getDbId=MagicMock(return_value=self.db))
+
+    def getTableName(self):
+        return self.table
+
+
+def constructor(subscribers, batch_max_size=1000):
+    cfg_mgr = MagicMock()
+    runner = Runner(cfg_mgr, batch_enabled=True, batch_max_size=batch_max_size, batch_max_time=0.1)
+    runner.selector = MagicMock()
+    runner.selector.select.return_value = (runner.selector.TIMEOUT, None)
+    runner.subscribers = subscribers
+    return runner
+
+
+def test_coalesce():
+    events = OrderedDict()
+    assert Runner.coalesce(events, "k1", SET, {"a": "1"})
+    assert not Runner.coalesce(events, "k1", SET, {"a": "2"})
+    assert events["k1"] == [(SET, {"a": "2"})]
+    assert not Runner.coalesce(events, "k1", DEL, {})
+    assert events["k1"] == [(DEL, {})]
+    assert Runner.coalesce(events, "k1", SET, {"a": "3"})
+    assert not Runner.coalesce(events, "k1", SET, {"a": "4"})
+    assert events["k1"] == [(DEL, {}), (SET, {"a": "4"})]
+
+
+def test_collect_and_dispatch_batch():
+    peers = FakeSubscriber(0, "BGP_NEIGHBOR", [
+        ("10.0.0.1", SET, (("asn", "65001"),)),
+        ("10.0.0.3", SET, (("asn", "65003"),)),
+        ("10.0.0.1", SET, (("asn", "65002"),)),
+        ("10.0.0.3", DEL, ()),
+    ])
+    metadata = FakeSubscriber(0, "DEVICE_METADATA", [
+        ("localhost", SET, (("bgp_asn", "65100"),)),
+    ])
+    runner = constructor([metadata, peers])
+    calls = []
+    runner.callbacks[0]["DEVICE_METADATA"].append(lambda key, op, data: calls.append(("meta", key, op, data)))
+    runner.callbacks[0]["BGP_NEIGHBOR"].append(lambda key, op, data: calls.append(("peer", key, op, data)))
+
+    runner.dispatch_batch(runner.collect_batch())
+    assert calls == [
+        ("meta", "localhost", SET, {"bgp_asn": "65100"}),
+        ("peer", "10.0.0.1", SET, {"asn": "65002"}),
+        ("peer", "10.0.0.3", DEL, {}),
+    ]
+    counters = runner.get_counters()
+    assert counters['batches'] == 1
+    assert counters['events'] == 5
+    assert counters['coalesced_events'] == 2
+    assert counters['last_batch_size'] == 5
+
+
+def test_dispatch_batch_directory_notify():
+    peers = FakeSubscriber(0, "BGP_NEIGHBOR", [
+        ("10.0.0.1", SET, (("asn", "65001"),)),
+        ("10.0.0.3", SET, (("asn", "65003"),)),
+    ])
+    runner = constructor([peers])
+    runner.directory = Directory()
+    calls = []
+    runner.directory.subscribe([("CONFIG_DB", "BGP_NEIGHBOR", "")], lambda: calls.append("deps"))
+    def handler(key, op, data):
+        runner.directory.put("CONFIG_DB", "BGP_NEIGHBOR", key, data)
+        calls.append(key)
+    runner.callbacks[0]["BGP_NEIGHBOR"].append(handler)
+
+    # the dependent handler is notified once for the whole batch
+    runner.dispatch_batch(runner.collect_batch())
+    assert calls == ["10.0.0.1", "10.0.0.3", "deps"]
+
+
+def test_batch_max_size():
+    messages = [("10.0.0.%d" % i, SET, ()) for i in range(10)]
+    runner = constructor([FakeSubscriber(0, "BGP_NEIGHBOR", messages)], batch_max_size=4)
+    batch = runner.collect_batch()
+    assert list(batch[0][1].keys()) == ["10.0.0.0", "10.0.0.1", "10.0.0.2", "10.0.0.3"]
+    batch = runner.collect_batch()
+    assert list(batch[0][1].keys()) == ["10.0.0.4", "10.0.0.5", "10.0.0.6", "10.0.0.7"]
+    assert runner.get_counters()['max_batch_size'] == 4
+
+
+@patch('bgpcfgd.runner.log_crit')
+def test_commit_counters(mocked_log_crit):
+    runner = constructor([])
+    runner.cfg_manager.commit.return_value = True
+    runner.commit()
+    runner.cfg_manager.commit.return_value = False
+    runner.commit()
+    counters = runner.get_counters()
+    assert counters['commits'] == 2
+    assert counters['failed_commits'] == 1
+    assert counters['max_commit_latency'] >= counters['last_commit_latency']
+    mocked_log_crit.assert_called_once()
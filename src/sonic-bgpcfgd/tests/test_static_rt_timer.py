@@ -0,0 +1,100 @@
+import pytest
+from unittest.mock import patch
+
+from bgpcfgd.static_rt_timer import StaticRouteTimer
+
+
+def constructor(pages, sha="sweep_sha"):
+    with patch('swsscommon.swsscommon.SonicV2Connector'), patch('swsscommon.swsscommon.RedisPipeline') as mock_pipe:
+        mock_pipe.return_value.loadRedisScript.return_value = sha
+        timer = StaticRouteTimer()
+    timer.db.scan.side_effect = pages
+    return timer
+
+def sweep_calls(timer, mock_command):
+    return [call[0][0] for call in mock_command.return_value.format.call_args_list]
+
+@patch('swsscommon.swsscommon.RedisCommand')
+def test_alarm_scan_pages(mock_command):
+    timer = constructor([(7, ["STATIC_ROUTE:10.0.0.0/24", "STATIC_ROUTE:10.0.1.0/24"]),
+                         (3, []),
+                         (0, ["STATIC_ROUTE:10.0.2.0/24"])])
+    timer.alarm()
+    assert [call[0][1:] for call in timer.db.scan.call_args_list] == \
+        [(0, "STATIC_ROUTE:*", StaticRouteTimer.SCAN_COUNT),
+         (7, "STATIC_ROUTE:*", StaticRouteTimer.SCAN_COUNT),
+         (3, "STATIC_ROUTE:*", StaticRouteTimer.SCAN_COUNT)]
+    assert sweep_calls(timer, mock_command) == [
+        ["EVALSHA", "sweep_sha", "2", "STATIC_ROUTE:10.0.0.0/24", "STATIC_ROUTE:10.0.1.0/24"],
+        ["EVALSHA", "sweep_sha", "1", "STATIC_ROUTE:10.0.2.0/24"],
+    ]
+    assert timer.pipe.push.call_count == 2
+    timer.pipe.flush.assert_called_once()
+    assert timer.start is not None
+
+@patch('swsscommon.swsscommon.RedisCommand')
+def test_alarm_duplicate_keys(mock_command):
+    # SCAN can return a key again; the refreshed route must not be checked twice
+    timer = constructor([(5, ["STATIC_ROUTE:10.0.0.0/24", "STATIC_ROUTE:10.0.1.0/24"]),
+                         (0, ["STATIC_ROUTE:10.0.1.0/24", "STATIC_ROUTE:10.0.0.0/24"])])
+    timer.alarm()
+    assert sweep_calls(timer, mock_command) == [
+        ["EVALSHA", "sweep_sha", "2", "STATIC_ROUTE:10.0.0.0/24", "STATIC_ROUTE:10.0.1.0/24"],
+    ]
+    timer.pipe.flush.assert_called_once()
+
+@patch('swsscommon.swsscommon.RedisCommand')
+def test_alarm_no_routes(mock_command):
+    timer = constructor([(0, [])])
+    timer.alarm()
+    timer.pipe.push.assert_not_called()
+    timer.pipe.flush.assert_called_once()
+
+@patch('swsscommon.swsscommon.RedisCommand')
+def test_alarm_script_lost(mock_command):
+    timer = constructor([(0, ["STATIC_ROUTE:10.0.0.0/24"]), (0, ["STATIC_ROUTE:10.0.0.0/24"])])
+    failed_pipe = timer.pipe
+    failed_pipe.flush.side_effect = RuntimeError("NOSCRIPT No matching script. Please use EVAL.")
+    with patch('swsscommon.swsscommon.RedisPipeline') as mock_pipe:
+        mock_pipe.return_value.loadRedisScript.return_value = "new_sha"
+        timer.alarm()
+        # the failed sweep isn't repeated right away, the script is loaded again
+        assert timer.start is not None
+        assert timer.pipe is mock_pipe.return_value
+        assert timer.sweep_sha == "new_sha"
+        timer.alarm()
+    assert sweep_calls(timer, mock_command)[-1] == ["EVALSHA", "new_sha", "1", "STATIC_ROUTE:10.0.0.0/24"]
+    timer.pipe.flush.assert_called_once()
+    assert timer.start is not None
+
+@patch('swsscommon.swsscommon.RedisCommand')
+def test_alarm_script_not_loaded(mock_command):
+    timer = constructor([(0, ["STATIC_ROUTE:10.0.0.0/24"])])
+    with patch('swsscommon.swsscommon.RedisPipeline') as mock_pipe:
+        mock_pipe.return_value.loadRedisScript.side_effect = RuntimeError("LOADING Redis is loading the dataset in memory")
+        timer.load_script()
+    assert timer.sweep_sha is None
+    timer.alarm()
+    assert sweep_calls(timer, mock_command) == [
+        ["EVAL", StaticRouteTimer.SWEEP_SCRIPT, "1", "STATIC_ROUTE:10.0.0.0/24"],
+    ]
+
+class StopLoop(Exception):
+    pass
+
+@patch('swsscommon.swsscommon.RedisCommand')
+def test_run_default_timer_after_failed_sweep(mock_command):
+    timer = constructor([(0, ["STATIC_ROUTE:10.0.0.0/24"]), (0, ["STATIC_ROUTE:10.0.0.0/24"])])
+    timer.db.get.return_value = None
+    timer.pipe.flush.side_effect = [RuntimeError("LOADING Redis is loading the dataset in memory"), None]
+    pipe = timer.pipe
+    with patch('swsscommon.swsscommon.RedisPipeline', return_value=pipe), \
+         patch('bgpcfgd.static_rt_timer.time.sleep', side_effect=[None, None, None, StopLoop()]) as mock_sleep, \
+         patch('bgpcfgd.static_rt_timer.time.time', side_effect=[0, 180, 180, 240, 360, 360]):
+        with pytest.raises(StopLoop):
+            timer.run()
+    # the sweep failed at 180s, it isn't retried at 240s, but a full period later at 360s
+    assert mock_sleep.call_count == 4
+    assert timer.db.scan.call_count == 2
+    assert pipe.flush.call_count == 2
+    assert timer.start == 360
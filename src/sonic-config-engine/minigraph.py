@@ -1,12 +1,15 @@
 from __future__ import print_function
 
+import hashlib
 import ipaddress
 import math
 import os
+import stat
 import sys
 import json
 import jinja2
 import subprocess
+import tempfile
 from collections import defaultdict
 
 
@@ -87,6 +90,12 @@ CHASSIS_CARD_PACKET = 'chassis-packet'
 CHASSIS_CARD_FABRIC = 'Fabric'
 voq_internal_intfs =  ['cpu', 'recirc', 'inband']
 
+# Directory holding the on-disk summary cache of parsed minigraph files; set
+# the MINIGRAPH_CACHE_DIR environment variable to an empty string to disable it.
+# The directory is created with mode 0700 and only used if it is owned by root
+# or the current user and is not writable by others
+MINIGRAPH_CACHE_DIR = os.environ.get('MINIGRAPH_CACHE_DIR', '/run/sonic-cfggen/minigraph_cache')
+
 def get_asic_switch_id(slot_index, asic_name):
     asic_id = 0
     if slot_index is None:
@@ -1959,6 +1968,144 @@ def update_forced_mgmt_route(mgmt_intf, mgmt_routes):
         if len(forced_mgmt_routes) > 0:
             mgmt_intf[mgmt_intf_key]['forced_mgmt_routes'] = forced_mgmt_routes
 
+###############################################################################
+#
+# Parsed minigraph cache
+#
+###############################################################################
+
+class MinigraphDoc(object):
+    """ Minigraph xml parsed in one streaming pass.
+
+    The top level sections (DpgDec, PngDec, CpgDec, MetadataDeclaration, ...)
+    are indexed by tag name while the file is read, so the parse_* functions
+    can share a single tree instead of each of them re-parsing the file.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.sections = {}
+        self.hostname = None
+        self.root = None
+        self._parse()
+
+    def _parse(self):
+        hostname_tag = str(QName(ns, "Hostname"))
+        depth = 0
+        for event, elem in ET.iterparse(self.filename, events=('start', 'end')):
+            if event == 'start':
+                if self.root is None:
+                    self.root = elem
+                depth += 1
+                continue
+            depth -= 1
+            if depth != 1:
+                continue
+            # elem is a direct child of the root node
+            if elem.tag == hostname_tag:
+                if self.hostname is None:
+                    self.hostname = elem.text
+            else:
+                self.sections.setdefault(QName(elem).localname, elem)
+
+    def section(self, name):
+        return self.sections.get(name)
+
+_minigraph_docs = {}
+
+def get_minigraph_doc(filename):
+    """ Return the parsed minigraph, reusing the parse done earlier in this
+    process as long as the file has not been modified since.
+    """
+    path = os.path.realpath(filename)
+    st = os.stat(path)
+    stamp = (st.st_mtime, st.st_size)
+    cached = _minigraph_docs.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    doc = MinigraphDoc(path)
+    _minigraph_docs[path] = (stamp, doc)
+    return doc
+
+def _minigraph_file_hash(path):
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+def _minigraph_cache_dir_trusted():
+    try:
+        st = os.lstat(MINIGRAPH_CACHE_DIR)
+    except (IOError, OSError):
+        return False
+    return (stat.S_ISDIR(st.st_mode) and st.st_uid in (0, os.geteuid()) and
+            not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH))
+
+def _minigraph_summary_path(path):
+    return os.path.join(MINIGRAPH_CACHE_DIR, hashlib.sha1(path.encode('utf-8')).hexdigest() + '.json')
+
+def _load_minigraph_summary(path):
+    """ Load the on-disk summary of a minigraph file.
+
+    The summary is valid while the file mtime and size are unchanged; when they
+    changed it is still reused if the sha256 of the content matches.
+    """
+    st = os.stat(path)
+    stamp = [st.st_mtime, st.st_size]
+    if not MINIGRAPH_CACHE_DIR or (os.path.lexists(MINIGRAPH_CACHE_DIR) and not _minigraph_cache_dir_trusted()):
+        # The summary is not stored, no need to hash the file
+        return {'stamp': stamp, 'values': {}}
+
+    summary = None
+    try:
+        with open(_minigraph_summary_path(path)) as f:
+            summary = json.load(f)
+    except (IOError, OSError, ValueError):
+        summary = None
+
+    if summary is not None and summary.get('stamp') != stamp:
+        if summary.get('sha256') == _minigraph_file_hash(path):
+            summary['stamp'] = stamp
+        else:
+            summary = None
+
+    if summary is None:
+        summary = {'stamp': stamp, 'sha256': _minigraph_file_hash(path), 'values': {}}
+    return summary
+
+def _store_minigraph_summary(path, summary):
+    if not MINIGRAPH_CACHE_DIR:
+        return
+    try:
+        if not os.path.lexists(MINIGRAPH_CACHE_DIR):
+            os.makedirs(MINIGRAPH_CACHE_DIR, mode=0o700)
+        if not _minigraph_cache_dir_trusted():
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=MINIGRAPH_CACHE_DIR)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(summary, f)
+        os.rename(tmp_path, _minigraph_summary_path(path))
+    except (IOError, OSError):
+        # The cache is only an optimization, failing to write it is not an error
+        pass
+
+def get_minigraph_summary_value(filename, key, compute):
+    """ Return a value derived from the minigraph, using the on-disk summary cache.
+
+    Keyword arguments:
+    filename -- minigraph file name
+    key -- name of the value in the summary cache
+    compute -- callable taking a MinigraphDoc, called on a cache miss
+    """
+    path = os.path.realpath(filename)
+    summary = _load_minigraph_summary(path)
+    values = summary['values']
+    if key not in values:
+        values[key] = compute(get_minigraph_doc(path))
+        _store_minigraph_summary(path, summary)
+    return values[key]
+
 ###############################################################################
 #
 # Main functions
@@ -1976,7 +2123,7 @@ def parse_xml(filename, platform=None, port_config_file=None, asic_name=None, hw
     fabric_port_config_file -- fabric port config file name
      """
 
-    root = ET.parse(filename).getroot()
+    root = get_minigraph_doc(filename).root
 
     u_neighbors = None
     u_devices = None
@@ -2882,37 +3029,37 @@ def parse_device_desc_xml(filename):
     return results
 
 def parse_hostname(filename):
-    hostName = None
     if not os.path.isfile(filename):
         return None
-    root = ET.parse(filename).getroot()
-    hostname_qn = QName(ns, "Hostname")
-    for child in root:
-        if child.tag == str(hostname_qn):
-            hostName = child.text
-            break
+    return get_minigraph_summary_value(filename, 'hostname', lambda doc: doc.hostname)
 
-    return hostName
+def _parse_doc_asic_sub_role(doc, asic_name):
+    meta = doc.section("MetadataDeclaration")
+    if meta is None:
+        return None
+    sub_role, _, _, _, _, _ = parse_asic_meta(meta, asic_name)
+    return sub_role
 
 def parse_asic_sub_role(filename, asic_name):
     if not os.path.isfile(filename):
         return None
-    root = ET.parse(filename).getroot()
-    for child in root:
-        if child.tag == str(QName(ns, "MetadataDeclaration")):
-            sub_role, _, _, _, _, _= parse_asic_meta(child, asic_name)
-            return sub_role
+    return get_minigraph_summary_value(filename, 'sub_role:{}'.format(asic_name),
+                                       lambda doc: _parse_doc_asic_sub_role(doc, asic_name))
+
+def _parse_doc_asic_switch_type(doc, asic_name, hostname):
+    switch_type, _ = get_chassis_type_and_hostname(doc.root, hostname)
+    if switch_type:
+        return switch_type
+    meta = doc.section("MetadataDeclaration")
+    if meta is None:
+        return None
+    _, _, switch_type, _, _, _ = parse_asic_meta(meta, asic_name)
+    return switch_type
 
 def parse_asic_switch_type(filename, asic_name, hostname):
     if os.path.isfile(filename):
-        root = ET.parse(filename).getroot()
-        switch_type, _ = get_chassis_type_and_hostname(root, hostname)
-        if switch_type:
-            return switch_type
-        for child in root:
-            if child.tag == str(QName(ns, "MetadataDeclaration")):
-                _, _, switch_type, _, _, _ = parse_asic_meta(child, asic_name)
-                return switch_type
+        return get_minigraph_summary_value(filename, 'switch_type:{}:{}'.format(asic_name, hostname),
+                                           lambda doc: _parse_doc_asic_switch_type(doc, asic_name, hostname))
     return None
 
 def parse_asic_meta_get_devices(root):
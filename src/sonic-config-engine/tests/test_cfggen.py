@@ -1,5 +1,7 @@
 import json
+import shutil
 import subprocess
+import tempfile
 import os
 import tests.common_utils as utils
 
@@ -214,6 +216,28 @@ class TestCfgGen(TestCase):
         for key, value in data.items():
             self.assertEqual(output_data[key.replace("key", "jk")], value)
 
+    def test_template_manifest_mode(self):
+        manifest = [
+            {'template': os.path.join(self.test_dir, 'test.j2'), 'destination': self.output_file},
+            {'template': os.path.join(self.test_dir, 'test2.j2'), 'destination': self.output2_file}
+        ]
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as manifest_file:
+            json.dump(manifest, manifest_file)
+        bytecode_cache = tempfile.mkdtemp()
+        argument = ['-y', os.path.join(self.test_dir, 'test.yml')]
+        argument += ['-a', '{"key1":"value"}']
+        argument += ['--manifest', manifest_file.name, '--bytecode-cache', bytecode_cache]
+        try:
+            self.run_script(argument)
+            with open(self.output_file) as tf:
+                self.assertEqual(tf.read().strip(), 'value1\nvalue2')
+            with open(self.output2_file) as tf:
+                self.assertEqual(tf.read().strip(), 'value')
+            self.assertEqual(len(os.listdir(bytecode_cache)), 2)
+        finally:
+            os.remove(manifest_file.name)
+            shutil.rmtree(bytecode_cache)
+
     # FIXME: This test depends heavily on the ordering of the interfaces and
     # it is not at all intuitive what that ordering should be. Could make it
     # more robust by adding better parsing logic.
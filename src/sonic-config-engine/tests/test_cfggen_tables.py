@@ -0,0 +1,178 @@
+import argparse
+import contextlib
+import copy
+import fnmatch
+import io
+import json
+import os
+import sys
+
+from unittest import TestCase, mock
+from sonic_py_common.general import load_module_from_source
+
+import tests.common_utils as utils
+
+TEST_DIR = os.path.dirname(os.path.realpath(__file__))
+TABLES_DIR = os.path.join(TEST_DIR, 'tables')
+
+CONFIG_DB = {
+    'DEVICE_METADATA': {'localhost': {'hostname': 'SONiC-Host', 'type': 'ToRRouter'}},
+    'PORT': {
+        'Ethernet4': {'speed': '100000', 'lanes': '5,6,7,8'},
+        'Ethernet0': {'speed': '40000', 'lanes': '1,2,3,4'},
+    },
+    'VLAN': {'Vlan1000': {'vlanid': '1000'}, 'Vlan2000': {'vlanid': '2000'}},
+    'BUFFER_PG': {'Ethernet0|3-4': {'profile': 'pg_lossless_40000_5m_profile'}},
+    'ACL_TABLE': {'DATAACL': {'type': 'L3'}},
+}
+
+
+class FakeRedisCommand(object):
+    def format(self, args):
+        self.args = args
+
+
+class FakeRedisReply(object):
+    """ Run CONFIG_TABLES_SCRIPT on CONFIG_DB """
+    def __init__(self, client, command):
+        assert command.args[:3] == ['EVAL', client.script, '0']
+        if client.script_error:
+            raise RuntimeError(client.script_error)
+        client.script_calls.append(command.args[3:])
+        self.result = {}
+        for pattern in command.args[3:]:
+            for table, entries in CONFIG_DB.items():
+                for row, entry in entries.items():
+                    if fnmatch.fnmatchcase(table + '|' + row, pattern):
+                        self.result[table + '|' + row] = entry
+
+    def to_string(self):
+        return json.dumps(self.result)
+
+
+class FakeConfigDB(object):
+    TABLE_NAME_SEPARATOR = '|'
+    db_name = 'CONFIG_DB'
+    script_error = None
+
+    def __init__(self, *args, **kwargs):
+        self.tables_read = []
+        self.script_calls = []
+        self.config_read = False
+        FakeConfigDB.instance = self
+
+    def connect(self, *args, **kwargs):
+        pass
+
+    def get_redis_client(self, db_name):
+        assert db_name == self.db_name
+        return self
+
+    def raw_to_typed(self, raw_data):
+        return copy.deepcopy(raw_data)
+
+    def deserialize_key(self, key):
+        return key
+
+    def get_table(self, table):
+        self.tables_read.append(table)
+        return copy.deepcopy(CONFIG_DB.get(table, {}))
+
+    def get_config(self):
+        self.config_read = True
+        return copy.deepcopy(CONFIG_DB)
+
+
+class TestCfgGenTables(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cfggen = load_module_from_source('sonic_cfggen', os.path.join(TEST_DIR, '..', 'sonic-cfggen'))
+        FakeConfigDB.script = cls.cfggen.CONFIG_TABLES_SCRIPT
+
+    def setUp(self):
+        os.environ["CFGGEN_UNIT_TESTING"] = "2"
+        self.env = self.cfggen._get_jinja2_env([TABLES_DIR])
+
+    def tearDown(self):
+        os.environ["CFGGEN_UNIT_TESTING"] = ""
+
+    def run_main(self, argument):
+        output = io.StringIO()
+        with mock.patch.object(self.cfggen, 'ConfigDBPipeConnector', FakeConfigDB), \
+             mock.patch.object(self.cfggen, 'RedisCommand', FakeRedisCommand), \
+             mock.patch.object(self.cfggen, 'RedisReply', FakeRedisReply), \
+             mock.patch.object(self.cfggen.device_info, 'get_platform', return_value=None), \
+             mock.patch.object(sys, 'argv', ['sonic-cfggen'] + argument), \
+             contextlib.redirect_stdout(output):
+            self.cfggen.main()
+        return output.getvalue()
+
+    def test_template_tables(self):
+        # Tables used by included and imported templates and in filter arguments are found
+        tables = self.cfggen._get_template_tables(self.env, [os.path.join(TABLES_DIR, 'main.j2')])
+        self.assertEqual(tables, {'DEVICE_METADATA', 'PORT', 'VLAN', 'BUFFER_PG'})
+
+    def test_template_tables_dynamic_include(self):
+        # The included template is computed at render time, the whole config DB is needed
+        self.assertIsNone(self.cfggen._get_template_tables(self.env, ['dynamic.j2']))
+        self.assertIsNone(self.cfggen._get_template_tables(self.env, ['include.j2', 'dynamic.j2']))
+
+    def test_db_tables(self):
+        args = argparse.Namespace(tables=None, print_data=False, write_to_db=False)
+        self.assertEqual(self.cfggen._get_db_tables(args, self.env, ['include.j2']), {'VLAN'})
+        self.assertIsNone(self.cfggen._get_db_tables(args, self.env, []))
+        args.print_data = True
+        self.assertIsNone(self.cfggen._get_db_tables(args, self.env, ['include.j2']))
+        args.print_data = False
+        args.write_to_db = True
+        self.assertIsNone(self.cfggen._get_db_tables(args, self.env, ['include.j2']))
+        args.tables = ['PORT', 'ACL_TABLE']
+        self.assertEqual(self.cfggen._get_db_tables(args, self.env, ['include.j2']), ['PORT', 'ACL_TABLE'])
+
+    def test_config_tables(self):
+        configdb = FakeConfigDB()
+        with mock.patch.object(self.cfggen, 'RedisCommand', FakeRedisCommand), \
+             mock.patch.object(self.cfggen, 'RedisReply', FakeRedisReply):
+            data = self.cfggen._get_config_tables(configdb, ['PORT', 'VLAN', 'NOT_EXIST'])
+        self.assertEqual(data, {'PORT': CONFIG_DB['PORT'], 'VLAN': CONFIG_DB['VLAN']})
+        # All tables are read with one script call
+        self.assertEqual(configdb.script_calls, [['PORT|*', 'VLAN|*', 'NOT_EXIST|*']])
+        self.assertEqual(configdb.tables_read, [])
+
+    def test_config_tables_script_failed(self):
+        configdb = FakeConfigDB()
+        configdb.script_error = 'NOSCRIPT'
+        with mock.patch.object(self.cfggen, 'RedisCommand', FakeRedisCommand), \
+             mock.patch.object(self.cfggen, 'RedisReply', FakeRedisReply), \
+             contextlib.redirect_stderr(io.StringIO()):
+            data = self.cfggen._get_config_tables(configdb, ['PORT', 'NOT_EXIST'])
+        self.assertEqual(data, {'PORT': CONFIG_DB['PORT']})
+        self.assertEqual(configdb.tables_read, ['PORT', 'NOT_EXIST'])
+
+    def test_template_from_db(self):
+        output = self.run_main(['-d', '-t', os.path.join(TABLES_DIR, 'main.j2')])
+        self.assertEqual(output.strip().split('\n'), [
+            'vlans: 2',
+            'Ethernet0 40000 1',
+            'Ethernet4 100000 1',
+            'sonic-host',
+        ])
+        self.assertEqual(len(FakeConfigDB.instance.script_calls), 1)
+        self.assertEqual(sorted(FakeConfigDB.instance.script_calls[0]), ['BUFFER_PG|*', 'DEVICE_METADATA|*', 'PORT|*', 'VLAN|*'])
+        self.assertFalse(FakeConfigDB.instance.config_read)
+
+    def test_template_dynamic_include_from_db(self):
+        with self.assertRaises(Exception):
+            # ToRRouter.j2 doesn't exist, but the whole config DB is read to look for it
+            self.run_main(['-d', '-t', os.path.join(TABLES_DIR, 'dynamic.j2')])
+        self.assertTrue(FakeConfigDB.instance.config_read)
+        self.assertEqual(FakeConfigDB.instance.script_calls, [])
+
+    def test_tables_print_data(self):
+        output = self.run_main(['-d', '--tables', 'PORT,ACL_TABLE,NOT_EXIST', '--print-data'])
+        self.assertEqual(FakeConfigDB.instance.script_calls, [['PORT|*', 'ACL_TABLE|*', 'NOT_EXIST|*']])
+        self.assertFalse(FakeConfigDB.instance.config_read)
+        sample_output_file = os.path.join(TEST_DIR, 'sample_output', utils.PYvX_DIR, 'cfggen_tables.json')
+        with open(sample_output_file) as f:
+            self.assertEqual(json.loads(output), json.load(f))
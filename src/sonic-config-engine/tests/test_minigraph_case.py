@@ -1,11 +1,13 @@
 import json
 import os
+import shutil
 import subprocess
+import tempfile
 import ipaddress
 import tests.common_utils as utils
 import minigraph
 
-from unittest import TestCase
+from unittest import TestCase, mock
 
 TOR_ROUTER = 'ToRRouter'
 BACKEND_TOR_ROUTER = 'BackEndToRRouter'
@@ -575,3 +577,46 @@ class TestCfgGenCaseInsensitive(TestCase):
         # TC2: For other minigraph, result should not contain FLEX_COUNTER_TABLE
         result = minigraph.parse_xml(self.sample_graph, port_config_file=self.port_config)
         self.assertNotIn('FLEX_COUNTER_TABLE', result)
+
+    def test_minigraph_doc_reused(self):
+        doc = minigraph.get_minigraph_doc(self.sample_graph)
+        self.assertIs(doc, minigraph.get_minigraph_doc(self.sample_graph))
+        self.assertEqual(doc.hostname, 'switch-t0')
+        for section in ['DpgDec', 'PngDec', 'CpgDec', 'MetadataDeclaration']:
+            self.assertIsNotNone(doc.section(section))
+
+    def test_minigraph_summary_cache(self):
+        cache_dir = tempfile.mkdtemp()
+        with mock.patch('minigraph.MINIGRAPH_CACHE_DIR', cache_dir):
+            self.assertEqual(minigraph.parse_hostname(self.sample_graph), 'switch-t0')
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+            # A cached value is served without looking at the parsed tree again
+            with mock.patch('minigraph.get_minigraph_doc') as mock_get_doc:
+                self.assertEqual(minigraph.parse_hostname(self.sample_graph), 'switch-t0')
+                mock_get_doc.assert_not_called()
+        shutil.rmtree(cache_dir)
+
+    def test_minigraph_summary_cache_dir(self):
+        cache_root = tempfile.mkdtemp()
+        cache_dir = os.path.join(cache_root, 'minigraph_cache')
+        try:
+            with mock.patch('minigraph.MINIGRAPH_CACHE_DIR', cache_dir):
+                self.assertEqual(minigraph.parse_hostname(self.sample_graph), 'switch-t0')
+                self.assertEqual(os.stat(cache_dir).st_mode & 0o777, 0o700)
+                self.assertEqual(len(os.listdir(cache_dir)), 1)
+                # A directory writable by others is not trusted
+                os.chmod(cache_dir, 0o777)
+                with mock.patch('minigraph._minigraph_file_hash') as mock_hash, \
+                     mock.patch('minigraph.get_minigraph_doc', wraps=minigraph.get_minigraph_doc) as mock_get_doc:
+                    self.assertEqual(minigraph.parse_hostname(self.sample_graph), 'switch-t0')
+                    mock_get_doc.assert_called()
+                    mock_hash.assert_not_called()
+                self.assertEqual(len(os.listdir(cache_dir)), 1)
+        finally:
+            shutil.rmtree(cache_root)
+
+    def test_minigraph_summary_cache_disabled(self):
+        with mock.patch('minigraph.MINIGRAPH_CACHE_DIR', ''), \
+             mock.patch('minigraph._minigraph_file_hash') as mock_hash:
+            self.assertEqual(minigraph.parse_hostname(self.sample_graph), 'switch-t0')
+            mock_hash.assert_not_called()
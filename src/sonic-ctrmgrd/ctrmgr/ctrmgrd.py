@@ -1,12 +1,16 @@
 #!/usr/bin/env python3
 
 import datetime
+import heapq
 import inspect
+import itertools
 import json
+import math
 import os
 import sys
 import syslog
 import subprocess
+import time
 from collections import defaultdict
 from ctrmgr.ctrmgr_iptables import iptable_proxy_rule_upd
 
@@ -180,13 +184,23 @@ class MainServer:
 
     SELECT_TIMEOUT = 1000
 
+    # Max messages popped from a subscriber in one round, so a busy table
+    # does not starve others
+    MAX_POPS_PER_SUBSCRIBER = 16
+    # Max messages handled per select wake-up, so due timers are not delayed
+    MAX_MESSAGES_PER_WAKEUP = 256
+
     def __init__(self):
         """ Constructor """
         self.db_connectors = {}
         self.selector = swsscommon.Select()
         self.callbacks = defaultdict(lambda: defaultdict(list))  # db -> table -> handlers[]
-        self.timer_handlers = defaultdict(list)
-        self.subscribers = set()
+        self.timer_heap = []        # (ts, seq, handler, args)
+        self.timer_seq = itertools.count()
+        self.subscribers = []
+        # handler name -> {"count", "total_ms", "max_ms"}
+        self.handler_stats = defaultdict(
+                lambda: {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
 
     def register_db(self, db_name):
         """ Get DB connector, if not there """
@@ -198,7 +212,8 @@ class MainServer:
         """ Register timer based handler.
             The handler will be called on/after give timestamp, ts
         """
-        self.timer_handlers[ts].append((handler, args))
+        # Sequence keeps timers of same timestamp in registration order
+        heapq.heappush(self.timer_heap, (ts, next(self.timer_seq), handler, args))
 
 
     def register_handler(self, db_name, table_name, handler):
@@ -212,7 +227,7 @@ class MainServer:
         if table_name not in self.callbacks[db_name]:
             conn = self.db_connectors[db_name]
             subscriber = swsscommon.SubscriberStateTable(conn, table_name)
-            self.subscribers.add(subscriber)
+            self.subscribers.append(subscriber)
             self.selector.addSelectable(subscriber)
         self.callbacks[db_name][table_name].append(handler)
 
@@ -246,24 +261,83 @@ class MainServer:
         tbl.set(key, list(data.items()))
 
 
+    def call_handler(self, handler, *args):
+        """ Call handler and record its latency """
+        start = time.monotonic()
+        try:
+            handler(*args)
+        finally:
+            elapsed = (time.monotonic() - start) * 1000
+            stats = self.handler_stats[getattr(handler, "__qualname__", str(handler))]
+            stats["count"] += 1
+            stats["total_ms"] += elapsed
+            stats["max_ms"] = max(stats["max_ms"], elapsed)
+
+
+    def get_handler_stats(self):
+        """ Return latency stats of handlers: name -> count, avg_ms & max_ms """
+        return {name: {"count": st["count"],
+                       "avg_ms": st["total_ms"] / st["count"] if st["count"] else 0,
+                       "max_ms": st["max_ms"]}
+                for name, st in self.handler_stats.items()}
+
+
+    def run_timers(self):
+        """ Call all due timer handlers.
+            Return timeout in milliseconds till next timer
+        """
+        while self.timer_heap:
+            ct_ts = datetime.datetime.now()
+            ts, _, handler, args = self.timer_heap[0]
+            if ts > ct_ts:
+                timeout = math.ceil((ts - ct_ts).total_seconds() * 1000)
+                return min(timeout, MainServer.SELECT_TIMEOUT)
+            heapq.heappop(self.timer_heap)
+            if args is None:
+                self.call_handler(handler)
+            else:
+                self.call_handler(handler, *args)
+        return MainServer.SELECT_TIMEOUT
+
+
+    def handle_message(self, subscriber, key, op, fvs):
+        """ Call handlers registered for the subscriber's table """
+        if subscriber.getTableName() == FEATURE_TABLE and key in DISABLED_FEATURE_SET:
+            return
+        log_debug("Received message : '%s'" % str((key, op, fvs)))
+        for callback in (self.callbacks
+                [subscriber.getDbConnector().getDbName()]
+                [subscriber.getTableName()]):
+            self.call_handler(callback, key, op, dict(fvs))
+
+
+    def drain_subscribers(self):
+        """ Pop messages from all subscribers until empty.
+            Subscribers are served round robin with per round cap,
+            and total messages per call is capped.
+        """
+        cnt = 0
+        pending = list(self.subscribers)
+        while pending and cnt < MainServer.MAX_MESSAGES_PER_WAKEUP:
+            next_pending = []
+            for subscriber in pending:
+                for _ in range(MainServer.MAX_POPS_PER_SUBSCRIBER):
+                    key, op, fvs = subscriber.pop()
+                    if not key:
+                        break
+                    cnt += 1
+                    self.handle_message(subscriber, key, op, fvs)
+                else:
+                    # Cap reached; may have more
+                    next_pending.append(subscriber)
+            pending = next_pending
+        return cnt
+
+
     def run(self):
         """ Main loop """
         while True:
-            timeout = MainServer.SELECT_TIMEOUT
-            ct_ts = datetime.datetime.now()
-            while self.timer_handlers:
-                k = sorted(self.timer_handlers.keys())[0]
-                if k <= ct_ts:
-                    lst = self.timer_handlers[k]
-                    del self.timer_handlers[k]
-                    for fn in lst:
-                        if fn[1] is None:
-                            fn[0]()
-                        else:
-                            fn[0](*fn[1])
-                else:
-                    timeout = (k - ct_ts).seconds
-                    break
+            timeout = self.run_timers()
 
             state, _ = self.selector.select(timeout)
             if state == self.selector.TIMEOUT:
@@ -275,17 +349,7 @@ class MainServer:
                     log_debug("Skipped Exception; Received error from select")
                     return
 
-            for subscriber in self.subscribers:
-                key, op, fvs = subscriber.pop()
-                if not key:
-                    continue
-                if subscriber.getTableName() == FEATURE_TABLE and key in DISABLED_FEATURE_SET:
-                    continue
-                log_debug("Received message : '%s'" % str((key, op, fvs)))
-                for callback in (self.callbacks
-                        [subscriber.getDbConnector().getDbName()]
-                        [subscriber.getTableName()]):
-                    callback(key, op, dict(fvs))
+            self.drain_subscribers()
 
 
 
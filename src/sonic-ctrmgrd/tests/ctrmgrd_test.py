@@ -609,3 +609,60 @@ class TestContainerStartup(object):
             ret = common_test.check_kube_actions()
             assert ret == 0
         self.clear()
+
+
+    @patch("ctrmgrd.swsscommon.Select")
+    def test_timers(self, mock_select):
+        server = ctrmgrd.MainServer()
+        called = []
+        now = ctrmgrd.datetime.datetime.now()
+        server.register_timer(now - ctrmgrd.datetime.timedelta(seconds=1),
+                called.append, ("second",))
+        server.register_timer(now - ctrmgrd.datetime.timedelta(seconds=2),
+                called.append, ("first",))
+        server.register_timer(now + ctrmgrd.datetime.timedelta(milliseconds=500),
+                called.append, ("later",))
+
+        timeout = server.run_timers()
+        assert called == ["first", "second"]
+        # Sub-second timeout is not truncated
+        assert 0 < timeout <= 500
+        stats = server.get_handler_stats()
+        assert list(stats.values())[0]["count"] == 2
+
+
+    @patch("ctrmgrd.swsscommon.Select")
+    def test_drain_subscribers(self, mock_select):
+        class subscriber:
+            def __init__(self, tbl, cnt):
+                self.tbl = tbl
+                self.msgs = [("key{}".format(i), "SET", {}) for i in range(cnt)]
+
+            def pop(self):
+                return self.msgs.pop(0) if self.msgs else ("", "", {})
+
+            def getTableName(self):
+                return self.tbl
+
+            def getDbConnector(self):
+                return MagicMock(getDbName=MagicMock(return_value="CONFIG_DB"))
+
+        server = ctrmgrd.MainServer()
+        received = []
+        busy = subscriber("BUSY", 1000)
+        quiet = subscriber("QUIET", 2)
+        server.subscribers = [busy, quiet]
+        server.callbacks["CONFIG_DB"]["BUSY"].append(
+                lambda key, op, data: received.append(("BUSY", key)))
+        server.callbacks["CONFIG_DB"]["QUIET"].append(
+                lambda key, op, data: received.append(("QUIET", key)))
+
+        cnt = server.drain_subscribers()
+        # Cap is checked per round
+        assert ctrmgrd.MainServer.MAX_MESSAGES_PER_WAKEUP <= cnt < 1002
+        # Quiet table is served in first round, not behind the busy one
+        assert ("QUIET", "key1") in received[:ctrmgrd.MainServer.MAX_POPS_PER_SUBSCRIBER + 2]
+
+        while server.drain_subscribers():
+            pass
+        assert len(received) == 1002
@@ -21,6 +21,7 @@ class ConfigDbEventChecker(object):
     table_name = ""
     subscriber_state_table = None
     enabled = False
+    table_changed = True
 
     def __init__(self, sel, db):
         """
@@ -33,6 +34,8 @@ class ConfigDbEventChecker(object):
         self.db = db
         self.subscriber_state_table = None
         self.enabled = False
+        # Whether any event of subscribe table has been received since last call of pop_table_changed
+        self.table_changed = True
 
     @classmethod
     def get_parameter_by_name(cls, db_snapshot, param_name):
@@ -69,6 +72,8 @@ class ConfigDbEventChecker(object):
         self.subscriber_state_table = swsscommon.SubscriberStateTable(self.db, self.table_name)
         self.sel.addSelectable(self.subscriber_state_table)
         self.enabled = True
+        # Table is not monitored before enabled, hence its content is unknown
+        self.table_changed = True
 
     def disable(self):
         """
@@ -91,6 +96,17 @@ class ConfigDbEventChecker(object):
             sys.exit(1)
         while self.subscriber_state_table.hasData():
             _, _, _ = self.subscriber_state_table.pop()
+            self.table_changed = True
+
+    def pop_table_changed(self):
+        """
+        Get whether subscribe table changed since last call and reset the flag
+        Returns:
+            If changed, return True, else return False
+        """
+        table_changed = self.table_changed
+        self.table_changed = False
+        return table_changed
 
     @abstractmethod
     def _get_parameter(self, db_snapshot):
@@ -129,6 +145,7 @@ class ConfigDbEventChecker(object):
         need_refresh = False
         while self.subscriber_state_table.hasData():
             key, op, entry = self.subscriber_state_table.pop()
+            self.table_changed = True
             need_refresh |= self._process_check(key, op, entry, parameter)
             if need_refresh:
                 self.clear_event()
@@ -532,3 +549,19 @@ class DhcpServdDbMonitor(object):
             else:
                 need_refresh |= checker.check_update_event(db_snapshot)
         return need_refresh
+
+    def get_unchanged_tables(self):
+        """
+        Get tables which are monitored and have no update since last call. Tables not monitored are treated as changed
+        Returns:
+            Set of table names
+        """
+        monitored_tables = set()
+        changed_tables = set()
+        for checker in self.checker_dict.values():
+            if not checker.is_enabled():
+                continue
+            monitored_tables.add(checker.table_name)
+            if checker.pop_table_changed():
+                changed_tables.add(checker.table_name)
+        return monitored_tables - changed_tables
@@ -44,15 +44,20 @@ class DhcpServCfgGenerator(object):
         self.lease_path = lease_path
         self.lease_update_script_path = lease_update_script_path
         self.hook_lib_path = hook_lib_path
+        # Tables read from config_db in last generation, used to skip reading tables which are not changed
+        self.config_db_tables = {}
         # Read port alias map file, this file is render after container start, so it would not change any more
         self._parse_port_map_alias()
         # Get kea config template
         self._get_render_template(kea_conf_template_path)
         self._read_dhcp_option(dhcp_option_path)
 
-    def generate(self):
+    def generate(self, unchanged_tables=None):
         """
         Generate dhcp server config
+        Args:
+            unchanged_tables: set of table names not changed since last generation, content of them would be taken
+                              from the last read instead of config_db
         Returns:
             config string
             set of ranges used
@@ -62,20 +67,20 @@ class DhcpServCfgGenerator(object):
         """
         # Generate from running config_db
         # Get host name
-        device_metadata = self.db_connector.get_config_db_table("DEVICE_METADATA")
+        device_metadata = self._get_config_db_table("DEVICE_METADATA", unchanged_tables)
         hostname = self._parse_hostname(device_metadata)
         smart_switch = is_smart_switch(device_metadata)
         # Get ip information of vlan
-        vlan_interface = self.db_connector.get_config_db_table(VLAN_INTERFACE)
-        vlan_member_table = self.db_connector.get_config_db_table(VLAN_MEMBER)
+        vlan_interface = self._get_config_db_table(VLAN_INTERFACE, unchanged_tables)
+        vlan_member_table = self._get_config_db_table(VLAN_MEMBER, unchanged_tables)
         vlan_interfaces, vlan_members = self._parse_vlan(vlan_interface, vlan_member_table)
 
         # Parse dpu
-        dpus_table = self.db_connector.get_config_db_table(DPUS)
-        mid_plane_table = self.db_connector.get_config_db_table(MID_PLANE_BRIDGE)
+        dpus_table = self._get_config_db_table(DPUS, unchanged_tables)
+        mid_plane_table = self._get_config_db_table(MID_PLANE_BRIDGE, unchanged_tables)
         mid_plane, dpus = self._parse_dpu(dpus_table, mid_plane_table) if smart_switch else ({}, {})
 
-        dhcp_server_ipv4, customized_options_ipv4, range_ipv4, port_ipv4 = self._get_dhcp_ipv4_tables_from_db()
+        dhcp_server_ipv4, customized_options_ipv4, range_ipv4, port_ipv4 = self._get_dhcp_ipv4_tables_from_db(unchanged_tables)
         # Parse range table
         ranges = self._parse_range(range_ipv4)
 
@@ -269,16 +274,33 @@ class DhcpServCfgGenerator(object):
         }
         return render_obj, enabled_dhcp_interfaces, used_options, subscribe_table
 
-    def _get_dhcp_ipv4_tables_from_db(self):
+    def _get_config_db_table(self, table_name, unchanged_tables=None):
+        """
+        Get table from config_db, or from last read if it is not changed.
+        Args:
+            table_name: Name of table want to get.
+            unchanged_tables: set of table names not changed since last read.
+        Returns:
+            Table object.
+        """
+        if unchanged_tables is not None and table_name in unchanged_tables and table_name in self.config_db_tables:
+            return self.config_db_tables[table_name]
+        table = self.db_connector.get_config_db_table(table_name)
+        self.config_db_tables[table_name] = table
+        return table
+
+    def _get_dhcp_ipv4_tables_from_db(self, unchanged_tables=None):
         """
         Get DHCP Server IPv4 related table from config_db.
+        Args:
+            unchanged_tables: set of table names not changed since last read.
         Returns:
             Four table objects.
         """
-        dhcp_server_ipv4 = self.db_connector.get_config_db_table(DHCP_SERVER_IPV4)
-        customized_options_ipv4 = self.db_connector.get_config_db_table(DHCP_SERVER_IPV4_CUSTOMIZED_OPTIONS)
-        range_ipv4 = self.db_connector.get_config_db_table(DHCP_SERVER_IPV4_RANGE)
-        port_ipv4 = self.db_connector.get_config_db_table(DHCP_SERVER_IPV4_PORT)
+        dhcp_server_ipv4 = self._get_config_db_table(DHCP_SERVER_IPV4, unchanged_tables)
+        customized_options_ipv4 = self._get_config_db_table(DHCP_SERVER_IPV4_CUSTOMIZED_OPTIONS, unchanged_tables)
+        range_ipv4 = self._get_config_db_table(DHCP_SERVER_IPV4_RANGE, unchanged_tables)
+        port_ipv4 = self._get_config_db_table(DHCP_SERVER_IPV4_PORT, unchanged_tables)
         return dhcp_server_ipv4, customized_options_ipv4, range_ipv4, port_ipv4
 
     def _get_vlan_ipv4_interface(self, vlan_interface_keys):
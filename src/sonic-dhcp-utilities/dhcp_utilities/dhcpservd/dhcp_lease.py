@@ -1,15 +1,17 @@
+import os
 import signal
 import syslog
 import threading
 import time
 from abc import abstractmethod
-from collections import deque
 from datetime import datetime
 from dhcp_utilities.common.utils import is_smart_switch
+from swsscommon import swsscommon
 
 DHCP_SERVER_IPV4_LEASE = "DHCP_SERVER_IPV4_LEASE"
 KEA_LEASE_FILE_PATH = "/tmp/kea-lease.csv"
 DEFAULE_LEASE_UPDATE_INTERVAL = 2  # unit: sec
+KEA_LEASE_MIN_COLUMNS = 6
 
 
 class LeaseManager(object):
@@ -30,6 +32,8 @@ class LeaseHanlder(object):
         self.lease_update_interval = lease_update_interval
         self.last_update_time = None
         self.lock = threading.Lock()
+        # Leases in STATE_DB, read from STATE_DB once and then kept in sync with what is written
+        self.written_lease = None
         device_metadata = self.db_connector.get_config_db_table("DEVICE_METADATA")
         self.is_smart_switch = is_smart_switch(device_metadata)
 
@@ -67,37 +71,57 @@ class LeaseHanlder(object):
                 return
         if not self.lock.acquire(False):
             return
-        new_lease = self._read()
-        # Store old lease key
-        old_lease_table = self.db_connector.get_state_db_table(DHCP_SERVER_IPV4_LEASE)
-        old_lease_key = set(old_lease_table.keys())
-
-        # 1.1 If start time equal to end time or lease expired, means lease has been released
-        #     1.1.1 If current lease table has this old lease, delete it
-        #     1.1.2 Else skip
-        # 1.2 Else, means lease valid, save it.
-        for key, value in new_lease.items():
+        try:
+            new_lease = self._read()
+            if self.written_lease is None:
+                self.written_lease = self.db_connector.get_state_db_table(DHCP_SERVER_IPV4_LEASE)
+
+            # 1.1 If start time equal to end time or lease expired, means lease has been released
+            #     1.1.1 If current lease table has this old lease, delete it
+            #     1.1.2 Else skip
+            # 1.2 Else, means lease valid, save it if it changed.
+            # 2. Delete old lease not in new lease set
+            # All changes are written with one pipeline
+            pipe = swsscommon.RedisPipeline(self.db_connector.state_db)
             unix_time = datetime.now().timestamp()
-            if value["lease_start"] == value["lease_end"] or unix_time >= int(value["lease_end"]):
-                if key in old_lease_key:
-                    self.db_connector.state_db.delete("{}|{}".format(DHCP_SERVER_IPV4_LEASE, key))
-                continue
-            new_key = "{}|{}".format(DHCP_SERVER_IPV4_LEASE, key)
-            for k, v in new_lease[key].items():
-                self.db_connector.state_db.hset(new_key, k, v)
-        # Delete old lease not in new lease set
-        for key in old_lease_key:
-            if key not in new_lease.keys():
-                # Delete entry
-                self.db_connector.state_db.delete("{}|{}".format(DHCP_SERVER_IPV4_LEASE, key))
-        self.last_update_time = datetime.now()
-        self.lock.release()
+            for key, value in new_lease.items():
+                if value["lease_start"] == value["lease_end"] or unix_time >= int(value["lease_end"]):
+                    if key in self.written_lease:
+                        self._push_lease_delete(pipe, key)
+                    continue
+                if self.written_lease.get(key) != value:
+                    command = swsscommon.RedisCommand()
+                    command.formatHSET("{}|{}".format(DHCP_SERVER_IPV4_LEASE, key), value)
+                    pipe.push(command)
+                    self.written_lease[key] = dict(value)
+            for key in [key for key in self.written_lease if key not in new_lease]:
+                self._push_lease_delete(pipe, key)
+            pipe.flush()
+        except Exception:
+            # STATE_DB may be out of sync with written_lease, read it again next time
+            self.written_lease = None
+            raise
+        finally:
+            self.last_update_time = datetime.now()
+            self.lock.release()
+
+    def _push_lease_delete(self, pipe, key):
+        command = swsscommon.RedisCommand()
+        command.formatDEL("{}|{}".format(DHCP_SERVER_IPV4_LEASE, key))
+        pipe.push(command)
+        del self.written_lease[key]
 
 
 class KeaDhcp4LeaseHandler(LeaseHanlder):
     def __init__(self, db_connector, lease_file=KEA_LEASE_FILE_PATH):
         LeaseHanlder.__init__(self, db_connector)
         self.lease_file = lease_file
+        # The lease file is only appended by kea-dhcp4 until LFC replaces it, so it is read from the offset where
+        # the previous read stopped. Newest lease of each client read so far is kept in self.lease_index
+        self.lease_file_inode = None
+        self.lease_file_offset = 0
+        self.lease_columns = KEA_LEASE_MIN_COLUMNS
+        self.lease_index = {}
 
     def register(self):
         """
@@ -114,35 +138,52 @@ class KeaDhcp4LeaseHandler(LeaseHanlder):
     def _read(self):
         # Read lease file generated by kea-dhcp4
         try:
-            with open(self.lease_file, "r", encoding="utf-8") as fb:
-                dq = deque(fb)
+            with open(self.lease_file, "rb") as fb:
+                stat = os.fstat(fb.fileno())
+                if stat.st_ino != self.lease_file_inode or stat.st_size < self.lease_file_offset:
+                    # LFC replaced the lease file, read the new file from the beginning
+                    self.lease_file_inode = stat.st_ino
+                    self.lease_file_offset = 0
+                    self.lease_columns = KEA_LEASE_MIN_COLUMNS
+                    self.lease_index = {}
+                fb.seek(self.lease_file_offset)
+                data = fb.read()
         except FileNotFoundError as err:
             syslog.syslog(syslog.LOG_ERR, "Cannot find lease file: {}".format(self.lease_file))
             raise err
 
-        new_lease = {}
-        # Get newest lease information of each client
-        while dq:
-            last_row = dq.pop()
-            splits = last_row.split(",")
-            # Skip header
-            if splits[0] == "address":
-                break
-            ip_str = splits[0]
-            mac_address = splits[1]
-            valid_lifetime = splits[3]
-            lease_end = splits[4]
-            subnet_id = splits[5]
-
-            new_key = self._lease_key(subnet_id, mac_address)
-            if new_key in new_lease:
-                continue
-            new_lease[new_key] = {
-                "lease_start": str(int(lease_end) - int(valid_lifetime)),
-                "lease_end": lease_end,
-                "ip": ip_str
-            }
-        return new_lease
+        # Offset moves past complete lines only. A last line without newline is parsed only if it has all columns,
+        # and it is read again next time in case kea-dhcp4 is still writing it
+        end = data.rfind(b"\n") + 1
+        self.lease_file_offset += end
+        for row in data[:end].decode("utf-8").splitlines():
+            self._parse_row(row)
+        if end < len(data):
+            self._parse_row(data[end:].decode("utf-8", errors="replace"), partial=True)
+        return dict(self.lease_index)
+
+    def _parse_row(self, row, partial=False):
+        """
+        Update lease index with one row of lease file, newer row of a client replaces the older one
+        """
+        splits = row.strip().split(",")
+        if splits[0] == "address":
+            # Header
+            self.lease_columns = max(len(splits), KEA_LEASE_MIN_COLUMNS)
+            return
+        if len(splits) < (self.lease_columns if partial else KEA_LEASE_MIN_COLUMNS):
+            return
+        ip_str = splits[0]
+        mac_address = splits[1]
+        valid_lifetime = splits[3]
+        lease_end = splits[4]
+        subnet_id = splits[5]
+
+        self.lease_index[self._lease_key(subnet_id, mac_address)] = {
+            "lease_start": str(int(lease_end) - int(valid_lifetime)),
+            "lease_end": lease_end,
+            "ip": ip_str
+        }
 
     def _update_lease(self, signum, frame):
         self.update_lease()
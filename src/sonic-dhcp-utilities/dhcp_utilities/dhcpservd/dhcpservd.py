@@ -1,6 +1,9 @@
 #!/usr/bin/env python
+import hashlib
+import json
 import psutil
 import signal
+import socket
 import time
 import subprocess
 import sys
@@ -15,6 +18,9 @@ from swsscommon import swsscommon
 
 KEA_DHCP4_CONFIG = "/etc/kea/kea-dhcp4.conf"
 KEA_DHCP4_PROC_NAME = "kea-dhcp4"
+KEA_DHCP4_CTRL_SOCKET = "/run/kea/kea4-ctrl-socket"
+KEA_CTRL_SOCKET_TIMEOUT = 10  # second
+KEA_CTRL_RESULT_SUCCESS = 0
 KEA_LEASE_FILE_PATH = "/tmp/kea-lease.csv"
 REDIS_SOCK_PATH = "/var/run/redis/redis.sock"
 DHCP_SERVER_IPV4_SERVER_IP = "DHCP_SERVER_IPV4_SERVER_IP"
@@ -27,12 +33,16 @@ class DhcpServd(object):
     enabled_checker = None
     dhcp_servd_monitor = None
 
-    def __init__(self, dhcp_cfg_generator, db_connector, monitor, kea_dhcp4_config_path=KEA_DHCP4_CONFIG):
+    def __init__(self, dhcp_cfg_generator, db_connector, monitor, kea_dhcp4_config_path=KEA_DHCP4_CONFIG,
+                 kea_dhcp4_ctrl_socket_path=KEA_DHCP4_CTRL_SOCKET):
         self.dhcp_cfg_generator = dhcp_cfg_generator
         self.db_connector = db_connector
         self.kea_dhcp4_config_path = kea_dhcp4_config_path
+        self.kea_dhcp4_ctrl_socket_path = kea_dhcp4_ctrl_socket_path
         self.dhcp_servd_monitor = monitor
         self.enabled_checker = None
+        # Hash of kea-dhcp4 config applied last time, used to skip reloading kea-dhcp4 if config is not changed
+        self.kea_dhcp4_config_hash = None
 
     def _notify_kea_dhcp4_proc(self):
         """
@@ -46,12 +56,50 @@ class DhcpServd(object):
             except psutil.NoSuchProcess:
                 continue
 
-    def dump_dhcp4_config(self):
+    def _send_kea_dhcp4_config(self, kea_dhcp4_config):
+        """
+        Send config to kea-dhcp4 process by config-set command of control socket
+        Args:
+            kea_dhcp4_config: config string
+        Returns:
+            If kea-dhcp4 accepts the config, return True, else return False
+        """
+        try:
+            command = {
+                "command": "config-set",
+                "arguments": json.loads(kea_dhcp4_config)
+            }
+            response = b""
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(KEA_CTRL_SOCKET_TIMEOUT)
+                sock.connect(self.kea_dhcp4_ctrl_socket_path)
+                sock.sendall(json.dumps(command).encode())
+                # kea-dhcp4 closes connection after response sent
+                while True:
+                    data = sock.recv(4096)
+                    if not data:
+                        break
+                    response += data
+            result = json.loads(response.decode())
+        except (OSError, ValueError) as e:
+            syslog.syslog(syslog.LOG_WARNING, "Failed to send config to kea-dhcp4 by control socket: {}".format(e))
+            return False
+        # Response would be a list if command is forwarded by control agent
+        if isinstance(result, list):
+            result = result[0] if len(result) > 0 else {}
+        if not isinstance(result, dict) or result.get("result") != KEA_CTRL_RESULT_SUCCESS:
+            syslog.syslog(syslog.LOG_WARNING, "kea-dhcp4 failed to set config: {}".format(result))
+            return False
+        return True
+
+    def dump_dhcp4_config(self, unchanged_tables=None):
         """
         Generate kea-dhcp4 config file and dump it to config folder
+        Args:
+            unchanged_tables: set of table names not changed since last generation
         """
         kea_dhcp4_config, used_ranges, enabled_dhcp_interfaces, used_options, enable_checker = \
-            self.dhcp_cfg_generator.generate()
+            self.dhcp_cfg_generator.generate(unchanged_tables)
         if self.enabled_checker is not None and self.enabled_checker != enable_checker:
             # Has subcribe table and no equal, need to resubscribe
             self.dhcp_servd_monitor.disable_checkers(self.enabled_checker - enable_checker)
@@ -60,10 +108,16 @@ class DhcpServd(object):
         self.used_range = used_ranges
         self.enabled_dhcp_interfaces = enabled_dhcp_interfaces
         self.used_options = used_options
+        kea_dhcp4_config_hash = hashlib.sha256(kea_dhcp4_config.encode()).hexdigest()
+        if kea_dhcp4_config_hash == self.kea_dhcp4_config_hash:
+            # Rendered config is not changed, no need to reload kea-dhcp4
+            return
         with open(self.kea_dhcp4_config_path, "w") as write_file:
             write_file.write(kea_dhcp4_config)
-        # After refresh kea-config, we need to SIGHUP kea-dhcp4 process to read new config
-        self._notify_kea_dhcp4_proc()
+        self.kea_dhcp4_config_hash = kea_dhcp4_config_hash
+        # After refresh kea-config, apply it by control socket, if failed, SIGHUP kea-dhcp4 process to read new config
+        if not self._send_kea_dhcp4_config(kea_dhcp4_config):
+            self._notify_kea_dhcp4_proc()
 
     def _update_dhcp_server_ip(self):
         """
@@ -99,7 +153,7 @@ class DhcpServd(object):
             }
             res = self.dhcp_servd_monitor.check_db_update(db_snapshot)
             if res:
-                self.dump_dhcp4_config()
+                self.dump_dhcp4_config(self.dhcp_servd_monitor.get_unchanged_tables())
 
 
 def main():
@@ -426,6 +426,23 @@ def test_generate(mock_swsscommon_dbconnector_init, mock_parse_port_map_alias, m
         assert subscribe_table == expected_tables
 
 
+def test_get_config_db_table_cached(mock_swsscommon_dbconnector_init, mock_parse_port_map_alias,
+                                    mock_get_render_template):
+    with patch.object(DhcpDbConnector, "get_config_db_table", side_effect=mock_get_config_db_table) as mock_get:
+        dhcp_db_connector = DhcpDbConnector()
+        dhcp_cfg_generator = DhcpServCfgGenerator(dhcp_db_connector, "/usr/local/lib/kea/hooks/libdhcp_run_script.so")
+        expected_table = mock_get_config_db_table("VLAN_INTERFACE")
+        # Table not read before is read from config_db even if it is unchanged
+        assert dhcp_cfg_generator._get_config_db_table("VLAN_INTERFACE", set(["VLAN_INTERFACE"])) == expected_table
+        assert mock_get.call_count == 1
+        assert dhcp_cfg_generator._get_config_db_table("VLAN_INTERFACE", set(["VLAN_INTERFACE"])) == expected_table
+        assert mock_get.call_count == 1
+        assert dhcp_cfg_generator._get_config_db_table("VLAN_INTERFACE", set(["VLAN_MEMBER"])) == expected_table
+        assert mock_get.call_count == 2
+        assert dhcp_cfg_generator._get_config_db_table("VLAN_INTERFACE") == expected_table
+        assert mock_get.call_count == 3
+
+
 def test_construct_obj_for_template(mock_swsscommon_dbconnector_init, mock_parse_port_map_alias,
                                     mock_get_render_template):
     mock_config_db = MockConfigDb(config_db_path="tests/test_data/mock_config_db.json")
@@ -102,6 +102,24 @@ def test_dhcp_servd_monitor_check_db_update(mock_swsscommon_dbconnector_init, se
             mock_clear.assert_not_called()
 
 
+def test_dhcp_servd_monitor_get_unchanged_tables(mock_swsscommon_dbconnector_init):
+    db_connector = DhcpDbConnector()
+    dhcp_checker = DhcpServerTableCfgChangeEventChecker(None, None)
+    port_checker = DhcpPortTableEventChecker(None, None)
+    range_checker = DhcpRangeTableEventChecker(None, None)
+    db_monitor = DhcpServdDbMonitor(db_connector, None, [dhcp_checker, port_checker, range_checker])
+    dhcp_checker.enabled = True
+    port_checker.enabled = True
+    # Checkers are treated as changed before first query
+    assert db_monitor.get_unchanged_tables() == set()
+    assert db_monitor.get_unchanged_tables() == set(["DHCP_SERVER_IPV4", "DHCP_SERVER_IPV4_PORT"])
+    port_checker.table_changed = True
+    assert db_monitor.get_unchanged_tables() == set(["DHCP_SERVER_IPV4"])
+    # Disabled checker is not monitored
+    port_checker.enabled = False
+    assert db_monitor.get_unchanged_tables() == set(["DHCP_SERVER_IPV4"])
+
+
 @pytest.mark.parametrize("tables", [set(["VlanIntfTableEventChecker"]), set(["dummy1"])])
 def test_dhcp_servd_monitor_enable_checkers(mock_swsscommon_dbconnector_init, tables):
     with patch.object(ConfigDbEventChecker, "enable") as mock_enable:
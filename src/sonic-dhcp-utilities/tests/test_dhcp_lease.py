@@ -1,3 +1,4 @@
+import copy
 from dhcp_utilities.common.utils import DhcpDbConnector
 from dhcp_utilities.dhcpservd.dhcp_lease import KeaDhcp4LeaseHandler, LeaseHanlder
 from freezegun import freeze_time
@@ -56,7 +57,7 @@ def test_read_kea_lease(mock_swsscommon_dbconnector_init):
 # Cannot mock built-in/extension type function(datetime.datetime.timestamp), need to free time
 @freeze_time("2023-09-08")
 def test_update_kea_lease(mock_swsscommon_dbconnector_init, mock_swsscommon_table_init):
-    tested_lease = expected_lease
+    tested_lease = copy.deepcopy(expected_lease)
     mock_lease_table = {
         "Vlan1000|aa:bb:cc:dd:ee:ff": {},
         "Vlan1000|10:70:fd:b6:13:00": {},
@@ -64,30 +65,76 @@ def test_update_kea_lease(mock_swsscommon_dbconnector_init, mock_swsscommon_tabl
         "Vlan1000|10:70:fd:b6:13:18": {}
     }
     with patch.object(swsscommon.Table, "getKeys"), \
-         patch.object(swsscommon.DBConnector, "hset") as mock_hset, \
+         patch("dhcp_utilities.dhcpservd.dhcp_lease.swsscommon.RedisPipeline") as mock_pipeline, \
+         patch("dhcp_utilities.dhcpservd.dhcp_lease.swsscommon.RedisCommand") as mock_command, \
          patch.object(KeaDhcp4LeaseHandler, "_read", MagicMock(return_value=tested_lease)), \
          patch.object(DhcpDbConnector, "get_state_db_table",
-                      return_value=mock_lease_table), \
-         patch.object(swsscommon.DBConnector, "delete") as mock_delete, \
+                      return_value=mock_lease_table) as mock_get_state_db_table, \
          patch("time.sleep", return_value=None) as mock_sleep:
         db_connector = DhcpDbConnector()
         kea_lease_handler = KeaDhcp4LeaseHandler(db_connector)
         kea_lease_handler.update_lease()
         # Verify that old key was deleted
-        mock_delete.assert_has_calls([
+        assert mock_command.return_value.formatDEL.call_args_list == [
             call("DHCP_SERVER_IPV4_LEASE|Vlan1000|10:70:fd:b6:13:00"),
             call("DHCP_SERVER_IPV4_LEASE|Vlan1000|10:70:fd:b6:13:17"),
             call("DHCP_SERVER_IPV4_LEASE|Vlan1000|aa:bb:cc:dd:ee:ff")
-        ])
+        ]
         # Verify that lease has been updated, to be noted that lease for "192.168.0.2" didn't been updated because
         # lease_start equals to lease_end
-        mock_hset.assert_has_calls([
-            call("DHCP_SERVER_IPV4_LEASE|Vlan1000|10:70:fd:b6:13:18", "lease_start", "1697607205"),
-            call("DHCP_SERVER_IPV4_LEASE|Vlan1000|10:70:fd:b6:13:18", "lease_end", "1697610805"),
-            call("DHCP_SERVER_IPV4_LEASE|Vlan1000|10:70:fd:b6:13:18", "ip", "193.168.0.132")
-        ])
+        assert mock_command.return_value.formatHSET.call_args_list == [
+            call("DHCP_SERVER_IPV4_LEASE|Vlan1000|10:70:fd:b6:13:18",
+                 {"lease_start": "1697607205", "lease_end": "1697610805", "ip": "193.168.0.132"})
+        ]
+        # All changes are written with one pipeline
+        assert mock_pipeline.return_value.push.call_count == 4
+        mock_pipeline.return_value.flush.assert_called_once()
+
+        # Unchanged leases are not written again, and STATE_DB is not read again
+        mock_command.reset_mock()
+        tested_lease["Vlan1000|10:70:fd:b6:13:18"]["lease_end"] = "1697614405"
         kea_lease_handler.update_lease()
         mock_sleep.assert_called_once_with(2)
+        mock_get_state_db_table.assert_called_once()
+        mock_command.return_value.formatDEL.assert_not_called()
+        mock_command.return_value.formatHSET.assert_called_once_with(
+            "DHCP_SERVER_IPV4_LEASE|Vlan1000|10:70:fd:b6:13:18",
+            {"lease_start": "1697607205", "lease_end": "1697614405", "ip": "193.168.0.132"})
+
+
+def test_read_kea_lease_incremental(mock_swsscommon_dbconnector_init, tmp_path):
+    lease_file = tmp_path / "kea-lease.csv"
+    header = "address,hwaddr,client_id,valid_lifetime,expire,subnet_id,fqdn_fwd,fqdn_rev,hostname,state," \
+             "user_context,pool_id\n"
+    row = "{},{},,3600,{},1000,0,0,host,0,,0\n"
+    lease_file.write_text(header + row.format("192.168.0.2", "10:70:fd:b6:13:00", "1694000905"))
+    with patch.object(DhcpDbConnector, "get_config_db_table", side_effect=mock_get_config_db_table):
+        db_connector = DhcpDbConnector()
+        kea_lease_handler = KeaDhcp4LeaseHandler(db_connector, lease_file=str(lease_file))
+        assert kea_lease_handler._read() == {
+            "Vlan1000|10:70:fd:b6:13:00": {"lease_start": "1693997305", "lease_end": "1694000905", "ip": "192.168.0.2"}
+        }
+        offset = kea_lease_handler.lease_file_offset
+        assert offset == len(lease_file.read_bytes())
+
+        # Only appended rows are read, a row being written is parsed once it has all columns
+        with open(lease_file, "a") as f:
+            f.write(row.format("192.168.0.3", "10:70:fd:b6:13:01", "1694000906"))
+            f.write("192.168.0.2,10:70:fd:b6:13:00,,3600,16940")
+        lease = kea_lease_handler._read()
+        assert lease["Vlan1000|10:70:fd:b6:13:01"]["ip"] == "192.168.0.3"
+        assert lease["Vlan1000|10:70:fd:b6:13:00"]["lease_end"] == "1694000905"
+        with open(lease_file, "a") as f:
+            f.write("09905,1000,0,0,host,0,,0\n")
+        lease = kea_lease_handler._read()
+        assert lease["Vlan1000|10:70:fd:b6:13:00"]["lease_end"] == "1694009905"
+        assert kea_lease_handler.lease_file_offset == len(lease_file.read_bytes())
+
+        # LFC replaces the lease file, the new file is read from the beginning
+        new_file = tmp_path / "kea-lease.csv.new"
+        new_file.write_text(header + row.format("192.168.0.4", "10:70:fd:b6:13:02", "1694000907"))
+        new_file.replace(lease_file)
+        assert list(kea_lease_handler._read().keys()) == ["Vlan1000|10:70:fd:b6:13:02"]
 
 
 def test_no_implement(mock_swsscommon_dbconnector_init):
@@ -2,6 +2,7 @@ import pytest
 import json
 import psutil
 import signal
+import socket
 import sys
 import time
 from common_utils import MockProc, mock_get_config_db_table
@@ -26,13 +27,15 @@ tested_config = """
 """
 
 
+@pytest.mark.parametrize("config_set_res", [True, False])
 @pytest.mark.parametrize("enabled_checker", [None, set(PORT_MODE_CHECKER)])
-def test_dump_dhcp4_config(mock_swsscommon_dbconnector_init, enabled_checker):
+def test_dump_dhcp4_config(mock_swsscommon_dbconnector_init, enabled_checker, config_set_res):
     new_enabled_checker = set(["VlanTableEventChecker"])
     with patch("dhcp_utilities.dhcpservd.dhcp_cfggen.DhcpServCfgGenerator.generate",
                return_value=(tested_config, set(), set(), set(), new_enabled_checker)) as mock_generate, \
          patch("dhcp_utilities.dhcpservd.dhcpservd.DhcpServd._notify_kea_dhcp4_proc",
                MagicMock()) as mock_notify_kea_dhcp4_proc, \
+         patch.object(DhcpServd, "_send_kea_dhcp4_config", return_value=config_set_res) as mock_config_set, \
          patch.object(DhcpServd, "dhcp_servd_monitor", return_value=DhcpServdDbMonitor,
                       new_callable=PropertyMock), \
          patch.object(DhcpServdDbMonitor, "disable_checkers") as mock_unsubscribe, \
@@ -46,20 +49,28 @@ def test_dump_dhcp4_config(mock_swsscommon_dbconnector_init, enabled_checker):
                               kea_dhcp4_config_path="/tmp/kea-dhcp4.conf")
         dhcpservd.dump_dhcp4_config()
         # Verfiy whether generate() func of dhcp_cfggen is called
-        mock_generate.assert_called_once_with()
+        mock_generate.assert_called_once_with(None)
         with open("tests/test_data/test_kea_config.conf", "r") as file, \
              open("/tmp/kea-dhcp4.conf", "r") as output:
             expected_content = file.read()
             actual_content = output.read()
             assert json.loads(expected_content) == json.loads(actual_content)
-        # Verify whether notify func of dhcpservd is called, which is expected to call after new config generated
-        mock_notify_kea_dhcp4_proc.assert_called_once_with()
+        # Verify whether config is sent to kea-dhcp4, and notify func of dhcpservd is called if it failed
+        mock_config_set.assert_called_once_with(tested_config)
+        if config_set_res:
+            mock_notify_kea_dhcp4_proc.assert_not_called()
+        else:
+            mock_notify_kea_dhcp4_proc.assert_called_once_with()
         if enabled_checker is None:
             mock_subscribe.assert_not_called()
             mock_unsubscribe.assert_not_called()
         else:
             mock_unsubscribe.assert_called_once_with(enabled_checker - new_enabled_checker)
             mock_subscribe.assert_called_once_with(new_enabled_checker - enabled_checker)
+        # Config is not reloaded if rendered config is not changed
+        dhcpservd.dump_dhcp4_config(set(["VLAN_INTERFACE"]))
+        mock_generate.assert_called_with(set(["VLAN_INTERFACE"]))
+        mock_config_set.assert_called_once_with(tested_config)
 
 
 @pytest.mark.parametrize("process_list", [["proc1", "proc2", "kea-dhcp4"], ["proc1", "proc2"]])
@@ -81,6 +92,30 @@ def test_notify_kea_dhcp4_proc(process_list, mock_swsscommon_dbconnector_init, m
             mock_send_signal.assert_not_called()
 
 
+@pytest.mark.parametrize("response", [b'{"result": 0, "text": "Configuration successful."}',
+                                      b'[{"result": 0, "text": "Configuration successful."}]',
+                                      b'{"result": 1, "text": "Configuration rejected."}',
+                                      b'', None])
+def test_send_kea_dhcp4_config(mock_swsscommon_dbconnector_init, mock_get_render_template, mock_parse_port_map_alias,
+                               response):
+    mock_sock = MagicMock()
+    mock_sock.__enter__.return_value = mock_sock
+    if response is None:
+        mock_sock.connect.side_effect = FileNotFoundError()
+    else:
+        mock_sock.recv.side_effect = [response, b""]
+    with patch.object(socket, "socket", return_value=mock_sock):
+        dhcp_db_connector = DhcpDbConnector()
+        dhcp_cfg_generator = DhcpServCfgGenerator(dhcp_db_connector, "/usr/local/lib/kea/hooks/libdhcp_run_script.so")
+        dhcpservd = DhcpServd(dhcp_cfg_generator, dhcp_db_connector, None, kea_dhcp4_ctrl_socket_path="/tmp/kea4-ctrl")
+        res = dhcpservd._send_kea_dhcp4_config(tested_config)
+        assert res == (response is not None and b'"result": 0' in response)
+        mock_sock.connect.assert_called_once_with("/tmp/kea4-ctrl")
+        if response is not None:
+            command = json.loads(mock_sock.sendall.call_args[0][0].decode())
+            assert command == {"command": "config-set", "arguments": json.loads(tested_config)}
+
+
 @pytest.mark.parametrize("mock_intf", [True, False])
 def test_update_dhcp_server_ip(mock_swsscommon_dbconnector_init, mock_parse_port_map_alias, mock_get_render_template,
                                mock_intf):
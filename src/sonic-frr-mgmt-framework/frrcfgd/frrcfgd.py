@@ -5,7 +5,8 @@ import subprocess
 import time
 import syslog
 import os
-from swsscommon.swsscommon import ConfigDBConnector
+import json
+from swsscommon.swsscommon import ConfigDBConnector, RedisCommand, RedisReply
 import socket
 import threading
 import queue
@@ -1497,10 +1498,32 @@ def hdl_admin_status_shutdown_msg(daemon, cmd_str, op, st_idx, args, data):
     return cmd_list
 
 class ExtConfigDBConnector(ConfigDBConnector):
+    # Notifications of the same key received within the window are coalesced into one update
+    COALESCE_WINDOW = 0.05
+    MAX_BATCH_KEYS = 256
+    LAG_WARNING_THRESHOLD = 5.0
+    STATS_LOG_INTERVAL = 300
+    # Fetch all entries of a batch in one request, deleted entries are returned as empty table
+    FETCH_SCRIPT = """
+local result = {}
+for _, key in ipairs(KEYS) do
+    local fvs = redis.call('HGETALL', key)
+    local entry = {}
+    for i = 1, #fvs, 2 do
+        entry[fvs[i]] = fvs[i + 1]
+    end
+    result[key] = entry
+end
+return cjson.encode(result)
+"""
     def __init__(self, ns_attrs = None):
         super(ExtConfigDBConnector, self).__init__()
         self.nosort_attrs = ns_attrs if ns_attrs is not None else {}
         self.__listen_thread_running = False
+        # Keys waiting for update: {<redis key>: (<table>, <row>, <time of first notification>)}
+        self.pending_keys = {}
+        self.listen_stats = {'notifications': 0, 'coalesced': 0, 'updates': 0, 'batches': 0,
+                             'queue_depth': 0, 'max_queue_depth': 0, 'lag': 0.0, 'max_lag': 0.0}
     def raw_to_typed(self, raw_data, table = ''):
         if len(raw_data) == 0:
             raw_data = None
@@ -1517,30 +1540,116 @@ class ExtConfigDBConnector(ConfigDBConnector):
             try:
                 (table, row) = key.split(self.TABLE_NAME_SEPARATOR, 1)
                 if table in self.handlers:
-                    client = self.get_redis_client(self.db_name)
-                    data = self.raw_to_typed(client.hgetall(key), table)
-                    super(ExtConfigDBConnector, self)._ConfigDBConnector__fire(table, row, data)
+                    self.listen_stats['notifications'] += 1
+                    if key in self.pending_keys:
+                        self.listen_stats['coalesced'] += 1
+                    else:
+                        self.pending_keys[key] = (table, row, time.monotonic())
             except ValueError:
                 pass    #Ignore non table-formated redis entries
             except Exception as e:
                 syslog.syslog(syslog.LOG_ERR, '[bgp cfgd] Failed handling config DB update with exception:' + str(e))
                 logging.exception(e)
 
+    def fetch_entries(self, keys):
+        client = self.get_redis_client(self.db_name)
+        try:
+            command = RedisCommand()
+            command.format(['EVAL', self.FETCH_SCRIPT, str(len(keys))] + keys)
+            data = json.loads(RedisReply(client, command).to_string())
+            # cjson encodes empty table as object, so deleted entry is an empty dictionary
+            return {key: data.get(key) or {} for key in keys}
+        except Exception as e:
+            syslog.syslog(syslog.LOG_DEBUG, '[bgp cfgd] Failed fetching entries in batch, fall back to per key read: ' + str(e))
+        # Entry which can't be read is left out, the other entries of the batch are still updated
+        entries = {}
+        for key in keys:
+            try:
+                entries[key] = client.hgetall(key)
+            except Exception as e:
+                syslog.syslog(syslog.LOG_ERR, '[bgp cfgd] Failed reading config DB entry {} with exception: {}'.format(key, str(e)))
+        return entries
+
+    def fire_pending_updates(self):
+        keys = list(self.pending_keys.keys())[:self.MAX_BATCH_KEYS]
+        try:
+            entries = self.fetch_entries(keys)
+        except Exception as e:
+            syslog.syslog(syslog.LOG_ERR, '[bgp cfgd] Failed reading config DB update with exception:' + str(e))
+            logging.exception(e)
+            for key in keys:
+                del self.pending_keys[key]
+            return
+        now = time.monotonic()
+        lag = 0.0
+        for key in keys:
+            (table, row, notify_time) = self.pending_keys.pop(key)
+            lag = max(lag, now - notify_time)
+            if key not in entries:
+                continue
+            try:
+                data = self.raw_to_typed(entries[key], table)
+                super(ExtConfigDBConnector, self)._ConfigDBConnector__fire(table, row, data)
+            except Exception as e:
+                syslog.syslog(syslog.LOG_ERR, '[bgp cfgd] Failed handling config DB update with exception:' + str(e))
+                logging.exception(e)
+        self.listen_stats['updates'] += len(keys)
+        self.listen_stats['batches'] += 1
+        self.listen_stats['lag'] = lag
+        self.listen_stats['max_lag'] = max(self.listen_stats['max_lag'], lag)
+        if lag > self.LAG_WARNING_THRESHOLD:
+            syslog.syslog(syslog.LOG_WARNING, '[bgp cfgd] Config DB update handled %.1f seconds after notification, %d updates pending' %
+                          (lag, len(self.pending_keys)))
+
+    def get_listen_stats(self):
+        """Return statistics of config DB update handling: count of notifications, coalesced notifications, handled updates
+        and update batches, current and max number of keys waiting for update, and lag in seconds from notification to
+        handling of last batch and max lag.
+        """
+        stats = dict(self.listen_stats)
+        stats['queue_depth'] = len(self.pending_keys)
+        return stats
+
+    def log_listen_stats(self):
+        stats = self.get_listen_stats()
+        syslog.syslog(syslog.LOG_INFO, '[bgp cfgd] Config DB update stats: ' +
+                      ', '.join('{}={}'.format(name, round(val, 3) if isinstance(val, float) else val) for name, val in stats.items()))
+
     def listen_thread(self, timeout):
         self.__listen_thread_running = True
-        sub_key_space = "__keyspace@{}__:*".format(self.get_dbid(self.db_name))
-        self.pubsub.psubscribe(sub_key_space)
+        stats_log_time = time.monotonic()
         while self.__listen_thread_running:
-            msg = self.pubsub.get_message(timeout, True)
+            if self.pending_keys:
+                first_notify_time = next(iter(self.pending_keys.values()))[2]
+                wait_time = max(first_notify_time + self.COALESCE_WINDOW - time.monotonic(), 0)
+            else:
+                wait_time = timeout
+            msg = self.pubsub.get_message(wait_time, True)
             if msg:
                 self.sub_msg_handler(msg)
-
-        self.pubsub.punsubscribe(sub_key_space)
-
-    def listen(self):
+            queue_depth = len(self.pending_keys)
+            self.listen_stats['max_queue_depth'] = max(self.listen_stats['max_queue_depth'], queue_depth)
+            if queue_depth > 0 and (not msg or queue_depth >= self.MAX_BATCH_KEYS or
+                                    time.monotonic() - next(iter(self.pending_keys.values()))[2] >= self.COALESCE_WINDOW):
+                self.fire_pending_updates()
+            if time.monotonic() - stats_log_time >= self.STATS_LOG_INTERVAL:
+                stats_log_time = time.monotonic()
+                self.log_listen_stats()
+
+        for sub_key_space in self.sub_key_spaces:
+            self.pubsub.punsubscribe(sub_key_space)
+
+    def listen(self, tables = None):
         """Start listen Redis keyspace events and will trigger corresponding handlers when content of a table changes.
+        Only keyspace events of given tables, or all subscribed tables by default, are listened.
         """
+        if tables is None:
+            tables = self.handlers.keys()
+        self.sub_key_spaces = ['__keyspace@{}__:{}{}*'.format(self.get_dbid(self.db_name), table, self.TABLE_NAME_SEPARATOR)
+                               for table in tables]
         self.pubsub = self.get_redis_client(self.db_name).pubsub()
+        for sub_key_space in self.sub_key_spaces:
+            self.pubsub.psubscribe(sub_key_space)
         self.sub_thread = threading.Thread(target=self.listen_thread, args=(10,))
         self.sub_thread.start()
 
@@ -3920,7 +4029,7 @@ class BGPConfigDaemon:
 
     def start(self):
         self.subscribe_all()
-        self.config_db.listen()
+        self.config_db.listen([tbl for tbl, _ in self.table_handler_list])
     def stop(self):
         self.config_db.stop_listen()
         if self.config_db.sub_thread.is_alive():
@@ -13,12 +13,59 @@ def test_contructor():
     daemon.start()
     for table, hdlr in daemon.table_handler_list:
         daemon.config_db.subscribe.assert_any_call(table, hdlr)
-    daemon.config_db.pubsub.psubscribe.assert_called_once()
+    assert(daemon.config_db.pubsub.psubscribe.call_count == len(daemon.table_handler_list))
     assert(daemon.config_db.sub_thread.is_alive() == True)
     daemon.stop()
-    daemon.config_db.pubsub.punsubscribe.assert_called_once()
+    assert(daemon.config_db.pubsub.punsubscribe.call_count == len(daemon.table_handler_list))
     assert(daemon.config_db.sub_thread.is_alive() == False)
 
+@patch.dict('sys.modules', **mockmapping)
+def test_coalesce_update():
+    from frrcfgd.frrcfgd import ExtConfigDBConnector
+    config_db = ExtConfigDBConnector()
+    config_db.TABLE_NAME_SEPARATOR = '|'
+    config_db.handlers = {'BGP_NEIGHBOR': MagicMock(), 'BGP_GLOBALS': MagicMock()}
+    for key in ['BGP_NEIGHBOR|default|10.0.0.1', 'BGP_GLOBALS|default', 'BGP_NEIGHBOR|default|10.0.0.1', 'VLAN|Vlan100']:
+        config_db.sub_msg_handler({'type': 'pmessage', 'channel': '__keyspace@4__:' + key, 'data': 'hset'})
+    assert(list(config_db.pending_keys.keys()) == ['BGP_NEIGHBOR|default|10.0.0.1', 'BGP_GLOBALS|default'])
+    with patch.object(ExtConfigDBConnector, 'fetch_entries', return_value={'BGP_NEIGHBOR|default|10.0.0.1': {'asn': '100'},
+                                                                           'BGP_GLOBALS|default': {}}) as mock_fetch:
+        config_db.fire_pending_updates()
+        mock_fetch.assert_called_once_with(['BGP_NEIGHBOR|default|10.0.0.1', 'BGP_GLOBALS|default'])
+    stats = config_db.get_listen_stats()
+    assert(stats['notifications'] == 3)
+    assert(stats['coalesced'] == 1)
+    assert(stats['updates'] == 2)
+    assert(stats['batches'] == 1)
+    assert(stats['queue_depth'] == 0)
+
+@patch.dict('sys.modules', **mockmapping)
+def test_fetch_entries_bad_key():
+    from frrcfgd.frrcfgd import ExtConfigDBConnector
+    config_db = ExtConfigDBConnector()
+    config_db.TABLE_NAME_SEPARATOR = '|'
+    config_db.handlers = {'BGP_NEIGHBOR': MagicMock()}
+    client = MagicMock()
+    data = {'BGP_NEIGHBOR|default|10.0.0.1': {'asn': '100'}, 'BGP_NEIGHBOR|default|10.0.0.3': {'asn': '300'}}
+    def hgetall(key):
+        if key not in data:
+            raise RuntimeError('WRONGTYPE Operation against a key holding the wrong kind of value')
+        return data[key]
+    client.hgetall.side_effect = hgetall
+    config_db.get_redis_client = MagicMock(return_value=client)
+    keys = ['BGP_NEIGHBOR|default|10.0.0.1', 'BGP_NEIGHBOR|default|10.0.0.2', 'BGP_NEIGHBOR|default|10.0.0.3']
+    for key in keys:
+        config_db.sub_msg_handler({'type': 'pmessage', 'channel': '__keyspace@4__:' + key, 'data': 'hset'})
+    # the batch read fails, the entries are read one by one
+    with patch('frrcfgd.frrcfgd.RedisReply', side_effect=RuntimeError('WRONGTYPE')):
+        assert(config_db.fetch_entries(keys) == data)
+        with patch.object(ExtConfigDBConnector, 'raw_to_typed', side_effect=lambda raw, table: raw), \
+             patch.object(ExtConfigDBConnector.__bases__[0], '_ConfigDBConnector__fire', create=True) as fire:
+            config_db.fire_pending_updates()
+    assert(config_db.pending_keys == {})
+    assert([c[0] for c in fire.call_args_list] == [('BGP_NEIGHBOR', 'default|10.0.0.1', {'asn': '100'}),
+                                                   ('BGP_NEIGHBOR', 'default|10.0.0.3', {'asn': '300'})])
+
 class CmdMapTestInfo:
     data_buf = {}
     def __init__(self, table, key, data, exp_cmd, no_del = False, neg_cmd = None,
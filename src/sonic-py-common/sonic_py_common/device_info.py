@@ -1,10 +1,16 @@
+import copy
+import ctypes
+import fcntl
 import glob
 import hashlib
 import json
 import os
 import random
 import re
+import socket
+import struct
 import subprocess
+import threading
 import yaml
 from natsort import natsorted
 from sonic_py_common.general import getstatusoutput_noshell_pipe
@@ -17,6 +23,11 @@ CONTAINER_PLATFORM_PATH = USR_SHARE_SONIC_PATH + "/platform"
 
 MACHINE_CONF_PATH = "/host/machine.conf"
 SONIC_VERSION_YAML_PATH = "/etc/sonic/sonic_version.yml"
+SYS_CLASS_NET_PATH = "/sys/class/net"
+NETNS_PATH = "/run/netns"
+BOOT_ID_PATH = "/proc/sys/kernel/random/boot_id"
+# Base MAC read from syseeprom, kept on tmpfs so it is read once per boot
+SYSEEPROM_MAC_CACHE_FILE = "/run/sonic-syseeprom-base-mac"
 
 # Port configuration file names
 PORT_CONFIG_FILE = "port_config.ini"
@@ -58,12 +69,174 @@ DPU_NAME_PREFIX = "dpu"
 sonic_ver_info = {}
 hw_info_dict = {}
 
+# Device identity cache. Configuration files are parsed once and reused until
+# the file changes. DEVICE_METADATA|localhost is read once and reused until a
+# keyspace notification reports a change. Set SONIC_DEVICE_INFO_CACHE=0 or call
+# set_device_info_cache(False) to read everything on each call
+DEVICE_INFO_CACHE_ENV = "SONIC_DEVICE_INFO_CACHE"
+device_info_cache_enabled = os.environ.get(DEVICE_INFO_CACHE_ENV, "1") != "0"
+conf_file_cache = {}            # path -> (file stamp, parsed content)
+localhost_metadata = None       # DEVICE_METADATA|localhost snapshot
+localhost_metadata_db = None    # (config_db, pubsub) used to read and follow the snapshot
+# Guards the caches above. The pubsub must be drained by one thread at a time,
+# otherwise a thread can consume the notification another thread is waiting for
+device_info_cache_lock = threading.RLock()
+
+
+def set_device_info_cache(enabled):
+    """
+    Enable or disable the device identity cache. Boot time callers, which
+    run while the configuration files are being created, should disable it
+    """
+    global device_info_cache_enabled
+    device_info_cache_enabled = enabled
+    invalidate_device_info_cache()
+
+
+def invalidate_device_info_cache():
+    """
+    Drop all cached device identity data
+    """
+    global localhost_metadata, localhost_metadata_db
+    with device_info_cache_lock:
+        conf_file_cache.clear()
+        localhost_metadata = None
+        localhost_metadata_db = None
+
+
+def get_file_stamp(path):
+    """
+    Returns a value which changes when the file is modified or replaced,
+    None if the file can't be accessed
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns, st.st_ctime_ns)
+
+
+def read_cached_file(path, parse):
+    """
+    Parse a file, reusing the previous result while the file isn't changed
+
+    Args:
+        path: path to the file
+        parse: a function which takes the path and returns the parsed content.
+            The content is shared between the callers and must not be modified
+
+    Returns:
+        The parsed content
+    """
+    stamp = get_file_stamp(path) if device_info_cache_enabled else None
+    if stamp is None:
+        return parse(path)
+
+    with device_info_cache_lock:
+        cached = conf_file_cache.get(path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        content = parse(path)
+        conf_file_cache[path] = (stamp, content)
+        return content
+
+
+def read_conf_tokens(path):
+    """
+    Read a key=value configuration file
+
+    Returns:
+        A tuple with the result of line.split('=') for each line of the file
+    """
+    with open(path) as conf_file:
+        return tuple(line.split('=') for line in conf_file)
+
+
+def read_json_file(path):
+    with open(path, 'r') as f:
+        return json.loads(f.read())
+
+
+def is_localhost_metadata_changed(pubsub):
+    """
+    Drain keyspace notifications of DEVICE_METADATA|localhost
+
+    Returns:
+        True if any change was reported
+    """
+    changed = False
+    while True:
+        message = pubsub.get_message()
+        if not message:
+            break
+        if message.get('type') == 'pmessage':
+            changed = True
+    return changed
+
+
+def get_localhost_metadata():
+    """
+    Retrieve DEVICE_METADATA|localhost from the config DB. The entry is
+    cached while the cache is enabled and its changes can be followed
+
+    Returns:
+        A dictionary with DEVICE_METADATA|localhost fields
+    """
+    if not device_info_cache_enabled:
+        config_db = ConfigDBConnector()
+        config_db.connect()
+        return config_db.get_table('DEVICE_METADATA').get('localhost', {})
+
+    with device_info_cache_lock:
+        return get_cached_localhost_metadata()
+
+
+def get_cached_localhost_metadata():
+    """
+    Retrieve DEVICE_METADATA|localhost from the snapshot, refreshing it if
+    a change was reported. The caller must hold device_info_cache_lock
+
+    Returns:
+        A dictionary with DEVICE_METADATA|localhost fields
+    """
+    global localhost_metadata, localhost_metadata_db
+
+    if localhost_metadata is not None:
+        try:
+            if not is_localhost_metadata_changed(localhost_metadata_db[1]):
+                return dict(localhost_metadata)
+        except Exception:
+            # The subscription is lost, e.g. the database was restarted
+            localhost_metadata_db = None
+        localhost_metadata = None
+
+    if localhost_metadata_db is None:
+        config_db = ConfigDBConnector()
+        config_db.connect()
+        try:
+            pubsub = config_db.get_redis_client(config_db.CONFIG_DB).pubsub()
+            pubsub.psubscribe("__keyspace@{}__:DEVICE_METADATA{}localhost".format(
+                config_db.get_dbid(config_db.CONFIG_DB), config_db.KEY_SEPARATOR))
+        except Exception:
+            pubsub = None
+        localhost_metadata_db = (config_db, pubsub)
+
+    config_db, pubsub = localhost_metadata_db
+    try:
+        metadata = config_db.get_table('DEVICE_METADATA').get('localhost', {})
+    except Exception:
+        localhost_metadata_db = None
+        raise
+    localhost_metadata = metadata if pubsub is not None else None
+    return dict(metadata)
+
+
 def get_localhost_info(field, config_db=None):
     try:
         # TODO: enforce caller to provide config_db explicitly and remove its default value
         if not config_db:
-            config_db = ConfigDBConnector()
-            config_db.connect()
+            localhost = get_localhost_metadata()
+            return localhost.get(field)
 
         metadata = config_db.get_table('DEVICE_METADATA')
 
@@ -91,12 +264,10 @@ def get_machine_info():
         return None
 
     machine_vars = {}
-    with open(MACHINE_CONF_PATH) as machine_conf_file:
-        for line in machine_conf_file:
-            tokens = line.split('=')
-            if len(tokens) < 2:
-                continue
-            machine_vars[tokens[0]] = tokens[1].strip()
+    for tokens in read_cached_file(MACHINE_CONF_PATH, read_conf_tokens):
+        if len(tokens) < 2:
+            continue
+        machine_vars[tokens[0]] = tokens[1].strip()
 
     return machine_vars
 
@@ -191,9 +362,8 @@ def get_platform_json_data():
         return None
 
     try:
-        with open(platform_json, 'r') as f:
-            platform_data = json.loads(f.read())
-            return platform_data
+        # The parsed content is cached, so the caller gets its own copy
+        return copy.deepcopy(read_cached_file(platform_json, read_json_file))
     except (json.JSONDecodeError, IOError, TypeError, ValueError):
         # Handle any file reading and JSON parsing errors
         return None
@@ -489,7 +659,7 @@ def get_path_to_port_config_file(hwsku=None, asic=None):
     if os.path.isfile(hwsku_json_file):
         if os.path.isfile(os.path.join(platform_path, PLATFORM_JSON_FILE)):
             json_file = os.path.join(platform_path, PLATFORM_JSON_FILE)
-            platform_data = json.loads(open(json_file).read())
+            platform_data = read_cached_file(json_file, read_json_file)
             interfaces = platform_data.get('interfaces', None)
             if interfaces is not None and len(interfaces) > 0:
                 port_config_candidates.append(os.path.join(platform_path, PLATFORM_JSON_FILE))
@@ -601,14 +771,12 @@ def get_num_npus():
     asic_conf_file_path = get_asic_conf_file_path()
     if asic_conf_file_path is None:
         return 1
-    with open(asic_conf_file_path) as asic_conf_file:
-        for line in asic_conf_file:
-            tokens = line.split('=')
-            if len(tokens) < 2:
-               continue
-            if tokens[0].lower() == 'num_asic':
-                num_npus = tokens[1].strip()
-        return int(num_npus)
+    for tokens in read_cached_file(asic_conf_file_path, read_conf_tokens):
+        if len(tokens) < 2:
+           continue
+        if tokens[0].lower() == 'num_asic':
+            num_npus = tokens[1].strip()
+    return int(num_npus)
 
 
 def is_multi_npu():
@@ -640,16 +808,14 @@ def is_disaggregated_chassis():
     platform_env_conf_file_path = get_platform_env_conf_file_path()
     if platform_env_conf_file_path is None:
         return False
-    with open(platform_env_conf_file_path) as platform_env_conf_file:
-        for line in platform_env_conf_file:
-            tokens = line.split('=')
-            if len(tokens) < 2:
-               continue
-            if tokens[0] == 'disaggregated_chassis':
-                val = tokens[1].strip()
-                if val == '1':
-                    return True
-        return False
+    for tokens in read_cached_file(platform_env_conf_file_path, read_conf_tokens):
+        if len(tokens) < 2:
+           continue
+        if tokens[0] == 'disaggregated_chassis':
+            val = tokens[1].strip()
+            if val == '1':
+                return True
+    return False
 
 
 def is_virtual_chassis():
@@ -697,16 +863,14 @@ def is_supervisor():
     platform_env_conf_file_path = get_platform_env_conf_file_path()
     if platform_env_conf_file_path is None:
         return False
-    with open(platform_env_conf_file_path) as platform_env_conf_file:
-        for line in platform_env_conf_file:
-            tokens = line.split('=')
-            if len(tokens) < 2:
-               continue
-            if tokens[0].lower() == 'supervisor':
-                val = tokens[1].strip()
-                if val == '1':
-                    return True
-        return False
+    for tokens in read_cached_file(platform_env_conf_file_path, read_conf_tokens):
+        if len(tokens) < 2:
+           continue
+        if tokens[0].lower() == 'supervisor':
+            val = tokens[1].strip()
+            if val == '1':
+                return True
+    return False
 
 # Check if this platform has macsec capability.
 def is_macsec_supported():
@@ -717,15 +881,13 @@ def is_macsec_supported():
     if platform_env_conf_file_path is None:
         return supported
 
-    # Else open the file check for keyword - macsec_enabled -
-    with open(platform_env_conf_file_path) as platform_env_conf_file:
-        for line in platform_env_conf_file:
-            tokens = line.split('=')
-            if len(tokens) < 2:
-               continue
-            if tokens[0].lower() == 'macsec_enabled':
-                supported = tokens[1].strip()
-                break
+    # Else check the file for keyword - macsec_enabled -
+    for tokens in read_cached_file(platform_env_conf_file_path, read_conf_tokens):
+        if len(tokens) < 2:
+           continue
+        if tokens[0].lower() == 'macsec_enabled':
+            supported = tokens[1].strip()
+            break
     return int(supported)
 
 
@@ -807,6 +969,122 @@ def run_command_pipe(cmd0, cmd1, cmd2):
         err = out
     return (out, err)
 
+def _read_interface_mac(ifname):
+    """
+    Read MAC address of an interface in the current network namespace from sysfs
+
+    Returns:
+        A tuple (mac, err) in the format of run_command()
+    """
+    try:
+        with open(os.path.join(SYS_CLASS_NET_PATH, ifname, 'address')) as f:
+            return (f.read(), None)
+    except (IOError, OSError) as e:
+        return ('', str(e))
+
+
+def _get_netns_socket(namespace):
+    """
+    Create a socket in the network namespace. The namespace is entered by a
+    helper thread, so the namespace of the calling thread is not changed
+
+    Returns:
+        A socket, or None if the namespace can't be entered
+    """
+    result = []
+
+    def create_socket():
+        try:
+            with open(os.path.join(NETNS_PATH, namespace)) as netns:
+                if hasattr(os, 'setns'):
+                    os.setns(netns.fileno(), os.CLONE_NEWNET)
+                else:
+                    libc = ctypes.CDLL(None, use_errno=True)
+                    if libc.setns(netns.fileno(), 0x40000000) != 0:  # CLONE_NEWNET
+                        return
+            result.append(socket.socket(socket.AF_INET, socket.SOCK_DGRAM))
+        except (IOError, OSError, AttributeError):
+            pass
+
+    thread = threading.Thread(target=create_socket)
+    thread.start()
+    thread.join()
+    return result[0] if result else None
+
+
+def _read_netns_interface_mac(namespace, ifname):
+    """
+    Read MAC address of an interface in a network namespace with SIOCGIFHWADDR.
+    Falls back to 'ip netns exec' when the namespace can't be entered
+
+    Returns:
+        A tuple (mac, err) in the format of run_command()
+    """
+    sock = _get_netns_socket(namespace)
+    if sock is None:
+        return run_command(['sudo', 'ip', 'netns', 'exec', str(namespace), 'cat',
+                            os.path.join(SYS_CLASS_NET_PATH, ifname, 'address')])
+    try:
+        ifreq = fcntl.ioctl(sock.fileno(), 0x8927, struct.pack('256s', ifname[:15].encode()))  # SIOCGIFHWADDR
+    except (IOError, OSError) as e:
+        return ('', str(e))
+    finally:
+        sock.close()
+    return (':'.join('{:02x}'.format(b) for b in bytearray(ifreq[18:24])), None)
+
+
+def _read_profile_mac(profile_file, key):
+    """
+    Read MAC address from profile.ini. Same as 'grep <key> | cut -f2 -d ='
+
+    Returns:
+        A tuple (mac, err) in the format of run_command()
+    """
+    try:
+        with open(profile_file) as f:
+            lines = [line.rstrip('\n') for line in f if key in line]
+    except (IOError, OSError) as e:
+        return ('', str(e))
+    if not lines:
+        return ('', "'{}' is not found in {}".format(key, profile_file))
+    return ('\n'.join(line.split('=')[1] if '=' in line else line for line in lines), None)
+
+
+def _get_syseeprom_mac(syseeprom_cmd):
+    """
+    Read base MAC address from syseeprom. A valid MAC address is stored to
+    SYSEEPROM_MAC_CACHE_FILE with the boot id and reused until the next boot
+
+    Returns:
+        A tuple (mac, err) in the format of run_command()
+    """
+    try:
+        with open(BOOT_ID_PATH) as f:
+            boot_id = f.read().strip()
+    except (IOError, OSError):
+        boot_id = None
+
+    if boot_id:
+        try:
+            with open(SYSEEPROM_MAC_CACHE_FILE) as f:
+                cached_boot_id, mac = f.read().split()
+            if cached_boot_id == boot_id and _valid_mac_address(mac):
+                return (mac, None)
+        except (IOError, OSError, ValueError):
+            pass
+
+    (mac, err) = run_command(syseeprom_cmd)
+    if boot_id and not err and _valid_mac_address(mac.strip()):
+        try:
+            tmp_file = "{}.{}".format(SYSEEPROM_MAC_CACHE_FILE, os.getpid())
+            with open(tmp_file, 'w') as f:
+                f.write("{} {}\n".format(boot_id, mac.strip()))
+            os.rename(tmp_file, SYSEEPROM_MAC_CACHE_FILE)
+        except (IOError, OSError):
+            pass
+    return (mac, err)
+
+
 def _modify_mac_for_asic(mac, namespace=None):
     if namespace is None:
         return mac
@@ -836,9 +1114,6 @@ def generate_mac_for_vs(hostname, namespace):
 def get_system_mac(namespace=None, hostname=None):
     hw_mac_entry_outputs = []
     syseeprom_cmd = ["sudo", "decode-syseeprom", "-m"]
-    iplink_cmd0 = ["ip", 'link', 'show', 'eth0']
-    iplink_cmd1 = ['grep', 'ether']
-    iplink_cmd2 = ['awk', '{print $2}']
     version_info = get_sonic_version_info()
     platform = get_platform()
 
@@ -859,41 +1134,33 @@ def get_system_mac(namespace=None, hostname=None):
             if _valid_mac_address(mac):
                 return mac
 
-        (mac, err) = run_command(syseeprom_cmd)
+        (mac, err) = _get_syseeprom_mac(syseeprom_cmd)
         hw_mac_entry_outputs.append((mac, err))
     elif (version_info['asic_type'] == 'marvell-prestera'):
         # Try valid mac in eeprom, else fetch it from eth0
         machine_key = "onie_machine"
         machine_vars = get_machine_info()
-        (mac, err) = run_command(syseeprom_cmd)
+        (mac, err) = _get_syseeprom_mac(syseeprom_cmd)
         hw_mac_entry_outputs.append((mac, err))
         if machine_vars is not None and machine_key in machine_vars:
             hwsku = machine_vars[machine_key]
             profile_file = HOST_DEVICE_PATH + '/' + platform + '/' + hwsku + '/profile.ini'
             if os.path.exists(profile_file):
-                profile_cmd0 = ['cat', profile_file]
-                profile_cmd1 = ['grep', 'switchMacAddress']
-                profile_cmd2 = ['cut', '-f2', '-d', '=']
-                (mac, err) = run_command_pipe(profile_cmd0, profile_cmd1, profile_cmd2)
+                (mac, err) = _read_profile_mac(profile_file, 'switchMacAddress')
                 hw_mac_entry_outputs.append((mac, err))
         else:
-            profile_cmd = ["false"]
-            (mac, err) = run_command(profile_cmd)
-            hw_mac_entry_outputs.append((mac, err))
-        (mac, err) = run_command_pipe(iplink_cmd0, iplink_cmd1, iplink_cmd2)
+            hw_mac_entry_outputs.append(('', 'onie_machine is not found'))
+        (mac, err) = _read_interface_mac('eth0')
         hw_mac_entry_outputs.append((mac, err))
     elif (version_info['asic_type'] == 'cisco-8000'):
         # Try to get valid MAC from profile.ini first, else fetch it from syseeprom or eth0
         if namespace is not None:
-            profile_cmd0 = ['cat', HOST_DEVICE_PATH + '/' + platform + '/profile.ini']
-            profile_cmd1 = ['grep', str(namespace)+'switchMacAddress']
-            profile_cmd2 = ['cut', '-f2', '-d', '=']
-            (mac, err) = run_command_pipe(profile_cmd0, profile_cmd1, profile_cmd2)
+            profile_file = HOST_DEVICE_PATH + '/' + platform + '/profile.ini'
+            (mac, err) = _read_profile_mac(profile_file, str(namespace) + 'switchMacAddress')
         else:
-            profile_cmd = ["false"]
-            (mac, err) = run_command(profile_cmd)
+            (mac, err) = ('', 'namespace is not provided')
         hw_mac_entry_outputs.append((mac, err))
-        (mac, err) = run_command_pipe(iplink_cmd0, iplink_cmd1, iplink_cmd2)
+        (mac, err) = _read_interface_mac('eth0')
         hw_mac_entry_outputs.append((mac, err))
         mac_found = False
         for (mac, err) in hw_mac_entry_outputs:
@@ -906,17 +1173,16 @@ def get_system_mac(namespace=None, hostname=None):
         # If mac not found, fetch from syseeprom
         if not mac_found:
             hw_mac_entry_outputs = []
-            (mac, err) = run_command(syseeprom_cmd)
+            (mac, err) = _get_syseeprom_mac(syseeprom_cmd)
             hw_mac_entry_outputs.append((mac, err))
     elif (version_info['asic_type'] == 'pensando'):
-        iplink_cmd0 = ["ip", 'link', 'show', 'eth0-midplane']
-        (mac, err) = run_command_pipe(iplink_cmd0, iplink_cmd1, iplink_cmd2)
+        (mac, err) = _read_interface_mac('eth0-midplane')
         hw_mac_entry_outputs.append((mac, err))
     else:
-        mac_address_cmd = ["cat", "/sys/class/net/eth0/address"]
         if namespace is not None:
-            mac_address_cmd = ['sudo', 'ip', 'netns', 'exec', str(namespace)] + mac_address_cmd
-        (mac, err) = run_command(mac_address_cmd)
+            (mac, err) = _read_netns_interface_mac(namespace, 'eth0')
+        else:
+            (mac, err) = _read_interface_mac('eth0')
         hw_mac_entry_outputs.append((mac, err))
 
     for (mac, err) in hw_mac_entry_outputs:
@@ -1,6 +1,8 @@
 import glob
 import os
 import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 from natsort import natsorted
 from swsscommon import swsscommon
@@ -33,6 +35,27 @@ CHASSIS_FABRIC_ASIC_INFO_TABLE='CHASSIS_FABRIC_ASIC_TABLE'
 # Dictionary to cache config_db connection handle per namespace
 # to prevent duplicate connections from being opened
 config_db_handle = {}
+# A pooled connector is not thread safe, so every use of it holds its namespace lock
+config_db_locks = {}
+config_db_pool_lock = threading.Lock()
+
+# Port name to namespace index used by get_namespace_for_port(),
+# and per namespace subscriptions to PORT table changes which invalidate the index
+port_namespace_index = None
+port_table_subscribers = {}
+
+# Methods of the config DB handle which only read, and can be retried on a new connection
+CONFIG_DB_READ_METHODS = ('get_table', 'get_entry', 'get_keys', 'get_config')
+# Errors raised when the connection to the database is lost. swsscommon reports
+# them as RuntimeError, which is told apart from other errors by the message
+CONNECTION_ERRORS = (ConnectionError, TimeoutError)
+try:
+    import redis
+    CONNECTION_ERRORS += (redis.exceptions.ConnectionError, redis.exceptions.TimeoutError)
+except ImportError:
+    pass
+CONNECTION_ERROR_MESSAGES = ('Unable to connect to redis', 'Connection reset', 'Connection refused',
+                             'Broken pipe', 'Server closed the connection', 'timed out', 'Timeout')
 
 def connect_config_db_for_ns(namespace=DEFAULT_NAMESPACE):
     """
@@ -51,6 +74,83 @@ def connect_config_db_for_ns(namespace=DEFAULT_NAMESPACE):
     return config_db
 
 
+def get_config_db_for_ns(namespace=DEFAULT_NAMESPACE):
+    """
+    The function returns the config DB handle for a given namespace
+    from the per process pool. The connection is opened on the first use
+
+    Returns:
+      handle to the config_db for a namespace
+    """
+    with config_db_pool_lock:
+        config_db = config_db_handle.get(namespace)
+        if config_db is None:
+            config_db = connect_config_db_for_ns(namespace)
+            config_db_handle[namespace] = config_db
+            config_db_locks.setdefault(namespace, threading.RLock())
+        return config_db
+
+
+def drop_config_db_for_ns(namespace, config_db):
+    """
+    The function drops a failed config DB handle of a namespace from the
+    pool together with the PORT table subscription and the port to
+    namespace index, so that they are rebuilt on the next use
+    """
+    global port_namespace_index
+    with config_db_pool_lock:
+        if config_db is not None and config_db_handle.get(namespace) is config_db:
+            del config_db_handle[namespace]
+        port_table_subscribers.pop(namespace, None)
+        port_namespace_index = None
+
+
+def is_connection_error(error):
+    """
+    The function checks if an error raised by a config DB handle means
+    that the connection to the database is lost
+    """
+    if isinstance(error, CONNECTION_ERRORS):
+        return True
+    return isinstance(error, RuntimeError) and any(msg in str(error) for msg in CONNECTION_ERROR_MESSAGES)
+
+
+def call_config_db_for_ns(namespace, method, *args):
+    """
+    The function calls a method of the pooled config DB handle of a
+    namespace. If the connection is lost, e.g. the database was restarted,
+    the handle is dropped. A read is retried once on a new connection,
+    a write is not, as it could be applied already
+
+    Returns:
+      the return value of the method
+    """
+    retry = method in CONFIG_DB_READ_METHODS
+    for attempt in range(2):
+        config_db = get_config_db_for_ns(namespace)
+        try:
+            with config_db_locks[namespace]:
+                return getattr(config_db, method)(*args)
+        except Exception as e:
+            if not is_connection_error(e):
+                raise
+            drop_config_db_for_ns(namespace, config_db)
+            if attempt or not retry:
+                raise
+
+
+def reset_config_db_pool():
+    """
+    The function drops all pooled config DB handles and the port to
+    namespace index. It should be called when the databases were restarted
+    """
+    global port_namespace_index
+    with config_db_pool_lock:
+        config_db_handle.clear()
+        port_table_subscribers.clear()
+        port_namespace_index = None
+
+
 def connect_to_all_dbs_for_ns(namespace=DEFAULT_NAMESPACE):
     """
     The function connects to the DBs for a given namespace and
@@ -233,11 +333,7 @@ def get_all_namespaces():
     if is_multi_asic():
         for asic in range(num_asics):
             namespace = "{}{}".format(ASIC_NAME_PREFIX, asic)
-            if namespace not in config_db_handle:
-                config_db_handle[namespace] =  connect_config_db_for_ns(namespace)
-            config_db = config_db_handle[namespace]
-
-            metadata = config_db.get_table('DEVICE_METADATA')
+            metadata = call_config_db_for_ns(namespace, 'get_table', 'DEVICE_METADATA')
             if metadata['localhost']['sub_role'] == FRONTEND_ASIC_SUB_ROLE:
                 front_ns.append(namespace)
             elif metadata['localhost']['sub_role'] == BACKEND_ASIC_SUB_ROLE:
@@ -299,15 +395,32 @@ def get_table(table, namespace=None):
         a dict of all entries of table across namespaces
     """
     merged_table = {}
-    ns_list = get_namespace_list(namespace)
+    ns_tables = get_table_for_all_asics(table, namespace)
 
-    for ns in ns_list:
-        ns_table = get_table_for_asic(table, ns)
+    for ns_table in ns_tables.values():
         merged_table.update(ns_table)
 
     return merged_table
 
 
+def get_table_for_all_asics(table, namespace=None):
+    """
+    Retrieves a table from each of specified namespaces. The tables
+    of different namespaces are fetched concurrently
+
+    Returns:
+        a dict where the key is a namespace and the value is the table
+        in that namespace. The namespaces are in the order of get_namespace_list()
+    """
+    ns_list = get_namespace_list(namespace)
+    if len(ns_list) < 2:
+        return {ns: get_table_for_asic(table, ns) for ns in ns_list}
+
+    with ThreadPoolExecutor(max_workers=len(ns_list)) as executor:
+        ns_tables = executor.map(lambda ns: get_table_for_asic(table, ns), ns_list)
+        return dict(zip(ns_list, ns_tables))
+
+
 def get_port_entry_for_asic(port, namespace):
 
     return get_table_entry_for_asic(PORT_CFG_DB_TABLE, port, namespace)
@@ -315,8 +428,7 @@ def get_port_entry_for_asic(port, namespace):
 
 def get_table_entry_for_asic(table, entry, namespace):
 
-    config_db = connect_config_db_for_ns(namespace)
-    return config_db.get_entry(table, entry)
+    return call_config_db_for_ns(namespace, 'get_entry', table, entry)
 
 def get_port_table_for_asic(namespace):
 
@@ -325,8 +437,7 @@ def get_port_table_for_asic(namespace):
 
 def get_table_for_asic(table, namespace):
 
-    config_db = connect_config_db_for_ns(namespace)
-    return config_db.get_table(table)
+    return call_config_db_for_ns(namespace, 'get_table', table)
 
 
 def mod_entry(table, key, value, namespace=None, modIfExists=False):
@@ -340,21 +451,87 @@ def mod_entry(table, key, value, namespace=None, modIfExists=False):
 
     for ns in ns_list:
         if not modIfExists or get_table_entry_for_asic(table, key, ns):
-            config_db = connect_config_db_for_ns(ns)
-            config_db.mod_entry(table, key, value)
+            call_config_db_for_ns(ns, 'mod_entry', table, key, value)
 
 
-def get_namespace_for_port(port_name):
+def subscribe_port_table(namespace):
+    """
+    Subscribe to keyspace notifications of the PORT table in a namespace
+
+    Returns:
+        True if the subscription exists, False if it can't be created
+    """
+    if namespace in port_table_subscribers:
+        return True
+    try:
+        config_db = get_config_db_for_ns(namespace)
+        with config_db_locks[namespace]:
+            pubsub = config_db.get_redis_client(config_db.CONFIG_DB).pubsub()
+            pubsub.psubscribe("__keyspace@{}__:{}{}*".format(
+                config_db.get_dbid(config_db.CONFIG_DB), PORT_CFG_DB_TABLE, config_db.KEY_SEPARATOR))
+    except Exception:
+        drop_config_db_for_ns(namespace, config_db_handle.get(namespace))
+        return False
+    port_table_subscribers[namespace] = pubsub
+    return True
+
+
+def is_port_table_changed():
+    """
+    Check for PORT table changes reported since the last check
+
+    Returns:
+        True if a PORT table was changed in any subscribed namespace
+    """
+    changed = False
+    for namespace, pubsub in list(port_table_subscribers.items()):
+        try:
+            with config_db_locks[namespace]:
+                while True:
+                    message = pubsub.get_message()
+                    if not message:
+                        break
+                    if message.get('type') == 'pmessage':
+                        changed = True
+        except Exception:
+            # The subscription is lost, e.g. the database was restarted
+            drop_config_db_for_ns(namespace, config_db_handle.get(namespace))
+            changed = True
+    return changed
+
+
+def build_port_namespace_index():
+    """
+    Build the port name to namespace index from the PORT table keys of
+    all namespaces. A port found in several namespaces is mapped to the
+    first namespace of get_namespace_list()
 
+    Returns:
+        a tuple: the index, and True if PORT tables of all namespaces are
+        subscribed to, so the index can be kept until a change is reported
+    """
     ns_list = get_namespace_list()
-    port_namespace = None
+    # subscribe before reading, so a change made during the read isn't lost
+    subscribed = all([subscribe_port_table(ns) for ns in ns_list])
+    is_port_table_changed()
 
+    index = {}
     for ns in ns_list:
-        ports = get_port_table_for_asic(ns)
-        if port_name in ports:
-            port_namespace = ns
-            break
+        for port in call_config_db_for_ns(ns, 'get_keys', PORT_CFG_DB_TABLE):
+            index.setdefault(port, ns)
+    return index, subscribed
+
+
+def get_namespace_for_port(port_name):
+
+    global port_namespace_index
+
+    index = port_namespace_index
+    if index is None or is_port_table_changed() or port_name not in index:
+        index, subscribed = build_port_namespace_index()
+        port_namespace_index = index if subscribed else None
 
+    port_namespace = index.get(port_name)
     if port_namespace is None:
         raise ValueError('Unknown port name {}'.format(port_name))
 
@@ -406,8 +583,7 @@ def is_port_channel_internal(port_channel, namespace=None):
     ns_list = get_namespace_list(namespace)
 
     for ns in ns_list:
-        config_db = connect_config_db_for_ns(ns)
-        port_channel_members = config_db.get_keys(PORT_CHANNEL_MEMBER_CFG_DB_TABLE)
+        port_channel_members = call_config_db_for_ns(ns, 'get_keys', PORT_CHANNEL_MEMBER_CFG_DB_TABLE)
 
         for port_channel_member in port_channel_members:
             if port_channel_member[0] != port_channel:
@@ -431,8 +607,7 @@ def get_back_end_interface_set(namespace=None):
     if len(bk_end_intf_list):
         ns_list = get_namespace_list(namespace)
         for ns in ns_list:
-            config_db = connect_config_db_for_ns(ns)
-            port_channel_members = config_db.get_keys(PORT_CHANNEL_MEMBER_CFG_DB_TABLE)
+            port_channel_members = call_config_db_for_ns(ns, 'get_keys', PORT_CHANNEL_MEMBER_CFG_DB_TABLE)
             # a back-end LAG must be configured with all of its member from back-end interfaces.
             # mixing back-end and front-end interfaces is miss configuration and not allowed.
             # To determine if a LAG is back-end LAG, just need to check its first member is back-end or not
@@ -453,15 +628,14 @@ def is_bgp_session_internal(bgp_neigh_ip, namespace=None):
 
     for ns in ns_list:
 
-        config_db = connect_config_db_for_ns(ns)
-        bgp_sessions = config_db.get_entry(
-            BGP_INTERNAL_NEIGH_CFG_DB_TABLE, bgp_neigh_ip
+        bgp_sessions = call_config_db_for_ns(
+            ns, 'get_entry', BGP_INTERNAL_NEIGH_CFG_DB_TABLE, bgp_neigh_ip
         )
         if bgp_sessions:
             return True
 
-        bgp_sessions = config_db.get_entry(
-            'BGP_VOQ_CHASSIS_NEIGHBOR', bgp_neigh_ip
+        bgp_sessions = call_config_db_for_ns(
+            ns, 'get_entry', 'BGP_VOQ_CHASSIS_NEIGHBOR', bgp_neigh_ip
         )
         if bgp_sessions:
             return True
@@ -96,6 +96,112 @@ class TestDeviceInfo(object):
                 assert result == EXPECTED_GET_MACHINE_INFO_RESULT
                 open_mocked.assert_called_once_with("/host/machine.conf")
 
+    def test_get_machine_info_cached(self, tmp_path):
+        machine_conf = tmp_path / "machine.conf"
+        machine_conf.write_text(MACHINE_CONF_CONTENTS)
+        device_info.invalidate_device_info_cache()
+        with mock.patch("sonic_py_common.device_info.MACHINE_CONF_PATH", str(machine_conf)), \
+             mock.patch("sonic_py_common.device_info.read_conf_tokens",
+                        wraps=device_info.read_conf_tokens) as read_mocked:
+            assert device_info.get_machine_info() == EXPECTED_GET_MACHINE_INFO_RESULT
+            assert device_info.get_machine_info() == EXPECTED_GET_MACHINE_INFO_RESULT
+            assert read_mocked.call_count == 1
+            # the file is replaced
+            machine_conf.write_text("onie_platform=x86_64-mlnx_msn2700-r0\n")
+            os.utime(str(machine_conf), ns=(0, 0))
+            assert device_info.get_machine_info() == {"onie_platform": "x86_64-mlnx_msn2700-r0"}
+            assert read_mocked.call_count == 2
+            # the cache is disabled
+            device_info.set_device_info_cache(False)
+            device_info.get_machine_info()
+            device_info.get_machine_info()
+            assert read_mocked.call_count == 4
+        device_info.set_device_info_cache(True)
+
+    def test_get_localhost_info_cached(self):
+        device_info.invalidate_device_info_cache()
+        metadata = {'localhost': {'hwsku': 'sku1'}}
+        messages = []
+        with mock.patch("sonic_py_common.device_info.ConfigDBConnector") as mock_connector:
+            config_db = mock_connector.return_value
+            config_db.get_table.side_effect = lambda table: json.loads(json.dumps(metadata))
+            pubsub = config_db.get_redis_client.return_value.pubsub.return_value
+            # swsscommon returns an empty dict when no message is pending
+            pubsub.get_message.side_effect = lambda: messages.pop(0) if messages else {}
+            assert device_info.get_localhost_info('hwsku') == 'sku1'
+            assert device_info.get_localhost_info('hwsku') == 'sku1'
+            assert config_db.get_table.call_count == 1
+            # the returned entry is a copy of the cached one
+            device_info.get_localhost_metadata()['hwsku'] = 'modified'
+            assert device_info.get_localhost_info('hwsku') == 'sku1'
+            # a change is reported
+            metadata['localhost']['hwsku'] = 'sku2'
+            messages.append({'type': 'pmessage', 'data': 'hset'})
+            assert device_info.get_localhost_info('hwsku') == 'sku2'
+            assert config_db.get_table.call_count == 2
+            # the subscription is lost, e.g. redis was restarted
+            metadata['localhost']['hwsku'] = 'sku3'
+            pubsub.get_message.side_effect = ConnectionError()
+            assert device_info.get_localhost_info('hwsku') == 'sku3'
+            assert mock_connector.call_count == 2
+        device_info.invalidate_device_info_cache()
+
+    def test_get_localhost_info_cached_concurrent(self):
+        import threading
+        import time
+        device_info.invalidate_device_info_cache()
+        active = []
+        overlaps = []
+        def get_message():
+            # the pubsub isn't thread safe, it is drained by one thread at a time
+            active.append(1)
+            if len(active) > 1:
+                overlaps.append(len(active))
+            time.sleep(0.001)
+            active.pop()
+            return {}
+        with mock.patch("sonic_py_common.device_info.ConfigDBConnector") as mock_connector:
+            config_db = mock_connector.return_value
+            config_db.get_table.side_effect = lambda table: {'localhost': {'hwsku': 'sku1'}}
+            pubsub = config_db.get_redis_client.return_value.pubsub.return_value
+            pubsub.get_message.side_effect = get_message
+            results = []
+            threads = [threading.Thread(target=lambda: results.extend(
+                device_info.get_localhost_info('hwsku') for _ in range(20))) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(10)
+            assert results == ['sku1'] * 160
+            assert overlaps == []
+            # the connection and the snapshot are created once
+            assert mock_connector.call_count == 1
+            assert config_db.get_table.call_count == 1
+        device_info.invalidate_device_info_cache()
+
+    def test_read_cached_file_concurrent(self, tmp_path):
+        import threading
+        import time
+        device_info.invalidate_device_info_cache()
+        conf = tmp_path / "machine.conf"
+        conf.write_text(MACHINE_CONF_CONTENTS)
+        parsed = []
+        def parse(path):
+            parsed.append(path)
+            time.sleep(0.01)
+            return device_info.read_conf_tokens(path)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(device_info.read_cached_file(str(conf), parse)))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+        # the file is parsed once, all callers share the result
+        assert len(parsed) == 1
+        assert len(results) == 8 and all(result is results[0] for result in results)
+        device_info.invalidate_device_info_cache()
+
     def test_get_platform(self):
         with mock.patch("sonic_py_common.device_info.get_machine_info") as get_machine_info_mocked:
             get_machine_info_mocked.return_value = EXPECTED_GET_MACHINE_INFO_RESULT
@@ -370,3 +476,34 @@ class TestDeviceInfo(object):
     @classmethod
     def teardown_class(cls):
         print("TEARDOWN")
+
+    def test_get_system_mac_native(self, tmp_path):
+        (tmp_path / "eth0").mkdir()
+        (tmp_path / "eth0" / "address").write_text("00:11:22:33:44:55\n")
+        with mock.patch("sonic_py_common.device_info.SYS_CLASS_NET_PATH", str(tmp_path)), \
+             mock.patch("sonic_py_common.device_info.get_platform", return_value="x86_64-dell_s6000_s1220-r0"), \
+             mock.patch("sonic_py_common.device_info.get_sonic_version_info", return_value={"asic_type": "broadcom"}), \
+             mock.patch("sonic_py_common.device_info.run_command") as mock_run_command:
+            assert device_info.get_system_mac() == "00:11:22:33:44:55"
+            mock_run_command.assert_not_called()
+
+    def test_read_profile_mac(self, tmp_path):
+        profile = tmp_path / "profile.ini"
+        profile.write_text("switchMacAddress=00:11:22:33:44:55\nasic1switchMacAddress=00:11:22:33:44:66\n")
+        assert device_info._read_profile_mac(str(profile), "asic1switchMacAddress") == ("00:11:22:33:44:66", None)
+        mac, err = device_info._read_profile_mac(str(profile), "asic2switchMacAddress")
+        assert err
+
+    def test_syseeprom_mac_cached_per_boot(self, tmp_path):
+        boot_id = tmp_path / "boot_id"
+        boot_id.write_text("boot-1\n")
+        cache_file = tmp_path / "mac"
+        with mock.patch("sonic_py_common.device_info.BOOT_ID_PATH", str(boot_id)), \
+             mock.patch("sonic_py_common.device_info.SYSEEPROM_MAC_CACHE_FILE", str(cache_file)), \
+             mock.patch("sonic_py_common.device_info.run_command", return_value=("00:11:22:33:44:55\n", "")) as mock_run_command:
+            assert device_info._get_syseeprom_mac(["decode-syseeprom", "-m"])[0].strip() == "00:11:22:33:44:55"
+            assert device_info._get_syseeprom_mac(["decode-syseeprom", "-m"]) == ("00:11:22:33:44:55", None)
+            assert mock_run_command.call_count == 1
+            boot_id.write_text("boot-2\n")
+            device_info._get_syseeprom_mac(["decode-syseeprom", "-m"])
+            assert mock_run_command.call_count == 2
@@ -23,3 +23,111 @@ class TestMultiAsic:
                 assert multi_asic.get_asic_sub_role(0) == 'FrontEnd'
                 assert multi_asic.get_asic_sub_role(1) == 'BackEnd'
                 assert multi_asic.get_asic_sub_role(2) == None
+
+    def test_config_db_pool(self):
+        multi_asic.reset_config_db_pool()
+        with mock.patch('sonic_py_common.multi_asic.connect_config_db_for_ns') as mock_connect:
+            mock_connect.side_effect = lambda ns: mock.MagicMock(name=ns)
+            config_db = multi_asic.get_config_db_for_ns('asic0')
+            assert multi_asic.get_config_db_for_ns('asic0') is config_db
+            assert multi_asic.get_config_db_for_ns('asic1') is not config_db
+            assert mock_connect.call_count == 2
+            multi_asic.reset_config_db_pool()
+            assert multi_asic.get_config_db_for_ns('asic0') is not config_db
+        multi_asic.reset_config_db_pool()
+
+    def test_get_namespace_for_port(self):
+        multi_asic.reset_config_db_pool()
+        ports = {'asic0': ['Ethernet0', 'Ethernet4'], 'asic1': ['Ethernet8']}
+        messages = []
+        def connect(ns):
+            config_db = mock.MagicMock()
+            config_db.get_keys.side_effect = lambda table: list(ports[ns])
+            config_db.get_redis_client.return_value.pubsub.return_value.get_message.side_effect = \
+                lambda: messages.pop(0) if messages else {}
+            return config_db
+        with mock.patch('sonic_py_common.multi_asic.connect_config_db_for_ns', side_effect=connect), \
+             mock.patch('sonic_py_common.multi_asic.get_namespace_list', return_value=['asic0', 'asic1']):
+            assert multi_asic.get_namespace_for_port('Ethernet8') == 'asic1'
+            assert multi_asic.get_namespace_for_port('Ethernet0') == 'asic0'
+            assert multi_asic.get_config_db_for_ns('asic0').get_keys.call_count == 1
+            # the port moved to another namespace, and the change is reported by a notification
+            ports['asic0'].remove('Ethernet4')
+            ports['asic1'].append('Ethernet4')
+            messages.append({'type': 'pmessage', 'data': 'del'})
+            assert multi_asic.get_namespace_for_port('Ethernet4') == 'asic1'
+            assert multi_asic.get_config_db_for_ns('asic0').get_keys.call_count == 2
+            try:
+                multi_asic.get_namespace_for_port('Ethernet100')
+                assert False, 'ValueError is expected'
+            except ValueError:
+                pass
+        multi_asic.reset_config_db_pool()
+
+    def test_get_table_for_all_asics(self):
+        tables = {'asic0': {'Ethernet0': {'lanes': '0'}}, 'asic1': {'Ethernet8': {'lanes': '8'}}}
+        with mock.patch('sonic_py_common.multi_asic.get_table_for_asic', side_effect=lambda table, ns: tables[ns]), \
+             mock.patch('sonic_py_common.multi_asic.get_namespace_list', return_value=['asic0', 'asic1']):
+            assert multi_asic.get_table_for_all_asics('PORT') == tables
+            assert multi_asic.get_table('PORT') == {'Ethernet0': {'lanes': '0'}, 'Ethernet8': {'lanes': '8'}}
+
+    def test_config_db_pool_reconnect(self):
+        multi_asic.reset_config_db_pool()
+        with mock.patch('sonic_py_common.multi_asic.connect_config_db_for_ns') as mock_connect:
+            mock_connect.side_effect = lambda ns: mock.MagicMock(name=ns)
+            stale = multi_asic.get_config_db_for_ns('asic0')
+            stale.get_table.side_effect = ConnectionError('connection reset')
+            # the failed handle is replaced and the call is retried on a new connection
+            assert multi_asic.get_table_for_asic('PORT', 'asic0') is not None
+            assert multi_asic.get_config_db_for_ns('asic0') is not stale
+            assert mock_connect.call_count == 2
+            mock_connect.side_effect = lambda ns: mock.MagicMock(**{'get_entry.side_effect': ConnectionError()})
+            multi_asic.reset_config_db_pool()
+            try:
+                multi_asic.get_table_entry_for_asic('PORT', 'Ethernet0', 'asic0')
+                assert False, 'ConnectionError is expected'
+            except ConnectionError:
+                pass
+            assert 'asic0' not in multi_asic.config_db_handle
+        multi_asic.reset_config_db_pool()
+
+    def test_config_db_pool_no_retry(self):
+        multi_asic.reset_config_db_pool()
+        with mock.patch('sonic_py_common.multi_asic.connect_config_db_for_ns') as mock_connect:
+            mock_connect.side_effect = lambda ns: mock.MagicMock(name=ns)
+            config_db = multi_asic.get_config_db_for_ns('asic0')
+            # an error which isn't a lost connection keeps the handle and isn't retried
+            config_db.get_table.side_effect = TypeError('bad argument')
+            try:
+                multi_asic.get_table_for_asic('PORT', 'asic0')
+                assert False, 'TypeError is expected'
+            except TypeError:
+                pass
+            assert config_db.get_table.call_count == 1
+            assert multi_asic.get_config_db_for_ns('asic0') is config_db
+            # a write isn't replayed on a new connection
+            config_db.mod_entry.side_effect = RuntimeError('RedisReply catches system_error: Connection reset by peer')
+            with mock.patch('sonic_py_common.multi_asic.get_namespace_list', return_value=['asic0']):
+                try:
+                    multi_asic.mod_entry('PORT', 'Ethernet0', {'admin_status': 'up'})
+                    assert False, 'RuntimeError is expected'
+                except RuntimeError:
+                    pass
+            assert config_db.mod_entry.call_count == 1
+            assert multi_asic.get_config_db_for_ns('asic0') is not config_db
+            assert mock_connect.call_count == 2
+        multi_asic.reset_config_db_pool()
+
+    def test_port_table_subscription_lost(self):
+        multi_asic.reset_config_db_pool()
+        with mock.patch('sonic_py_common.multi_asic.connect_config_db_for_ns') as mock_connect:
+            mock_connect.side_effect = lambda ns: mock.MagicMock(name=ns)
+            assert multi_asic.subscribe_port_table('asic0')
+            pubsub = multi_asic.port_table_subscribers['asic0']
+            pubsub.get_message.side_effect = [{}]
+            assert not multi_asic.is_port_table_changed()
+            pubsub.get_message.side_effect = ConnectionError()
+            assert multi_asic.is_port_table_changed()
+            assert 'asic0' not in multi_asic.port_table_subscribers
+            assert 'asic0' not in multi_asic.config_db_handle
+        multi_asic.reset_config_db_pool()
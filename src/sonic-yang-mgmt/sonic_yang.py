@@ -1,9 +1,10 @@
 import yang as ly
 import syslog
+import os
 
 from json import dump
 from glob import glob
-from sonic_yang_ext import SonicYangExtMixin, SonicYangException
+from sonic_yang_ext import SonicYangExtMixin, SonicYangException, SCHEMA_CACHE_FILE
 from sonic_yang_path import SonicYangPathMixin
 
 """
@@ -33,6 +34,10 @@ class SonicYang(SonicYangExtMixin, SonicYangPathMixin):
         self.confDbYangMap = dict()
         # JSON format of yang model [similar to pyang conversion]
         self.yJson = list()
+        # compiled schema cache, which stores yJson with compiled uses clause,
+        # and hash of yang models loaded
+        self.schemaCacheFile = os.path.join(yang_dir, SCHEMA_CACHE_FILE)
+        self.yangDirHash = None
         # config DB json input, will be cropped as yang models
         self.jIn = dict()
         # YANG JSON, this is traslated from config DB json
@@ -50,6 +55,23 @@ class SonicYang(SonicYangExtMixin, SonicYangPathMixin):
         self.mustCache = dict()
         # Lazy caching for configdb to xpath
         self.configPathCache = dict()
+        # Index of schema nodes, built once per loaded schema:
+        # [(schema path, list of referencing leafref paths, must count)]
+        # and {schema path: position of the path in the index}
+        self.schemaRefIndex = None
+        self.schemaRefIndexPos = None
+        # Index of leafref data nodes, built for each leafref on first use
+        # after the data tree changed:
+        # {leafref schema path: (list of data paths, {value: list of data paths})}
+        self.dataRefIndex = None
+        # map from config DB table to tables it depends on and reverse map,
+        # created when incremental validation session is started
+        self.tableDepMap = None
+        self.tableRevDepMap = None
+        # config DB json and yang json of each table in incremental
+        # validation session
+        self.sessionConfig = None
+        self.sessionXlate = dict()
         # element path for CONFIG DB. An example for this list could be:
         # ['PORT', 'Ethernet0', 'speed']
         self.elementPath = []
@@ -86,6 +108,7 @@ class SonicYang(SonicYangExtMixin, SonicYangPathMixin):
     """
     def _load_schema_module(self, yang_file):
         try:
+            self.schemaRefIndex = None
             return self.ctx.parse_module_path(yang_file, ly.LYS_IN_YANG)
         except Exception as e:
             self.sysLog(msg="Failed to load yang module file: " + yang_file, debug=syslog.LOG_ERR, doPrint=True)
@@ -150,6 +173,7 @@ class SonicYang(SonicYangExtMixin, SonicYangPathMixin):
            self.fail(e)
        else:
            self.root = data_node
+           self.dataRefIndex = None
 
     """
     get module name from xpath
@@ -207,6 +231,7 @@ class SonicYang(SonicYangExtMixin, SonicYangPathMixin):
     """
     def load_module_str_name(self, yang_module_str):
         try:
+            self.schemaRefIndex = None
             module = self.ctx.parse_module_mem(yang_module_str, ly.LYS_IN_YANG)
         except Exception as e:
             self.fail(e)
@@ -336,6 +361,7 @@ class SonicYang(SonicYangExtMixin, SonicYangPathMixin):
     def _new_data_node(self, xpath, value):
         val = str(value)
         try:
+            self.dataRefIndex = None
             data_node = self.root.new_path(self.ctx, xpath, val, 0, 0)
         except Exception as e:
             self.sysLog(msg="Failed to add data node for path: " + str(xpath), debug=syslog.LOG_ERR, doPrint=True)
@@ -434,6 +460,7 @@ class SonicYang(SonicYangExtMixin, SonicYangPathMixin):
             source_node = ctx.parse_data_path(str(data_file), ly.LYD_JSON, ly.LYD_OPT_CONFIG | ly.LYD_OPT_STRICT)
 
             #merge
+            self.dataRefIndex = None
             self.root.merge(source_node, 0)
         except Exception as e:
             self.fail(e)
@@ -448,6 +475,7 @@ class SonicYang(SonicYangExtMixin, SonicYangPathMixin):
             node = self._find_data_node(xpath)
 
         if (node):
+            self.dataRefIndex = None
             node.unlink()
             dnode = self._find_data_node(xpath)
             if (dnode is None):
@@ -488,6 +516,7 @@ class SonicYang(SonicYangExtMixin, SonicYangPathMixin):
     """
     def _set_data_node_value(self, data_xpath, value):
         try:
+            self.dataRefIndex = None
             self.root.new_path(self.ctx, data_xpath, str(value), ly.LYD_ANYDATA_STRING, ly.LYD_PATH_OPT_UPDATE)
         except Exception as e:
             self.sysLog(msg="set data node value failed for xpath: " + str(data_xpath), debug=syslog.LOG_ERR, doPrint=True)
@@ -544,8 +573,8 @@ class SonicYang(SonicYangExtMixin, SonicYangPathMixin):
 
         count = 0
         # Recurse first
-        for elem in schema_node.tree_dfs():
-            count += self.__find_schema_must_count_only(elem)
+        for _, _, must_count in self._get_schema_subtree_index(schema_node.path()):
+            count += must_count
 
         # Pull self
         count += self.__find_schema_must_count_only(schema_node)
@@ -629,8 +658,8 @@ class SonicYang(SonicYangExtMixin, SonicYangPathMixin):
             return self.__find_schema_dependencies_only(schema_node)
 
         # Recurse first
-        for elem in schema_node.tree_dfs():
-            ref_list.extend(self.__find_schema_dependencies_only(elem))
+        for _, refs, _ in self._get_schema_subtree_index(schema_node.path()):
+            ref_list.extend(refs)
 
         # Pull self
         ref_list.extend(self.__find_schema_dependencies_only(schema_node))
@@ -665,6 +694,79 @@ class SonicYang(SonicYangExtMixin, SonicYangPathMixin):
         self.backlinkCache[key] = ref_list
         return ref_list
 
+    """
+    get_schema_ref_index(): get index of all schema nodes with their leafref
+                            backlinks and must counts, build it if schema
+                            changed.  Nodes are in order of depth-first walk.
+    returns:  list of (schema path, list of referencing leafref paths, must count)
+    """
+    def _get_schema_ref_index(self):
+        if self.schemaRefIndex is not None:
+            return self.schemaRefIndex
+
+        index = []
+        index_pos = dict()
+        for module in self.ctx.get_module_iter():
+            if module.data() is None:
+                continue
+            for elem in module.data().tree_dfs():
+                path = elem.path()
+                index_pos.setdefault(path, len(index))
+                index.append((path, self.__find_schema_dependencies_only(elem),
+                              self.__find_schema_must_count_only(elem)))
+
+        self.schemaRefIndex = index
+        self.schemaRefIndexPos = index_pos
+        return index
+
+    """
+    get_schema_subtree_index(): get entries of schema index for a schema node
+                                and its descendants
+    input:    schema_xpath of the schema node
+    returns:  list of (schema path, list of referencing leafref paths, must count)
+    """
+    def _get_schema_subtree_index(self, schema_xpath):
+        prefix = schema_xpath + "/"
+        index = self._get_schema_ref_index()
+        pos = self.schemaRefIndexPos.get(schema_xpath)
+        if pos is None:
+            return []
+        # Descendants follow the node in depth-first order
+        end = pos + 1
+        while end < len(index) and (index[end][0] == schema_xpath or index[end][0].startswith(prefix)):
+            end += 1
+        return index[pos:end]
+
+    """
+    get_data_ref_index(): get index of data nodes of a leafref in data tree,
+                          build it on first use after data tree changed.
+    input:    lref - leafref schema path
+    returns:  (list of data paths, {value: list of data paths})
+    """
+    def _get_data_ref_index(self, lref):
+        if self.dataRefIndex is None:
+            self.dataRefIndex = dict()
+        entry = self.dataRefIndex.get(lref)
+        if entry is not None:
+            return entry
+
+        paths = []
+        value_paths = dict()
+        try:
+            data_set = self.root.find_path(lref).data()
+        except Exception as e:
+            # Possible no data paths matched, ignore
+            data_set = []
+        for dnode in data_set:
+            path = dnode.path()
+            paths.append(path)
+            if dnode.subtype() is not None:
+                value_paths.setdefault(dnode.subtype().value_str(), []).append(path)
+
+        entry = (paths, value_paths)
+        self.dataRefIndex[lref] = entry
+        return entry
+
     """
     find_data_dependencies(): find the data dependencies from data xpath  (Public)
     input:    data_xpath - xpath to search.  If it references an exact data node
@@ -730,16 +832,11 @@ class SonicYang(SonicYangExtMixin, SonicYangPathMixin):
         # For all found data nodes, emit the path to the data node.  If we need to
         # restrict to a value, do so.
         for lref in lreflist:
-            try:
-                data_set = self.root.find_path(lref).data()
-                for dnode in data_set:
-                    if required_value is None or (
-                        dnode.subtype() is not None and dnode.subtype().value_str() == required_value
-                    ):
-                        ref_list.append(dnode.path())
-            except Exception as e:
-                # Possible no data paths matched, ignore
-                pass
+            paths, value_paths = self._get_data_ref_index(lref)
+            if required_value is None:
+                ref_list.extend(paths)
+            else:
+                ref_list.extend(value_paths.get(required_value, []))
 
         return ref_list
 
@@ -4,7 +4,10 @@
 from __future__ import print_function
 import yang as ly
 import syslog
-from json import dump, dumps, loads
+import hashlib
+import os
+import re
+from json import dump, dumps, load, loads
 from xmltodict import parse
 from glob import glob
 import copy
@@ -37,6 +40,10 @@ LEAF_LIST_WITH_STRING_VALUE_DICT = {
     ('PORT', 'adv_interface_types'): ',',
 }
 
+# File name of compiled schema cache in yang directory, and version of its format
+SCHEMA_CACHE_FILE = 'sonic_yang_schema_cache.json'
+SCHEMA_CACHE_VERSION = 1
+
 """
 This is the Exception thrown out of all public function of this class.
 """
@@ -62,18 +69,26 @@ class SonicYangExtMixin(SonicYangPathMixin):
                 else:
                     raise(Exception("Could not load module {}".format(file)))
 
+            yangDirHash = self._getYangFilesHash(self.yangFiles)
+
             # keep only modules name in self.yangFiles
             self.yangFiles = [f.split('/')[-1] for f in self.yangFiles]
             self.yangFiles = [f.split('.')[0] for f in self.yangFiles]
             self.sysLog(syslog.LOG_DEBUG,'Loaded below Yang Models')
             self.sysLog(syslog.LOG_DEBUG,str(self.yangFiles))
 
-            # load json for each yang model
-            self._loadJsonYangModel()
-            # create a map from config DB table to yang container
-            self._createDBTableToModuleMap()
-            # compile uses clause (embed into schema)
-            self._compileUsesClause()
+            # load compiled json of yang models from schema cache if it is
+            # built from same yang models, uses clause is already compiled
+            if self._loadSchemaCache(yangDirHash):
+                self._createDBTableToModuleMap()
+            else:
+                # load json for each yang model
+                self._loadJsonYangModel()
+                # create a map from config DB table to yang container
+                self._createDBTableToModuleMap()
+                # compile uses clause (embed into schema)
+                self._compileUsesClause()
+            self.yangDirHash = yangDirHash
         except Exception as e:
             self.sysLog(msg="Yang Models Load failed:{}".format(str(e)), \
                 debug=syslog.LOG_ERR, doPrint=True)
@@ -81,6 +96,70 @@ class SonicYangExtMixin(SonicYangPathMixin):
 
         return True
 
+    """
+    get hash of yang model files, used as key of compiled schema cache
+    """
+    def _getYangFilesHash(self, yangFiles):
+
+        h = hashlib.sha256()
+        for file in sorted(yangFiles):
+            h.update(os.path.basename(file).encode())
+            with open(file, 'rb') as f:
+                h.update(f.read())
+
+        return h.hexdigest()
+
+    """
+    load compiled JSON schema of yang models from schema cache file, if the
+    cache is built from yang models with given hash.
+    returns: True if loaded, False otherwise
+    """
+    def _loadSchemaCache(self, yangDirHash):
+
+        if not self.schemaCacheFile or not os.path.exists(self.schemaCacheFile):
+            return False
+        try:
+            with open(self.schemaCacheFile) as f:
+                cache = load(f)
+            if cache.get('version') != SCHEMA_CACHE_VERSION or \
+                cache.get('hash') != yangDirHash:
+                self.sysLog(msg="Schema cache {} is outdated".format(self.schemaCacheFile))
+                return False
+            self.yJson.extend(cache['yJson'])
+        except Exception as e:
+            self.sysLog(msg="Schema cache {} load failed:{}".format(\
+                self.schemaCacheFile, str(e)), debug=syslog.LOG_WARNING)
+            return False
+        self.sysLog(msg="Loaded schema from cache {}".format(self.schemaCacheFile))
+
+        return True
+
+    """
+    save compiled JSON schema of loaded yang models to schema cache file, which
+    is loaded by loadYangModel() instead of compiling yang models if yang
+    models are not changed. (Public function)
+    input:    cacheFile - path of cache file, default is schema cache file in
+              yang directory
+    """
+    def saveSchemaCache(self, cacheFile=None):
+
+        if cacheFile is None:
+            cacheFile = self.schemaCacheFile
+        if self.yangDirHash is None:
+            raise SonicYangException("Yang models are not loaded")
+        try:
+            tmpFile = cacheFile + '.tmp'
+            with open(tmpFile, 'w') as f:
+                dump({'version': SCHEMA_CACHE_VERSION, 'hash': self.yangDirHash, \
+                    'yJson': self.yJson}, f)
+            os.replace(tmpFile, cacheFile)
+        except Exception as e:
+            self.sysLog(msg="Schema cache save failed:{}".format(str(e)), \
+                debug=syslog.LOG_ERR, doPrint=True)
+            raise SonicYangException("Schema cache save failed\n{}".format(str(e)))
+
+        return
+
     """
     load JSON schema format from yang models
     """
@@ -1244,6 +1323,7 @@ class SonicYangExtMixin(SonicYangPathMixin):
           self._xlateConfigDB(xlateFile=xlateFile)
           #print(self.xlateJson)
           self.sysLog(msg="Try to load Data in the tree")
+          self.dataRefIndex = None
           self.root = self.ctx.parse_data_mem(dumps(self.xlateJson), \
                         ly.LYD_JSON, ly.LYD_OPT_CONFIG|ly.LYD_OPT_STRICT)
 
@@ -1255,6 +1335,185 @@ class SonicYangExtMixin(SonicYangPathMixin):
 
        return True
 
+    """
+    Find xpath expressions of leafref path, must and when statements in yang
+    json of a container.
+    """
+    def _findXpathExprs(self, model, exprs):
+
+        if isinstance(model, list):
+            for item in model:
+                self._findXpathExprs(item, exprs)
+        elif isinstance(model, dict):
+            for key, value in model.items():
+                if key in ['must', 'when', 'path']:
+                    for stmt in (value if isinstance(value, list) else [value]):
+                        if isinstance(stmt, dict):
+                            exprs.append(stmt.get('@condition', stmt.get('@value', '')))
+                else:
+                    self._findXpathExprs(value, exprs)
+
+        return exprs
+
+    """
+    Create a map from config DB table to tables its data depends on. A table
+    depends on another table if it has leafref to it, found from schema
+    backlinks, or refers to it in must or when statements.
+    """
+    def _createTableDependencyMap(self):
+
+        tables = set(t for t, c in self.confDbYangMap.items() if 'topLevelContainer' in c)
+        self.tableDepMap = {table: set() for table in tables}
+        for table in tables:
+            exprs = self._findXpathExprs(self.confDbYangMap[table]['container'], [])
+            for token in re.findall(r'[\w-]+', ' '.join(exprs)):
+                if token in tables and token != table:
+                    self.tableDepMap[table].add(token)
+            schemaXpath = self.configdb_path_to_xpath('/' + table, schema_xpath=True)
+            for refXpath in self.find_schema_dependencies(schemaXpath, match_ancestors=True):
+                refTable = self.xpath_split(refXpath)[1].split(':')[-1]
+                if refTable in tables and refTable != table:
+                    self.tableDepMap[refTable].add(table)
+
+        self.tableRevDepMap = {table: set() for table in tables}
+        for table, depTables in self.tableDepMap.items():
+            for depTable in depTables:
+                self.tableRevDepMap[depTable].add(table)
+
+        return
+
+    """
+    Find tables need to be validated when given tables are changed, i.e.
+    changed tables and tables depending on them, along with all tables they
+    depend on.
+    """
+    def _findTablesToValidate(self, changedTables):
+
+        tables = set(changedTables)
+        for table in changedTables:
+            tables.update(self.tableRevDepMap.get(table, set()))
+        pending = list(tables)
+        while pending:
+            for depTable in self.tableDepMap.get(pending.pop(), set()):
+                if depTable not in tables:
+                    tables.add(depTable)
+                    pending.append(depTable)
+
+        return tables
+
+    """
+    Translate a config DB table to yang json, store it in self.sessionXlate.
+    """
+    def _xlateSessionTable(self, table):
+
+        yangJ = dict()
+        self._xlateConfigDBtoYang({table: self.sessionConfig[table]}, yangJ)
+        self.sessionXlate[table] = yangJ
+
+        return
+
+    """
+    Create data tree from translated tables and validate it.
+    """
+    def _validateSessionTables(self, tables):
+
+        yangJ = dict()
+        for table in tables:
+            for key, value in self.sessionXlate.get(table, dict()).items():
+                yangJ.setdefault(key, dict()).update(value)
+        if len(yangJ) == 0:
+            return
+
+        self.ctx.parse_data_mem(dumps(yangJ), \
+            ly.LYD_JSON, ly.LYD_OPT_CONFIG|ly.LYD_OPT_STRICT)
+
+        return
+
+    """
+    loadBaseData: load base Config DB for incremental validation session, it
+    is validated completely and loaded in data tree like loadData. Then diffs
+    are validated by applyDataDiff. (Public)
+    input:    configdbJson - will NOT be modified
+    returns:  True - success   False - failed
+    """
+    def loadBaseData(self, configdbJson):
+
+        self.loadData(configdbJson)
+        try:
+            if self.tableDepMap is None:
+                self._createTableDependencyMap()
+            # keep config and translation of each table
+            self.sessionConfig = dict(self.jIn)
+            self.sessionXlate = dict()
+            for table in self.sessionConfig:
+                self._xlateSessionTable(table)
+        except Exception as e:
+            self.sessionConfig = None
+            self.sysLog(msg="Base Data Loading Failed:{}".format(str(e)), \
+                debug=syslog.LOG_ERR, doPrint=True)
+            raise SonicYangException("Base Data Loading Failed\n{}".format(str(e)))
+
+        return True
+
+    """
+    applyDataDiff: apply diff to config loaded by loadBaseData and validate
+    it. Only changed tables are translated, and only changed tables, tables
+    depending on them and tables they depend on are validated. If validation
+    fails, diff is not applied. (Public)
+    input:    diff - {<table>: {<key>: <entry>}}, entry replaces the key in
+              table, if entry is None the key is deleted. If table is None
+              the whole table is deleted. Will NOT be modified.
+    returns:  True - success   False - failed
+    """
+    def applyDataDiff(self, diff):
+
+        if self.sessionConfig is None:
+            raise SonicYangException("Base data is not loaded")
+
+        backupConfig = dict()
+        backupXlate = dict()
+        try:
+            changedTables = set()
+            for table, tableDiff in diff.items():
+                if table not in self.confDbYangMap:
+                    self.tablesWithOutYang[table] = tableDiff
+                    continue
+                backupConfig[table] = self.sessionConfig.get(table)
+                backupXlate[table] = self.sessionXlate.get(table)
+                changedTables.add(table)
+                tableConfig = dict() if tableDiff is None else \
+                    dict(self.sessionConfig.get(table, dict()))
+                for key, entry in (tableDiff or dict()).items():
+                    if entry is None:
+                        tableConfig.pop(key, None)
+                    else:
+                        tableConfig[key] = entry
+                if len(tableConfig):
+                    self.sessionConfig[table] = tableConfig
+                    self._xlateSessionTable(table)
+                else:
+                    self.sessionConfig.pop(table, None)
+                    self.sessionXlate.pop(table, None)
+
+            tables = self._findTablesToValidate(changedTables)
+            self.sysLog(msg="Validate tables {} for changed tables {}".\
+                format(sorted(tables), sorted(changedTables)))
+            self._validateSessionTables(tables)
+        except Exception as e:
+            # revert diff
+            for table in backupConfig:
+                for sessionDict, backup in [(self.sessionConfig, backupConfig), \
+                    (self.sessionXlate, backupXlate)]:
+                    if backup[table] is None:
+                        sessionDict.pop(table, None)
+                    else:
+                        sessionDict[table] = backup[table]
+            self.sysLog(msg="Data Diff Validation Failed:{}".format(str(e)), \
+                debug=syslog.LOG_ERR, doPrint=True)
+            raise SonicYangException("Data Diff Validation Failed\n{}".format(str(e)))
+
+        return True
+
     """
     Get data from Data tree, data tree will be assigned in self.xlateJson. (Public)
     """
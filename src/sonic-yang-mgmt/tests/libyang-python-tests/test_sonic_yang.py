@@ -5,6 +5,7 @@ import sonic_yang as sy
 import json
 import glob
 import logging
+from unittest import mock
 from ijson import items as ijson_itmes
 
 test_path = os.path.dirname(os.path.abspath(__file__))
@@ -230,6 +231,32 @@ class Test_SonicYang(object):
             depend = yang_s.find_schema_dependencies(xpath)
             assert set(depend) == set(list)
 
+    #test dependencies are looked up from schema and data index
+    def test_dependency_index(self, yang_s, data):
+        for node in data['dependencies']:
+            xpath = str(node['xpath'])
+            list = node['dependencies']
+            yang_s.find_data_dependencies(xpath)
+            assert yang_s.schemaRefIndex is not None
+            assert yang_s.dataRefIndex is not None
+            # index is reused by next lookup
+            ref_index = yang_s.dataRefIndex
+            depend = yang_s.find_data_dependencies(xpath)
+            assert yang_s.dataRefIndex is ref_index
+            assert set(depend) == set(list)
+        # data index has only the leafrefs which were looked up
+        refs = [ref for _, refs, _ in yang_s.schemaRefIndex for ref in refs]
+        assert set(yang_s.dataRefIndex).issubset(set(refs))
+        for node in data['schema_dependencies']:
+            xpath = str(node['xpath'])
+            depend = yang_s.find_schema_dependencies(xpath, match_ancestors=True)
+            assert set(node['schema_dependencies']).issubset(set(depend))
+        # subtree slice of schema index is the same as a scan of the whole index
+        for path, _, _ in yang_s.schemaRefIndex:
+            subtree = [entry for entry in yang_s.schemaRefIndex
+                       if entry[0] == path or entry[0].startswith(path + "/")]
+            assert yang_s._get_schema_subtree_index(path) == subtree
+
     #test merge data tree
     def test_merge_data_tree(self, data, yang_s):
         data_merge_file = data['data_merge_file']
@@ -387,6 +414,80 @@ class Test_SonicYang(object):
 
         return
 
+    def test_schema_cache(self, sonic_yang_data, tmpdir):
+        # In this test, yang models are loaded without and with compiled schema
+        # cache, loaded schema should be same.
+        cache_file = str(tmpdir.join("sonic_yang_schema_cache.json"))
+        load_json = sy.SonicYang._loadJsonYangModel
+
+        with mock.patch.object(sy.SonicYang, '_loadJsonYangModel', autospec=True, side_effect=load_json) as mock_load:
+            syc_cold = sy.SonicYang(sonic_yang_data['yang_dir'])
+            syc_cold.schemaCacheFile = cache_file
+            syc_cold.loadYangModel()
+            syc_cold.saveSchemaCache()
+            assert mock_load.call_count == 1
+
+            # schema is loaded from the cache, yang models aren't converted to json
+            mock_load.reset_mock()
+            syc_warm = sy.SonicYang(sonic_yang_data['yang_dir'])
+            syc_warm.schemaCacheFile = cache_file
+            syc_warm.loadYangModel()
+            mock_load.assert_not_called()
+
+        assert syc_warm.yJson == syc_cold.yJson
+        assert syc_warm.confDbYangMap == syc_cold.confDbYangMap
+        assert syc_warm.preProcessedYang == syc_cold.preProcessedYang
+
+        # cache built from other yang models is not used
+        with open(cache_file) as f:
+            cache = json.load(f)
+        cache['hash'] = 'outdated'
+        cache['yJson'] = []
+        with open(cache_file, 'w') as f:
+            json.dump(cache, f)
+        with mock.patch.object(sy.SonicYang, '_loadJsonYangModel', autospec=True, side_effect=load_json) as mock_load:
+            syc_outdated = sy.SonicYang(sonic_yang_data['yang_dir'])
+            syc_outdated.schemaCacheFile = cache_file
+            syc_outdated.loadYangModel()
+            assert mock_load.call_count == 1
+        assert syc_outdated.yJson == syc_cold.yJson
+
+        return
+
+    def test_incremental_validation(self, sonic_yang_data):
+        # In this test, config is loaded as base data, then diffs are applied
+        # and validated incrementally.
+        test_file = sonic_yang_data['test_file']
+        syc = sonic_yang_data['syc']
+
+        jIn = self.readIjsonInput(test_file, 'SAMPLE_CONFIG_DB_JSON')
+        jIn = json.loads(jIn)
+        port = jIn['PORT']['Ethernet0']
+
+        syc.loadBaseData(jIn)
+        assert 'VLAN_MEMBER' in syc._findTablesToValidate({'PORT'})
+        assert 'PORT' in syc._findTablesToValidate({'VLAN_MEMBER'})
+
+        # valid change
+        new_port = dict(port)
+        new_port['description'] = 'uplink'
+        assert syc.applyDataDiff({'PORT': {'Ethernet0': new_port}}) == True
+        assert syc.sessionConfig['PORT']['Ethernet0']['description'] == 'uplink'
+
+        # port referenced by vlan member can not be deleted, diff is reverted
+        with pytest.raises(sy.SonicYangException):
+            syc.applyDataDiff({'PORT': {'Ethernet0': None}})
+        assert syc.sessionConfig['PORT']['Ethernet0'] == new_port
+
+        # vlan member can be deleted
+        assert syc.applyDataDiff({'VLAN_MEMBER': {'Vlan111|Ethernet0': None}}) == True
+        assert 'Vlan111|Ethernet0' not in syc.sessionConfig['VLAN_MEMBER']
+        # input config is not modified
+        assert jIn['PORT']['Ethernet0'] == port
+        assert 'Vlan111|Ethernet0' in jIn['VLAN_MEMBER']
+
+        return
+
     def test_xlate_rev_xlate(self, sonic_yang_data):
         # In this test, xlation and revXlation is tested with latest Sonic
         # YANG model.
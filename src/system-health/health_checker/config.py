@@ -15,6 +15,9 @@ class Config(object):
     # Default boot up timeout. When reboot system, system health will wait a few seconds before starting to work.
     DEFAULT_BOOTUP_TIMEOUT = 300
 
+    # Default time in seconds a single checker may run before it is reported as timed out.
+    DEFAULT_CHECKER_TIMEOUT = 30
+
     # Default LED configuration. Different platform has different LED capability. This configuration allow vendor to
     # override the default behavior.
     DEFAULT_LED_CONFIG = {
@@ -41,6 +44,7 @@ class Config(object):
         self._last_mtime = None
         self.config_data = None
         self.interval = Config.DEFAULT_INTERVAL
+        self.checker_timeout = Config.DEFAULT_CHECKER_TIMEOUT
         self.ignore_services = None
         self.ignore_devices = None
         self.user_defined_checkers = None
@@ -69,6 +73,7 @@ class Config(object):
                     self.config_data = json.load(f)
 
                 self.interval = self.config_data.get('polling_interval', Config.DEFAULT_INTERVAL)
+                self.checker_timeout = self.config_data.get('checker_timeout', Config.DEFAULT_CHECKER_TIMEOUT)
                 self.ignore_services = self._get_list_data('services_to_ignore')
                 self.ignore_devices = self._get_list_data('devices_to_ignore')
                 self.user_defined_checkers = self._get_list_data('user_defined_checkers')
@@ -84,6 +89,7 @@ class Config(object):
         self._last_mtime = None
         self.config_data = None
         self.interval = Config.DEFAULT_INTERVAL
+        self.checker_timeout = Config.DEFAULT_CHECKER_TIMEOUT
         self.ignore_services = None
         self.ignore_devices = None
         self.user_defined_checkers = None
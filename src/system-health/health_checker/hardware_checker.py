@@ -1,3 +1,6 @@
+import json
+import time
+
 from natsort import natsorted
 from swsscommon import swsscommon
 from swsscommon.swsscommon import SonicV2Connector
@@ -17,18 +20,50 @@ class HardwareChecker(HealthChecker):
     PSU_TABLE_NAME = 'PSU_INFO'
     LIQUID_COOLING_TABLE_NAME = 'LIQUID_COOLING_INFO'
 
+    # Key patterns of the hardware tables read by the checker
+    ASIC_TEMPERATURE_PATTERN = ASIC_TEMPERATURE_KEY + '*'
+    FAN_PATTERN = FAN_TABLE_NAME + '*'
+    PSU_PATTERN = PSU_TABLE_NAME + '*'
+    LIQUID_COOLING_PATTERN = LIQUID_COOLING_TABLE_NAME + '|*'
+
+    # Read all entries of the key patterns passed as ARGV with one call. Return a JSON object
+    # {<pattern>: {<key>: {<field>: <value>}}}
+    FETCH_SCRIPT = """
+local result = {}
+for _, pattern in ipairs(ARGV) do
+    local entries = {}
+    for _, key in ipairs(redis.call('KEYS', pattern)) do
+        local fvs = redis.call('HGETALL', key)
+        local entry = {}
+        for i = 1, #fvs, 2 do
+            entry[fvs[i]] = fvs[i + 1]
+        end
+        entries[key] = entry
+    end
+    result[pattern] = entries
+end
+return cjson.encode(result)
+"""
+
     def __init__(self):
         HealthChecker.__init__(self)
         self._db = SonicV2Connector(use_unix_socket_path=True)
         self._db.connect(self._db.STATE_DB)
 
         self.leaking_sensors = []
+        # Entries of the hardware tables read in the current check: {<pattern>: {<key>: {<field>: <value>}}}
+        self._hardware_data = {}
+        self._stats = {}
 
     def get_category(self):
         return 'Hardware'
 
+    def get_stats(self):
+        return self._stats
+
     def check(self, config):
         self.reset()
+        self._fetch_hardware_data(config)
         self._check_asic_status(config)
         self._check_fan_status(config)
         self._check_psu_status(config)
@@ -43,13 +78,10 @@ class HardwareChecker(HealthChecker):
         if config.ignore_devices and 'asic' in config.ignore_devices:
             return
 
-        ASIC_TEMPERATURE_KEY_LIST = self._db.keys(self._db.STATE_DB,
-                                                  HardwareChecker.ASIC_TEMPERATURE_KEY + '*')
-        for asic_key in ASIC_TEMPERATURE_KEY_LIST:
-            temperature = self._db.get(self._db.STATE_DB, asic_key,
-                                                          'temperature')
-            temperature_threshold = self._db.get(self._db.STATE_DB, asic_key,
-                                                          'high_threshold')
+        asic_entries = self._hardware_data.get(HardwareChecker.ASIC_TEMPERATURE_PATTERN, {})
+        for asic_key, data_dict in asic_entries.items():
+            temperature = data_dict.get('temperature')
+            temperature_threshold = data_dict.get('high_threshold')
             asic_name = asic_key.split('|')[1]
             if not temperature:
                 self.set_object_not_ok('ASIC', asic_name,
@@ -85,7 +117,8 @@ class HardwareChecker(HealthChecker):
         if config.ignore_devices and 'fan' in config.ignore_devices:
             return
 
-        keys = self._db.keys(self._db.STATE_DB, HardwareChecker.FAN_TABLE_NAME + '*')
+        entries = self._hardware_data.get(HardwareChecker.FAN_PATTERN, {})
+        keys = list(entries.keys())
         if not keys:
             self.set_object_not_ok('Fan', 'Fan', 'Failed to get fan information')
             return
@@ -100,7 +133,7 @@ class HardwareChecker(HealthChecker):
             name = key_list[1]
             if config.ignore_devices and name in config.ignore_devices:
                 continue
-            data_dict = self._db.get_all(self._db.STATE_DB, key)
+            data_dict = entries[key]
             presence = data_dict.get('presence', 'false')
             if presence.lower() != 'true':
                 self.set_object_not_ok('Fan', name, '{} is missing'.format(name))
@@ -176,7 +209,8 @@ class HardwareChecker(HealthChecker):
         if config.ignore_devices and 'psu' in config.ignore_devices:
             return
 
-        keys = self._db.keys(self._db.STATE_DB, HardwareChecker.PSU_TABLE_NAME + '*')
+        entries = self._hardware_data.get(HardwareChecker.PSU_PATTERN, {})
+        keys = list(entries.keys())
         if not keys:
             self.set_object_not_ok('PSU', 'PSU', 'Failed to get PSU information')
             return
@@ -191,7 +225,7 @@ class HardwareChecker(HealthChecker):
             if config.ignore_devices and name in config.ignore_devices:
                 continue
 
-            data_dict = self._db.get_all(self._db.STATE_DB, key)
+            data_dict = entries[key]
             presence = data_dict.get('presence', 'false')
             if presence.lower() != 'true':
                 self.set_object_not_ok('PSU', name, '{} is missing or not available'.format(name))
@@ -279,6 +313,51 @@ class HardwareChecker(HealthChecker):
 
     def reset(self):
         self._info = {}
+        self._hardware_data = {}
+
+    def _fetch_hardware_data(self, config):
+        """
+        Read the hardware tables needed by the check. All tables are read with one script call, if the script can't
+        be run the tables are read key by key. The fetch cost is kept in the checker statistic.
+        :param config: Health checker configuration
+        :return:
+        """
+        patterns = []
+        for device, pattern in (('asic', HardwareChecker.ASIC_TEMPERATURE_PATTERN),
+                                ('fan', HardwareChecker.FAN_PATTERN),
+                                ('psu', HardwareChecker.PSU_PATTERN)):
+            if not config.ignore_devices or device not in config.ignore_devices:
+                patterns.append(pattern)
+        if config.include_devices and 'liquid_cooling' in config.include_devices:
+            patterns.append(HardwareChecker.LIQUID_COOLING_PATTERN)
+
+        begin = time.time()
+        fetch_mode = 'script'
+        try:
+            self._hardware_data = self._fetch_by_script(patterns)
+        except Exception:
+            fetch_mode = 'keys'
+            self._hardware_data = self._fetch_by_keys(patterns)
+        self._stats = {
+            'fetch_mode': fetch_mode,
+            'fetch_latency': '{:.3f}'.format(time.time() - begin),
+            'fetch_keys': str(sum(len(entries) for entries in self._hardware_data.values()))
+        }
+
+    def _fetch_by_script(self, patterns):
+        command = swsscommon.RedisCommand()
+        command.format(['EVAL', HardwareChecker.FETCH_SCRIPT, '0'] + patterns)
+        reply = swsscommon.RedisReply(self._db.get_redis_client(self._db.STATE_DB), command)
+        data = json.loads(reply.to_string())
+        # cjson encodes an empty table as an empty object, so every pattern is a dictionary
+        return {pattern: data.get(pattern) or {} for pattern in patterns}
+
+    def _fetch_by_keys(self, patterns):
+        data = {}
+        for pattern in patterns:
+            keys = self._db.keys(self._db.STATE_DB, pattern) or []
+            data[pattern] = {key: self._db.get_all(self._db.STATE_DB, key) for key in keys}
+        return data
 
     @classmethod
     def _ignore_check(cls, ignore_set, category, object_name, check_point):
@@ -312,7 +391,8 @@ class HardwareChecker(HealthChecker):
         if not config.include_devices or 'liquid_cooling' not in config.include_devices:
             return
 
-        keys = self._db.keys(self._db.STATE_DB, HardwareChecker.LIQUID_COOLING_TABLE_NAME + '|*')
+        entries = self._hardware_data.get(HardwareChecker.LIQUID_COOLING_PATTERN, {})
+        keys = list(entries.keys())
         if not keys:
             self.set_object_not_ok('Liquid Cooling', 'Liquid Cooling', 'Failed to get liquid cooling information')
             return
@@ -328,7 +408,7 @@ class HardwareChecker(HealthChecker):
             if config.ignore_devices and name in config.ignore_devices:
                 continue
 
-            data_dict = self._db.get_all(self._db.STATE_DB, key)
+            data_dict = entries[key]
             leak_status = data_dict.get('leak_status', None)
             if leak_status is None or leak_status == 'N/A':
                 self.set_object_not_ok('Liquid Cooling', name, 'Failed to get leakage sensor status for {}'.format(name))
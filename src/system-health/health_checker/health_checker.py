@@ -37,6 +37,14 @@ class HealthChecker(object):
         """
         return self._info
 
+    def get_stats(self):
+        """
+        Get statistic of the last check, for example the cost of reading the data checked. The statistic is published
+        together with the checker latency.
+        :return: A dictionary {<field>: <value>}.
+        """
+        return {}
+
     def check(self, config):
         """
         Perform the check.
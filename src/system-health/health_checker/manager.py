@@ -1,3 +1,8 @@
+import concurrent.futures
+import queue
+import threading
+import time
+
 from .config import Config
 from .health_checker import HealthChecker
 from .service_checker import ServiceChecker
@@ -10,8 +15,30 @@ class HealthCheckerManager(object):
     """
     Manage all system health checkers and system health configuration.
     """
+
+    # Maximum number of checkers running at the same time
+    MAX_WORKERS = 4
+
+    # Result of a checker in checker statistic
+    CHECKER_RESULT_OK = 'ok'
+    CHECKER_RESULT_ERROR = 'error'
+    CHECKER_RESULT_TIMEOUT = 'timeout'
+
     def __init__(self):
         self._checkers = []
+        # User defined checkers by command, kept across check cycles
+        self._user_defined_checkers = {}
+        # Checkers run on daemon threads, so a hung checker doesn't block the process exit
+        self._queue = queue.Queue()
+        self._workers = []
+        # Checkers which are still running, a hung checker is not started again until it finishes
+        self._running = {}
+        self._start_time = {}
+        self._latency = {}
+        # Latency, result and checker statistic of each checker in the last check cycle: {<checker name>: {<field>: <value>}}
+        self.checker_stats = {}
+        # Health summary of the last check cycle
+        self.summary = HealthChecker.STATUS_OK
         self.config = Config()
         self.initialize()
 
@@ -23,54 +50,207 @@ class HealthCheckerManager(object):
         self._checkers.append(ServiceChecker())
         self._checkers.append(HardwareChecker())
 
+    def deinit(self):
+        """
+        Stop the checker threads. Checkers which are still running are not waited for.
+        :return:
+        """
+        while True:
+            try:
+                _, future = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            future.cancel()
+        for _ in self._workers:
+            self._queue.put(None)
+        self._workers = []
+
     def check(self, chassis):
         """
-        Load new configuration if any and perform the system health check for all existing checkers.
+        Load new configuration if any and perform the system health check for all existing checkers. Checkers run
+        concurrently, a checker which doesn't finish within the configured timeout is reported as not OK.
         :param chassis: A chassis object.
         :return: A dictionary that contains the status for all objects that was checked.
         """
-        HealthChecker.summary = HealthChecker.STATUS_OK
         stats = {}
+        self.checker_stats = {}
         self.config.load_config()
 
-        for checker in self._checkers:
-            self._do_check(checker, stats)
+        futures = []
+        for checker in self._checkers + self._get_user_defined_checkers():
+            if checker in self._running:
+                futures.append((checker, self._running[checker]))
+                continue
+            self._start_time.pop(checker, None)
+            self._latency.pop(checker, None)
+            future = self._submit(checker)
+            self._running[checker] = future
+            future.add_done_callback(lambda _, checker=checker: self._running.pop(checker, None))
+            futures.append((checker, future))
 
-        if self.config.user_defined_checkers:
-            for udc in self.config.user_defined_checkers:
-                checker = UserDefinedChecker(udc)
-                self._do_check(checker, stats)
+        self._wait_checkers(futures)
+        for checker, future in futures:
+            self._do_check(checker, future, stats)
 
+        # The summary is built from the results of this cycle only, a checker which ran out of its time
+        # in a previous cycle can't change it
+        self.summary = self._get_summary(stats)
+        HealthChecker.summary = self.summary
         self._set_system_led(chassis)
         return stats
 
-    def _do_check(self, checker, stats):
+    def _get_user_defined_checkers(self):
+        """
+        Get user defined checkers of the current configuration. A checker is created once for each command and
+        dropped when the command is removed from the configuration.
+        :return: A list of user defined checkers.
+        """
+        commands = self.config.user_defined_checkers or set()
+        for cmd in list(self._user_defined_checkers.keys()):
+            if cmd not in commands:
+                checker = self._user_defined_checkers.pop(cmd)
+                self._start_time.pop(checker, None)
+                self._latency.pop(checker, None)
+        for cmd in commands:
+            if cmd not in self._user_defined_checkers:
+                self._user_defined_checkers[cmd] = UserDefinedChecker(cmd)
+        return list(self._user_defined_checkers.values())
+
+    def _submit(self, checker):
         """
-        Do check for a particular checker and collect the check statistic.
+        Queue a checker to the checker threads.
         :param checker: A checker object.
-        :param stats: Check statistic.
+        :return: Future of the checker run.
+        """
+        future = concurrent.futures.Future()
+        self._queue.put((checker, future))
+        while len(self._workers) < HealthCheckerManager.MAX_WORKERS:
+            worker = threading.Thread(target=self._worker, name='health_checker_{}'.format(len(self._workers)),
+                                      daemon=True)
+            worker.start()
+            self._workers.append(worker)
+        return future
+
+    def _worker(self):
+        """
+        Checker thread. Run queued checkers until deinit.
         :return:
         """
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            checker, future = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = self._run_checker(checker)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+    def _run_checker(self, checker):
+        """
+        Run a checker in a worker thread.
+        :param checker: A checker object.
+        :return: A tuple of the checker category, a copy of the checker information and a copy of the checker statistic.
+        """
+        start_time = time.time()
+        self._start_time[checker] = start_time
         try:
             checker.check(self.config)
-            category = checker.get_category()
-            info = checker.get_info()
+            return checker.get_category(), dict(checker.get_info()), dict(checker.get_stats())
+        finally:
+            self._latency[checker] = time.time() - start_time
+
+    def _wait_checkers(self, futures):
+        """
+        Wait for the checkers until each of them either finishes or runs out of its time. A checker has
+        config.checker_timeout seconds since it started. A checker which is still waiting for a free worker
+        has config.checker_timeout seconds since now.
+        :param futures: A list of tuples (checker, future).
+        :return:
+        """
+        begin = time.time()
+        while True:
+            now = time.time()
+            deadline = None
+            pending = []
+            for checker, future in futures:
+                if future.done():
+                    continue
+                checker_deadline = self._start_time.get(checker, begin) + self.config.checker_timeout
+                if checker_deadline <= now:
+                    continue
+                pending.append(future)
+                deadline = checker_deadline if deadline is None else min(deadline, checker_deadline)
+            if not pending:
+                return
+            concurrent.futures.wait(pending, timeout=deadline - now, return_when=concurrent.futures.FIRST_COMPLETED)
+
+    def _do_check(self, checker, future, stats):
+        """
+        Collect the check statistic of a particular checker.
+        :param checker: A checker object.
+        :param future: Future of the checker run.
+        :param stats: Check statistic.
+        :return:
+        """
+        start_time = self._start_time.get(checker)
+        if not future.done():
+            latency = time.time() - start_time if start_time else 0
+            self._update_checker_stats(checker, latency, self.CHECKER_RESULT_TIMEOUT)
+            if start_time:
+                error_msg = 'Health check for {} did not finish in {} seconds'.format(checker, int(latency))
+            else:
+                error_msg = 'Health check for {} did not start, all checker workers are busy'.format(checker)
+            self._set_internal_error(checker, error_msg, stats)
+            return
+
+        try:
+            category, info, checker_stats = future.result()
+            self._update_checker_stats(checker, self._latency.get(checker, 0), self.CHECKER_RESULT_OK, checker_stats)
             if category not in stats:
                 stats[category] = info
             else:
                 stats[category].update(info)
         except Exception as e:
-            HealthChecker.summary = HealthChecker.STATUS_NOT_OK
+            self._update_checker_stats(checker, self._latency.get(checker, 0), self.CHECKER_RESULT_ERROR)
             error_msg = 'Failed to perform health check for {} due to exception - {}'.format(checker, repr(e))
-            entry = {str(checker): {
-                HealthChecker.INFO_FIELD_OBJECT_STATUS: HealthChecker.STATUS_NOT_OK,
-                HealthChecker.INFO_FIELD_OBJECT_MSG: error_msg,
-                HealthChecker.INFO_FIELD_OBJECT_TYPE: "Internal"
-            }}
-            if 'Internal' not in stats:
-                stats['Internal'] = entry
-            else:
-                stats['Internal'].update(entry)
+            self._set_internal_error(checker, error_msg, stats)
+
+    def _update_checker_stats(self, checker, latency, result, checker_stats=None):
+        self.checker_stats[str(checker)] = {
+            'latency': '{:.3f}'.format(latency),
+            'result': result
+        }
+        if checker_stats:
+            self.checker_stats[str(checker)].update(checker_stats)
+
+    @staticmethod
+    def _get_summary(stats):
+        """
+        Get the health summary of a check cycle.
+        :param stats: Check statistic.
+        :return: HealthChecker.STATUS_NOT_OK if any object is not OK, HealthChecker.STATUS_OK otherwise.
+        """
+        for info in stats.values():
+            for obj_data in info.values():
+                if obj_data.get(HealthChecker.INFO_FIELD_OBJECT_STATUS) == HealthChecker.STATUS_NOT_OK:
+                    return HealthChecker.STATUS_NOT_OK
+        return HealthChecker.STATUS_OK
+
+    def _set_internal_error(self, checker, error_msg, stats):
+        entry = {str(checker): {
+            HealthChecker.INFO_FIELD_OBJECT_STATUS: HealthChecker.STATUS_NOT_OK,
+            HealthChecker.INFO_FIELD_OBJECT_MSG: error_msg,
+            HealthChecker.INFO_FIELD_OBJECT_TYPE: "Internal"
+        }}
+        if 'Internal' not in stats:
+            stats['Internal'] = entry
+        else:
+            stats['Internal'].update(entry)
 
     def _set_system_led(self, chassis):
         try:
@@ -86,7 +266,7 @@ class HealthCheckerManager(object):
         Returns:
             str: LED color
         """
-        if HealthChecker.summary == HealthChecker.STATUS_OK:
+        if self.summary == HealthChecker.STATUS_OK:
             return self.config.get_led_color('normal')
         else:
             uptime = utils.get_uptime()
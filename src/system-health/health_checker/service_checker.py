@@ -1,12 +1,15 @@
+import concurrent.futures
 import docker
 import os
 import pickle
 import re
+import threading
 
 from swsscommon import swsscommon
 from sonic_py_common import multi_asic, device_info
 from sonic_py_common.logger import Logger
 from .health_checker import HealthChecker
+from .supervisor_client import SupervisorClient
 from . import utils
 
 SYSLOG_IDENTIFIER = 'service_checker'
@@ -51,6 +54,12 @@ class ServiceChecker(HealthChecker):
     # Monit 5.34.3+ (Debian 13) uses 'OK' for all service types
     EXPECTED_STATUS = 'OK'
 
+    # Maximum number of containers whose critical processes are checked at the same time
+    MAX_PROCESS_CHECK_WORKERS = 8
+
+    # Timeout in seconds to get the process status of a container
+    PROCESS_STATUS_TIMEOUT = 15
+
     def __init__(self):
         HealthChecker.__init__(self)
         self.container_critical_processes = {}
@@ -63,6 +72,19 @@ class ServiceChecker(HealthChecker):
 
         self.config_db = None
 
+        # Running containers are cached and only queried again after docker reports a container event
+        self.running_containers = None
+        self.containers_changed = threading.Event()
+        self.docker_events_thread = None
+        # Containers are checked concurrently, events publisher of swsscommon is shared by the source
+        # name and is not thread safe
+        self.events_lock = threading.Lock()
+
+        # Process status is read from supervisord of the containers over its unix socket
+        self.supervisor_client = SupervisorClient(timeout=ServiceChecker.PROCESS_STATUS_TIMEOUT)
+        # Merged directories of the running containers, refreshed together with the running containers
+        self.container_folders = {}
+
         self.load_critical_process_cache()
 
     def get_expected_running_containers(self, feature_table):
@@ -171,9 +193,45 @@ class ServiceChecker(HealthChecker):
                     self.fill_critical_process_by_container(ctr.name)
         except docker.errors.APIError as err:
             logger.log_error("Failed to retrieve the running container list. Error: '{}'".format(err))
+            # Don't trust the partial result, query again next time
+            self.containers_changed.set()
 
         return running_containers
 
+    def get_cached_running_containers(self):
+        """Get running containers from the cache. The cache is refreshed if docker reported a container event since
+           the last query, or if docker events are not being watched.
+
+        Returns:
+            running_containers: A set of running container names
+        """
+        watching = self.docker_events_thread is not None and self.docker_events_thread.is_alive()
+        if not watching:
+            self.start_docker_events_thread()
+        if self.running_containers is None or self.containers_changed.is_set() or not watching:
+            # Clear the flag before the query, so an event that comes during the query triggers another one
+            self.containers_changed.clear()
+            self.container_folders = {}
+            self.running_containers = self.get_current_running_containers()
+        return self.running_containers
+
+    def start_docker_events_thread(self):
+        self.docker_events_thread = threading.Thread(target=self.watch_docker_events, name='docker_events', daemon=True)
+        self.docker_events_thread.start()
+
+    def watch_docker_events(self):
+        """Mark the running container cache as changed on every container event. Runs in a daemon thread until the
+           docker event stream fails or ends.
+        """
+        try:
+            docker_client = docker.DockerClient(base_url='unix://var/run/docker.sock')
+            for _ in docker_client.events(decode=True, filters={'type': 'container'}):
+                self.containers_changed.set()
+        except Exception as e:
+            logger.log_warning("Stopped watching docker events. Error: '{}'".format(e))
+        finally:
+            self.containers_changed.set()
+
     def get_critical_process_list_from_file(self, container, critical_processes_file):
         """Read critical process name list from critical processes file
 
@@ -218,6 +276,7 @@ class ServiceChecker(HealthChecker):
         if not os.path.exists(container_folder):
             logger.log_warning('MergedDir {} of container {} not found in filesystem, was container stopped?'.format(container_folder, container))
             return
+        self.container_folders[container] = container_folder
 
         # Get critical_processes file path
         critical_processes_file = os.path.join(container_folder, ServiceChecker.CRITICAL_PROCESSES_PATH)
@@ -320,11 +379,14 @@ class ServiceChecker(HealthChecker):
             self.config_db.connect()
         feature_table = self.config_db.get_table("FEATURE")
         expected_running_containers, self.container_feature_dict = self.get_expected_running_containers(feature_table)
-        current_running_containers = self.get_current_running_containers()
+        current_running_containers = self.get_cached_running_containers()
 
         newly_disabled_containers = set(self.container_critical_processes.keys()).difference(expected_running_containers)
         for newly_disabled_container in newly_disabled_containers:
             self.container_critical_processes.pop(newly_disabled_container)
+        if newly_disabled_containers:
+            # Critical processes of a feature enabled again are read while listing the running containers
+            self.containers_changed.set()
 
         self.save_critical_process_cache()
 
@@ -337,8 +399,14 @@ class ServiceChecker(HealthChecker):
             self.set_object_not_ok('Service', 'system', 'no critical process found')
             return
 
-        for container, critical_process_list in self.container_critical_processes.items():
-            self.check_process_existence(container, critical_process_list, config, feature_table)
+        # supervisorctl is run in every container, check the containers concurrently so a slow container
+        # doesn't delay the others
+        max_workers = min(len(self.container_critical_processes), ServiceChecker.MAX_PROCESS_CHECK_WORKERS)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(self.check_process_existence, container, critical_process_list, config, feature_table)
+                       for container, critical_process_list in self.container_critical_processes.items()]
+            for future in futures:
+                future.result()
 
         for bad_container in self.bad_containers:
             self.set_object_not_ok('Service', bad_container, 'Syntax of critical_processes file is incorrect')
@@ -353,6 +421,41 @@ class ServiceChecker(HealthChecker):
         self.check_by_monit(config)
         self.check_services(config)
 
+    def get_process_status(self, container_name):
+        """Get the state of the processes supervised in a container. The state is read from supervisord through its
+           XML-RPC interface. If the supervisord socket is not reachable, fall back to run supervisorctl in the container.
+
+        Args:
+            container_name (str): Container name
+
+        Returns:
+            process_status: A dictionary {<process_name>: <state>}, None if the status is not available
+        """
+        container_folder = self.container_folders.get(container_name)
+        if container_folder is None:
+            container_folder = self._get_container_folder(container_name)
+            if container_folder:
+                self.container_folders[container_name] = container_folder
+
+        if container_folder:
+            try:
+                process_info = self.supervisor_client.get_all_process_info(container_name, container_folder)
+                return {name: info['statename'] for name, info in process_info.items()}
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.log_debug('Failed to get process status of {} from supervisord - {}'.format(container_name, repr(e)))
+            self.container_folders.pop(container_name, None)
+
+        # We are using supervisorctl status to check the critical process status. We cannot leverage psutil here because
+        # it not always possible to get process cmdline in supervisor.conf. E.g, cmdline of orchagent is "/usr/bin/orchagent",
+        # however, in supervisor.conf it is "/usr/bin/orchagent.sh"
+        cmd = 'docker exec {} bash -c "supervisorctl status"'.format(container_name)
+        process_status = utils.run_command(cmd, timeout=ServiceChecker.PROCESS_STATUS_TIMEOUT)
+        if process_status is None:
+            return None
+        return self._parse_supervisorctl_status(process_status.strip().splitlines())
+
     def _parse_supervisorctl_status(self, process_status):
         """Expected input:
             arp_update                       RUNNING   pid 67, uptime 1:03:56
@@ -375,11 +478,12 @@ class ServiceChecker(HealthChecker):
     def publish_events(self, container_name, critical_process_list):
         params = swsscommon.FieldValueMap()
         params["ctr_name"] = container_name
-        events_handle = swsscommon.events_init_publisher(EVENTS_PUBLISHER_SOURCE)
-        for process_name in critical_process_list:
-            params["process_name"] = process_name
-            swsscommon.event_publish(events_handle, EVENTS_PUBLISHER_TAG, params)
-        swsscommon.events_deinit_publisher(events_handle)
+        with self.events_lock:
+            events_handle = swsscommon.events_init_publisher(EVENTS_PUBLISHER_SOURCE)
+            for process_name in critical_process_list:
+                params["process_name"] = process_name
+                swsscommon.event_publish(events_handle, EVENTS_PUBLISHER_TAG, params)
+            swsscommon.events_deinit_publisher(events_handle)
 
     def check_process_existence(self, container_name, critical_process_list, config, feature_table):
         """Check whether the process in the specified container is running or not.
@@ -397,18 +501,13 @@ class ServiceChecker(HealthChecker):
             if ("state" in feature_table[feature_name]
                     and feature_table[feature_name]["state"] not in ["disabled", "always_disabled"]):
 
-                # We are using supervisorctl status to check the critical process status. We cannot leverage psutil here because
-                # it not always possible to get process cmdline in supervisor.conf. E.g, cmdline of orchagent is "/usr/bin/orchagent",
-                # however, in supervisor.conf it is "/usr/bin/orchagent.sh"
-                cmd = 'docker exec {} bash -c "supervisorctl status"'.format(container_name)
-                process_status = utils.run_command(cmd, timeout=15)
+                process_status = self.get_process_status(container_name)
                 if process_status is None:
                     for process_name in critical_process_list:
                         self.set_object_not_ok('Process', '{}:{}'.format(container_name, process_name), "Process '{}' in container '{}' is not running".format(process_name, container_name))
                     self.publish_events(container_name, critical_process_list)
                     return
 
-                process_status = self._parse_supervisorctl_status(process_status.strip().splitlines())
                 for process_name in critical_process_list:
                     if config and config.ignore_services and process_name in config.ignore_services:
                         continue
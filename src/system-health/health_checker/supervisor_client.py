@@ -0,0 +1,163 @@
+import errno
+import http.client
+import os
+import socket
+import threading
+import xmlrpc.client
+
+
+class UnixStreamHTTPConnection(http.client.HTTPConnection):
+    """
+    HTTP connection over a unix domain socket.
+    """
+    def __init__(self, socket_path, timeout):
+        http.client.HTTPConnection.__init__(self, 'localhost', timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except Exception:
+            sock.close()
+            raise
+        self.sock = sock
+
+
+class UnixStreamTransport(xmlrpc.client.Transport):
+    """
+    XML-RPC transport over a unix domain socket. The HTTP connection is kept open and reused by the following
+    requests.
+    """
+    def __init__(self, socket_path, timeout):
+        xmlrpc.client.Transport.__init__(self)
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def make_connection(self, host):
+        if self._connection and host == self._connection[0]:
+            return self._connection[1]
+        connection = UnixStreamHTTPConnection(self.socket_path, self.timeout)
+        self._connection = host, connection
+        return connection
+
+
+class SupervisorClient(object):
+    """
+    Collect process status from supervisord of the containers through the XML-RPC interface of supervisord. The unix
+    socket of supervisord is reached through the merged directory of the container, so no process is forked to get
+    the status. One XML-RPC proxy is kept per container and reused.
+    """
+
+    # Path of the supervisord socket relative to the container root directory
+    SOCKET_PATH = 'var/run/supervisor.sock'
+    # Maximum number of symbolic links followed when resolving a path inside a container
+    MAX_SYMLINKS = 40
+
+    def __init__(self, timeout=15):
+        """
+        Constructor.
+        :param timeout: Timeout in seconds of a request to supervisord.
+        """
+        self.timeout = timeout
+        self._proxies = {}
+        self._lock = threading.Lock()
+
+    def get_socket_path(self, container_folder):
+        return self.resolve_container_path(container_folder, SupervisorClient.SOCKET_PATH)
+
+    @staticmethod
+    def resolve_container_path(container_folder, path):
+        """
+        Resolve a path of a container inside its root directory. Symbolic links are followed as the container sees
+        them: an absolute link target is relative to the container root, e.g. /var/run -> /run, and '..' doesn't go
+        above the container root.
+        :param container_folder: Root directory of the container.
+        :param path: Path inside the container.
+        :return: Path of the file on the host.
+        :raise: OSError if too many symbolic links are followed.
+        """
+        parts = path.split('/')
+        resolved = []
+        links = 0
+        while parts:
+            part = parts.pop(0)
+            if part in ('', '.'):
+                continue
+            if part == '..':
+                if resolved:
+                    resolved.pop()
+                continue
+            host_path = os.path.join(container_folder, *(resolved + [part]))
+            if not os.path.islink(host_path):
+                resolved.append(part)
+                continue
+            links += 1
+            if links > SupervisorClient.MAX_SYMLINKS:
+                raise OSError(errno.ELOOP, os.strerror(errno.ELOOP), os.path.join(container_folder, path))
+            target = os.readlink(host_path)
+            if target.startswith('/'):
+                resolved = []
+            parts = target.split('/') + parts
+        return os.path.join(container_folder, *resolved)
+
+    def _get_proxy(self, container, socket_path):
+        with self._lock:
+            proxy = self._proxies.get(container)
+            if proxy is None or proxy[0] != socket_path:
+                if proxy is not None:
+                    proxy[1]('close')()
+                proxy = socket_path, xmlrpc.client.ServerProxy('http://localhost/RPC2',
+                                                               transport=UnixStreamTransport(socket_path, self.timeout))
+                self._proxies[container] = proxy
+            return proxy[1]
+
+    def get_all_process_info(self, container, container_folder):
+        """
+        Get information of all processes supervised in a container with a single getAllProcessInfo call.
+        :param container: Container name.
+        :param container_folder: Merged directory of the container.
+        :return: A dictionary {<process name>: <process information>}. Process information is the structure returned
+                 by supervisord, e.g. {'statename': 'RUNNING', 'pid': 67, 'start': ..., 'now': ..., 'exitstatus': 0}
+        :raise: OSError if the supervisord socket is not available, xmlrpc.client.Error if the request fails.
+        """
+        socket_path = self.get_socket_path(container_folder)
+        if not os.path.exists(socket_path):
+            raise FileNotFoundError('supervisord socket {} of container {} not found'.format(socket_path, container))
+
+        proxy = self._get_proxy(container, socket_path)
+        try:
+            process_info_list = proxy.supervisor.getAllProcessInfo()
+        except Exception:
+            self.close(container)
+            raise
+
+        process_info = {}
+        for info in process_info_list:
+            # Processes of a group are named <group>:<process> by supervisorctl, except when they have the same name
+            if info['group'] != info['name']:
+                process_info['{}:{}'.format(info['group'], info['name'])] = info
+            process_info[info['name']] = info
+        return process_info
+
+    def close(self, container):
+        """
+        Close the connection to supervisord of a container.
+        :param container: Container name.
+        :return:
+        """
+        with self._lock:
+            proxy = self._proxies.pop(container, None)
+        if proxy is not None:
+            proxy[1]('close')()
+
+    def close_all(self):
+        """
+        Close the connections to all containers.
+        :return:
+        """
+        with self._lock:
+            containers = list(self._proxies.keys())
+        for container in containers:
+            self.close(container)
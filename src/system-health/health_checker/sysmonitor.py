@@ -1,6 +1,7 @@
 #!/usr/bin/python3
 
 import os
+import re
 import sys
 import time
 import glob
@@ -22,6 +23,10 @@ spl_srv_list = ['database-chassis', 'gbsyncd']
 NON_BLOCKING_INACTIVE_REASONS = {"exec-condition"}
 SELECT_TIMEOUT_MSECS = 1000
 QUEUE_TIMEOUT = 15
+UNIT_SNAPSHOT_TIMEOUT = 5
+MAX_EVENTS_PER_CHECK = 100
+#Unit properties which trigger the unit check when changed
+UNIT_STATE_PROPERTIES = ('ActiveState', 'SubState', 'Result')
 TASK_STOP_TIMEOUT = 10
 logger = Logger(log_identifier=SYSLOG_IDENTIFIER)
 exclude_srv_list = ['ztp.service']
@@ -70,11 +75,23 @@ class MonitorStateDbTask(ProcessTaskBase):
 
 #Subprocess which subscribes to system dbus to listen for systemd events
 #and push service events to main process via queue
+#The task also keeps the main process unit state cache up to date: it sends a snapshot of all
+#services on start and after systemd reload, and the changes of unit properties
 class MonitorSystemBusTask(ProcessTaskBase):
 
+    SYSTEMD_BUS_NAME = 'org.freedesktop.systemd1'
+    UNIT_INTERFACE = 'org.freedesktop.systemd1.Unit'
+    SERVICE_INTERFACE = 'org.freedesktop.systemd1.Service'
+    UNIT_PATH_PREFIX = '/org/freedesktop/systemd1/unit/'
+    #Same properties as read by Sysmonitor.run_systemctl_show
+    UNIT_PROPERTIES = ('Id', 'LoadState', 'UnitFileState', 'ActiveState', 'SubState')
+    SERVICE_PROPERTIES = ('Type', 'Result')
+
     def __init__(self,myQ):
         ProcessTaskBase.__init__(self)
         self.task_queue = myQ
+        self.bus = None
+        self.unit_paths = {}
 
     def on_job_removed(self, id, job, unit, result):
         if result == "done" or result == "failed":
@@ -83,6 +100,67 @@ class MonitorSystemBusTask(ProcessTaskBase):
             self.task_notify(msg)
             return
 
+    #Gets the cached properties of a unit with one GetAll call per interface
+    def get_unit_properties(self, path):
+        import dbus
+        unit = dbus.Interface(self.bus.get_object(self.SYSTEMD_BUS_NAME, path), 'org.freedesktop.DBus.Properties')
+        unit_props = unit.GetAll(self.UNIT_INTERFACE)
+        service_props = unit.GetAll(self.SERVICE_INTERFACE)
+        props = {name: str(unit_props[name]) for name in self.UNIT_PROPERTIES if name in unit_props}
+        props.update({name: str(service_props[name]) for name in self.SERVICE_PROPERTIES if name in service_props})
+        return props
+
+    #Sends properties of all loaded services, listed with a single ListUnits call
+    def send_unit_snapshot(self, manager):
+        units = {}
+        self.unit_paths = {}
+        for unit in manager.ListUnits():
+            name, path = str(unit[0]), str(unit[6])
+            if not name.endswith('.service'):
+                continue
+            try:
+                units[name] = self.get_unit_properties(path)
+                self.unit_paths[path] = name
+            except Exception as e:
+                logger.log_warning("Failed to get properties of {}: {}".format(name, str(e)))
+        timestamp = "{}".format(datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"))
+        self.task_notify({"unit": "", "evt_src": "sysbus_snapshot", "time": timestamp, "units": units})
+
+    def on_reloading(self, active, manager):
+        #Unit file state may change after reload, refresh the whole snapshot
+        if not active:
+            self.send_unit_snapshot(manager)
+
+    @staticmethod
+    def unit_name_from_path(path):
+        #systemd escapes every character except [A-Za-z0-9] of the unit name as _xx
+        name = path[len(MonitorSystemBusTask.UNIT_PATH_PREFIX):]
+        return re.sub(r'_([0-9a-f]{2})', lambda m: chr(int(m.group(1), 16)), name)
+
+    def on_properties_changed(self, interface, changed, invalidated, path=None):
+        if interface not in (self.UNIT_INTERFACE, self.SERVICE_INTERFACE) or not path.startswith(self.UNIT_PATH_PREFIX):
+            return
+        unit = self.unit_paths.get(path) or self.unit_name_from_path(path)
+        if not unit.endswith('.service'):
+            return
+        names = self.UNIT_PROPERTIES + self.SERVICE_PROPERTIES
+        timestamp = "{}".format(datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"))
+        msg = {"unit": unit, "evt_src": "sysbus_props", "time": timestamp}
+        if path not in self.unit_paths or any(name in names for name in invalidated):
+            #A unit which is not in the snapshot, send all its properties
+            try:
+                msg["props"] = self.get_unit_properties(path)
+            except Exception as e:
+                logger.log_warning("Failed to get properties of {}: {}".format(unit, str(e)))
+                return
+            msg["full"] = True
+            self.unit_paths[path] = unit
+        else:
+            msg["props"] = {name: str(value) for name, value in changed.items() if name in names}
+            if not msg["props"]:
+                return
+        self.task_notify(msg)
+
     #Function for listening the systemd event on dbus
     def subscribe_sysbus(self):
         import dbus
@@ -91,10 +169,17 @@ class MonitorSystemBusTask(ProcessTaskBase):
 
         DBusGMainLoop(set_as_default=True)
         bus = dbus.SystemBus()
+        self.bus = bus
         systemd = bus.get_object('org.freedesktop.systemd1', '/org/freedesktop/systemd1')
         manager = dbus.Interface(systemd, 'org.freedesktop.systemd1.Manager')
         manager.Subscribe()
         manager.connect_to_signal('JobRemoved', self.on_job_removed)
+        manager.connect_to_signal('Reloading', lambda active: self.on_reloading(active, manager))
+        bus.add_signal_receiver(self.on_properties_changed, signal_name='PropertiesChanged',
+                                dbus_interface='org.freedesktop.DBus.Properties',
+                                bus_name=self.SYSTEMD_BUS_NAME, path_keyword='path')
+        #Signals are dispatched once the loop runs, so no change is lost while the snapshot is taken
+        self.send_unit_snapshot(manager)
 
         loop = GLib.MainLoop()
         loop.run()
@@ -128,6 +213,8 @@ class Sysmonitor(ProcessTaskBase):
         self.config = Config()
         self.mpmgr = multiprocessing.Manager()
         self.myQ = self.mpmgr.Queue()
+        #Unit properties received from systemd bus, so no systemctl is run for the cached units
+        self.unit_cache = {}
 
     #Sets system ready status to state db
     def post_system_status(self, state):
@@ -288,6 +375,52 @@ class Sysmonitor(ProcessTaskBase):
 
         return prop_dict
 
+    #Gets the service properties from the unit cache, or from systemctl if the unit is not cached
+    def get_unit_properties(self, service):
+        props = self.unit_cache.get(service)
+        if props is None:
+            return self.run_systemctl_show(service)
+        return props
+
+    #Updates the unit cache from a systemd bus message
+    #Returns True if the unit of the message should be checked. Property changes are checked only
+    #if the unit state changed, other properties are only cached
+    def update_unit_cache(self, msg):
+        event_src = msg["evt_src"]
+        if event_src == "sysbus_snapshot":
+            self.unit_cache = msg["units"]
+            return False
+        if event_src == "sysbus_props":
+            unit = msg["unit"]
+            cached = self.unit_cache.get(unit)
+            if msg.get("full"):
+                props = dict(msg["props"])
+            elif cached is not None:
+                props = dict(cached)
+                props.update(msg["props"])
+            else:
+                return False
+            self.unit_cache[unit] = props
+            if cached is None:
+                #A unit loaded after the snapshot, inactive units are loaded by systemd on queries too
+                return props.get('ActiveState') not in (None, 'inactive')
+            return any(cached.get(name) != props.get(name) for name in UNIT_STATE_PROPERTIES)
+        return True
+
+    #Handles messages received from the subtasks, each unit is checked once
+    def handle_events(self, msgs):
+        units = []
+        for msg in msgs:
+            event = msg["unit"]
+            event_src = msg["evt_src"]
+            event_time = msg["time"]
+            logger.log_debug("Main process- received event:{} from source:{} time:{}".format(event,event_src,event_time))
+            if self.update_unit_cache(msg) and event not in units:
+                units.append(event)
+        for event in units:
+            logger.log_info("check_unit_status for [ "+event+" ] ")
+            self.check_unit_status(event)
+
     #Sets the service status to state db
     def post_unit_status(self, srv_name, srv_status, app_status, fail_reason, update_time):
         if not self.state_db:
@@ -314,7 +447,7 @@ class Sysmonitor(ProcessTaskBase):
             service_up_status = "Down"
             service_name,last_name = event.rsplit('.', 1)
 
-            sysctl_show = self.run_systemctl_show(event)
+            sysctl_show = self.get_unit_properties(event)
 
             load_state = sysctl_show.get('LoadState')
             if load_state == "loaded":
@@ -485,21 +618,41 @@ class Sysmonitor(ProcessTaskBase):
             sys.exit(1)
 
 
+        from queue import Empty
+        # Wait for the unit snapshot from systemd bus, so the initial scan runs no systemctl.
+        # Other events received meanwhile are handled after the initial scan
+        pending = []
+        deadline = time.time() + UNIT_SNAPSHOT_TIMEOUT
+        while not pending or pending[-1] != "stop":
+            try:
+                msg = self.myQ.get(timeout=max(deadline - time.time(), 0))
+            except (Empty, EOFError):
+                break
+            if msg != "stop" and msg["evt_src"] == "sysbus_snapshot":
+                self.update_unit_cache(msg)
+                break
+            pending.append(msg)
+
         self.update_system_status()
 
-        from queue import Empty
         # Queue to receive the STATEDB and Systemd state change event
         while True:
             try:
-                msg = self.myQ.get(timeout=QUEUE_TIMEOUT)
+                msg = pending.pop(0) if pending else self.myQ.get(timeout=QUEUE_TIMEOUT)
                 if msg == "stop":
                     break
-                event = msg["unit"]
-                event_src = msg["evt_src"]
-                event_time = msg["time"]
-                logger.log_debug("Main process- received event:{} from source:{} time:{}".format(event,event_src,event_time))
-                logger.log_info("check_unit_status for [ "+event+" ] ")
-                self.check_unit_status(event)
+                # Coalesce the events which are already queued, a unit state change comes as several signals
+                msgs = [msg]
+                while len(msgs) < MAX_EVENTS_PER_CHECK:
+                    try:
+                        msg = pending.pop(0) if pending else self.myQ.get_nowait()
+                    except Empty:
+                        break
+                    if msg == "stop":
+                        pending.append(msg)
+                        break
+                    msgs.append(msg)
+                self.handle_events(msgs)
             except (Empty, EOFError):
                 pass
             except Exception as e:
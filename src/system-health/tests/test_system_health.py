@@ -12,6 +12,7 @@
 import copy
 import os
 import sys
+import pytest
 import docker
 import importlib.util
 import importlib.machinery
@@ -37,6 +38,7 @@ from health_checker.hardware_checker import HardwareChecker
 from health_checker.health_checker import HealthChecker
 from health_checker.manager import HealthCheckerManager
 from health_checker.service_checker import ServiceChecker
+from health_checker.supervisor_client import SupervisorClient
 from health_checker.user_defined_checker import UserDefinedChecker
 from health_checker.sysmonitor import Sysmonitor
 from health_checker.sysmonitor import MonitorStateDbTask
@@ -722,6 +724,35 @@ def test_hardware_checker():
     assert checker._info['liquid_cooling_6'][HealthChecker.INFO_FIELD_OBJECT_STATUS] == HealthChecker.STATUS_OK
 
 
+def test_hardware_checker_fetch_by_script():
+    import json
+    config = Config()
+    config.ignore_devices = {'psu'}
+    checker = HardwareChecker()
+    data = {
+        HardwareChecker.ASIC_TEMPERATURE_PATTERN: {
+            'TEMPERATURE_INFO|ASIC': {'temperature': '30', 'high_threshold': '20'}
+        },
+        HardwareChecker.FAN_PATTERN: {
+            'FAN_INFO|fan1': {'presence': 'True', 'status': 'True', 'speed': '60', 'speed_target': '60',
+                              'is_under_speed': 'False', 'is_over_speed': 'False'}
+        }
+    }
+    with patch('swsscommon.swsscommon.RedisCommand', create=True) as mock_command, \
+            patch('swsscommon.swsscommon.RedisReply', create=True) as mock_reply:
+        checker._db = MagicMock()
+        mock_reply.return_value.to_string.return_value = json.dumps(data)
+        checker.check(config)
+        args = mock_command.return_value.format.call_args[0][0]
+        assert args[:3] == ['EVAL', HardwareChecker.FETCH_SCRIPT, '0']
+        assert args[3:] == [HardwareChecker.ASIC_TEMPERATURE_PATTERN, HardwareChecker.FAN_PATTERN]
+
+    assert checker._info['ASIC'][HealthChecker.INFO_FIELD_OBJECT_STATUS] == HealthChecker.STATUS_NOT_OK
+    assert checker._info['fan1'][HealthChecker.INFO_FIELD_OBJECT_STATUS] == HealthChecker.STATUS_OK
+    assert checker.get_stats()['fetch_mode'] == 'script'
+    assert checker.get_stats()['fetch_keys'] == '2'
+
+
 def test_config():
     config = Config()
     config._config_file = os.path.join(test_path, Config.CONFIG_FILE)
@@ -826,6 +857,232 @@ def test_manager(mock_hw_info, mock_service_info, mock_udc_info):
     chassis.set_status_led.side_effect = RuntimeError()
     manager._set_system_led(chassis)
 
+@patch('health_checker.service_checker.ServiceChecker.check', MagicMock())
+@patch('health_checker.hardware_checker.HardwareChecker.check')
+@patch('health_checker.user_defined_checker.UserDefinedChecker.check', MagicMock())
+@patch('health_checker.user_defined_checker.UserDefinedChecker.get_category', MagicMock(return_value='UserDefine'))
+@patch('health_checker.service_checker.ServiceChecker.get_info', MagicMock(return_value={}))
+def test_manager_checker_timeout(mock_hw_check):
+    import threading
+    chassis = MagicMock()
+    manager = HealthCheckerManager()
+    manager.config.checker_timeout = 0.2
+    manager.config.load_config = MagicMock()
+    manager.config.user_defined_checkers = {'check a', 'check b'}
+
+    release = threading.Event()
+
+    def hung_check(config):
+        release.wait(5)
+        # A checker which ran out of its time must not change the summary of a later cycle
+        HealthChecker.summary = HealthChecker.STATUS_NOT_OK
+
+    mock_hw_check.side_effect = hung_check
+    stat = manager.check(chassis)
+    assert all(worker.daemon for worker in manager._workers)
+    assert 'did not finish' in stat['Internal']['HardwareChecker']['message']
+    assert manager.checker_stats['HardwareChecker']['result'] == HealthCheckerManager.CHECKER_RESULT_TIMEOUT
+    assert manager.checker_stats['ServiceChecker']['result'] == HealthCheckerManager.CHECKER_RESULT_OK
+    assert manager.checker_stats['UserDefinedChecker - check a']['result'] == HealthCheckerManager.CHECKER_RESULT_OK
+    assert HealthChecker.summary == HealthChecker.STATUS_NOT_OK
+    assert manager.summary == HealthChecker.STATUS_NOT_OK
+
+    # The hung checker is not started again while it is still running
+    stat = manager.check(chassis)
+    assert mock_hw_check.call_count == 1
+    assert manager.checker_stats['HardwareChecker']['result'] == HealthCheckerManager.CHECKER_RESULT_TIMEOUT
+
+    release.set()
+    manager._running[manager._checkers[1]].result()
+    mock_hw_check.side_effect = None
+    stat = manager.check(chassis)
+    assert 'Internal' not in stat
+    assert mock_hw_check.call_count == 2
+    assert manager.checker_stats['HardwareChecker']['result'] == HealthCheckerManager.CHECKER_RESULT_OK
+    assert manager.summary == HealthChecker.STATUS_OK
+    assert HealthChecker.summary == HealthChecker.STATUS_OK
+
+    # User defined checkers are kept across cycles and dropped when removed from the configuration
+    udc_a = manager._user_defined_checkers['check a']
+    manager.config.user_defined_checkers = {'check a'}
+    manager.check(chassis)
+    assert manager._user_defined_checkers == {'check a': udc_a}
+    assert 'UserDefinedChecker - check b' not in manager.checker_stats
+    workers = manager._workers
+    manager.deinit()
+    for worker in workers:
+        worker.join(1)
+        assert not worker.is_alive()
+
+
+def test_service_checker_publish_events_serialized():
+    import threading
+    checker = ServiceChecker()
+    active = []
+    overlapped = []
+
+    def publish(handle, tag, params):
+        active.append(handle)
+        overlapped.append(len(active) > 1)
+        threading.Event().wait(0.01)
+        active.remove(handle)
+
+    with patch('swsscommon.swsscommon.events_init_publisher', MagicMock()), \
+         patch('swsscommon.swsscommon.events_deinit_publisher', MagicMock()), \
+         patch('swsscommon.swsscommon.event_publish', MagicMock(side_effect=publish)):
+        threads = [threading.Thread(target=checker.publish_events, args=('ctr{}'.format(i), ['a', 'b']))
+                   for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert len(overlapped) == 8
+    assert not any(overlapped)
+
+
+@patch('docker.DockerClient')
+def test_service_checker_running_containers_cache(mock_docker_client):
+    import threading
+    mock_container = MagicMock()
+    mock_container.name = 'snmp'
+    mock_docker_client.return_value.containers.list = MagicMock(return_value=[mock_container])
+    events_started = threading.Event()
+    send_event = threading.Event()
+    stop_events = threading.Event()
+
+    def events(**kwargs):
+        events_started.set()
+        send_event.wait(5)
+        yield {'status': 'die', 'id': 'snmp'}
+        stop_events.wait(5)
+
+    mock_docker_client.return_value.events = events
+
+    checker = ServiceChecker()
+    checker.container_critical_processes['snmp'] = []
+    assert checker.get_cached_running_containers() == {'snmp'}
+    assert events_started.wait(5)
+    mock_docker_client.return_value.containers.list.return_value = []
+    assert checker.get_cached_running_containers() == {'snmp'}
+
+    send_event.set()
+    assert checker.containers_changed.wait(5)
+    assert checker.get_cached_running_containers() == set()
+    stop_events.set()
+    checker.docker_events_thread.join(5)
+
+
+def start_supervisor_server(socket_path, calls):
+    import socketserver
+    import threading
+    from xmlrpc.server import SimpleXMLRPCDispatcher, SimpleXMLRPCRequestHandler
+
+    class UnixXMLRPCRequestHandler(SimpleXMLRPCRequestHandler):
+        disable_nagle_algorithm = False
+        protocol_version = "HTTP/1.1"
+
+        def address_string(self):
+            return 'unix'
+
+    class UnixXMLRPCServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer, SimpleXMLRPCDispatcher):
+        daemon_threads = True
+
+        def __init__(self, path):
+            SimpleXMLRPCDispatcher.__init__(self, allow_none=True)
+            socketserver.UnixStreamServer.__init__(self, path, UnixXMLRPCRequestHandler)
+            self.logRequests = False
+
+    def get_all_process_info():
+        calls.append(threading.current_thread())
+        return [
+            {'name': 'snmpd', 'group': 'snmpd', 'statename': 'RUNNING', 'pid': 67, 'exitstatus': 0},
+            {'name': 'snmp-subagent', 'group': 'snmp-subagent', 'statename': 'EXITED', 'pid': 0, 'exitstatus': 1},
+        ]
+
+    server = UnixXMLRPCServer(socket_path)
+    server.register_function(get_all_process_info, 'supervisor.getAllProcessInfo')
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_service_checker_supervisor_client(tmp_path):
+    calls = []
+    socket_dir = tmp_path / 'var' / 'run'
+    socket_dir.mkdir(parents=True)
+    server = start_supervisor_server(str(socket_dir / 'supervisor.sock'), calls)
+    try:
+        checker = ServiceChecker()
+        checker.container_folders['snmp'] = str(tmp_path)
+        with patch('health_checker.utils.run_command') as mock_run:
+            assert checker.get_process_status('snmp') == {'snmpd': 'RUNNING', 'snmp-subagent': 'EXITED'}
+            assert checker.get_process_status('snmp') == {'snmpd': 'RUNNING', 'snmp-subagent': 'EXITED'}
+            mock_run.assert_not_called()
+        # The connection is reused, both requests are served by the same server thread
+        assert len(calls) == 2 and calls[0] is calls[1]
+
+        info = checker.supervisor_client.get_all_process_info('snmp', str(tmp_path))
+        assert info['snmp-subagent']['exitstatus'] == 1
+
+        # Fall back to supervisorctl if supervisord socket is not reachable
+        checker.supervisor_client.close_all()
+        checker.container_folders['snmp'] = str(tmp_path / 'not_exist')
+        with patch('health_checker.utils.run_command', return_value=mock_supervisorctl_output) as mock_run:
+            assert checker.get_process_status('snmp') == {'snmpd': 'RUNNING', 'snmp-subagent': 'EXITED'}
+            mock_run.assert_called_once()
+        assert 'snmp' not in checker.container_folders
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_service_checker_supervisor_client_symlink(tmp_path):
+    # /var/run is an absolute symbolic link to /run inside the container, it must not lead to /run of the host
+    calls = []
+    (tmp_path / 'run').mkdir()
+    (tmp_path / 'var').mkdir()
+    (tmp_path / 'var' / 'run').symlink_to('/run')
+    server = start_supervisor_server(str(tmp_path / 'run' / 'supervisor.sock'), calls)
+
+    try:
+        checker = ServiceChecker()
+        checker.container_folders['snmp'] = str(tmp_path)
+        assert checker.supervisor_client.get_socket_path(str(tmp_path)) == str(tmp_path / 'run' / 'supervisor.sock')
+        with patch('health_checker.utils.run_command') as mock_run:
+            assert checker.get_process_status('snmp') == {'snmpd': 'RUNNING', 'snmp-subagent': 'EXITED'}
+            mock_run.assert_not_called()
+        assert len(calls) == 1
+        checker.supervisor_client.close_all()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_supervisor_client_resolve_container_path(tmp_path):
+    (tmp_path / 'run').mkdir()
+    (tmp_path / 'var').mkdir()
+    (tmp_path / 'var' / 'run').symlink_to('../run')
+    (tmp_path / 'up').symlink_to('../../..')
+    (tmp_path / 'loop').symlink_to('/loop')
+    resolve = SupervisorClient.resolve_container_path
+    assert resolve(str(tmp_path), 'var/run/supervisor.sock') == str(tmp_path / 'run' / 'supervisor.sock')
+    # '..' stays inside the container root
+    assert resolve(str(tmp_path), 'up/run/supervisor.sock') == str(tmp_path / 'run' / 'supervisor.sock')
+    with pytest.raises(OSError):
+        resolve(str(tmp_path), 'loop/supervisor.sock')
+
+
+def test_healthd_publish_checker_stats():
+    daemon = HealthDaemon()
+    daemon._db = MagicMock()
+    daemon._publish_checker_stats({'ServiceChecker': {'latency': '0.100', 'result': 'ok'},
+                                   'UserDefinedChecker - a': {'latency': '0.010', 'result': 'ok'}})
+    daemon._db.hmset.assert_any_call(daemon._db.STATE_DB, 'SYSTEM_HEALTH_CHECKER_STATS|ServiceChecker',
+                                     {'latency': '0.100', 'result': 'ok'})
+    daemon._db.delete.assert_not_called()
+    daemon._publish_checker_stats({'ServiceChecker': {'latency': '0.200', 'result': 'timeout'}})
+    daemon._db.delete.assert_called_once_with(daemon._db.STATE_DB, 'SYSTEM_HEALTH_CHECKER_STATS|UserDefinedChecker - a')
+
+
 def test_utils():
     output = utils.run_command('some invalid command')
     assert not output
@@ -1053,6 +1310,101 @@ def test_get_all_system_status_not_ok():
     print("result:{}".format(result))
     assert result == 'DOWN'
 
+@patch('health_checker.sysmonitor.Sysmonitor.run_systemctl_show')
+@patch('health_checker.sysmonitor.Sysmonitor.get_app_ready_status', MagicMock(return_value=('Up','-','-')))
+@patch('health_checker.sysmonitor.Sysmonitor.post_unit_status', MagicMock())
+def test_get_unit_status_from_cache(mock_systemctl_show):
+    sysmon = Sysmonitor()
+    snapshot = {'mock_radv.service': dict(mock_srv_props['mock_radv.service'])}
+    assert not sysmon.update_unit_cache({'unit': '', 'evt_src': 'sysbus_snapshot', 'time': '-', 'units': snapshot})
+    assert sysmon.get_unit_status('mock_radv.service') == 'OK'
+    mock_systemctl_show.assert_not_called()
+
+    # Changed properties update the cache and trigger the unit check
+    msg = {'unit': 'mock_radv.service', 'evt_src': 'sysbus_props', 'time': '-',
+           'props': {'ActiveState': 'inactive', 'SubState': 'dead'}}
+    assert sysmon.update_unit_cache(msg)
+    assert sysmon.get_unit_status('mock_radv.service') == 'NOT OK'
+    mock_systemctl_show.assert_not_called()
+
+    # Partial properties of a unit which is not cached are ignored
+    msg = {'unit': 'mock_bgp.service', 'evt_src': 'sysbus_props', 'time': '-', 'props': {'ActiveState': 'active'}}
+    assert not sysmon.update_unit_cache(msg)
+    mock_systemctl_show.return_value = mock_srv_props['mock_bgp.service']
+    assert sysmon.get_unit_status('mock_bgp.service') == 'NOT OK'
+    mock_systemctl_show.assert_called_once_with('mock_bgp.service')
+
+    msg['props'] = dict(mock_srv_props['mock_radv.service'])
+    msg['full'] = True
+    assert sysmon.update_unit_cache(msg)
+    assert sysmon.get_unit_status('mock_bgp.service') == 'OK'
+    assert mock_systemctl_show.call_count == 1
+
+    # Properties which don't change the unit state are only cached
+    msg = {'unit': 'mock_bgp.service', 'evt_src': 'sysbus_props', 'time': '-',
+           'props': {'UnitFileState': 'disabled', 'ActiveState': 'active'}}
+    assert not sysmon.update_unit_cache(msg)
+    assert sysmon.unit_cache['mock_bgp.service']['UnitFileState'] == 'disabled'
+    msg = {'unit': 'mock_bgp.service', 'evt_src': 'sysbus_props', 'time': '-',
+           'props': {'Result': 'exit-code'}}
+    assert sysmon.update_unit_cache(msg)
+
+    # An inactive unit loaded after the snapshot is not checked
+    msg = {'unit': 'mock_new.service', 'evt_src': 'sysbus_props', 'time': '-', 'full': True,
+           'props': {'ActiveState': 'inactive', 'SubState': 'dead'}}
+    assert not sysmon.update_unit_cache(msg)
+
+
+@patch('health_checker.sysmonitor.Sysmonitor.check_unit_status')
+def test_handle_events_coalesced(mock_check_unit_status):
+    sysmon = Sysmonitor()
+    sysmon.unit_cache = {'mock_bgp.service': {'ActiveState': 'active', 'SubState': 'running', 'Result': 'success'}}
+    sysmon.handle_events([
+        {'unit': 'mock_bgp.service', 'evt_src': 'sysbus_props', 'time': '-', 'props': {'ActiveState': 'deactivating'}},
+        {'unit': 'mock_bgp.service', 'evt_src': 'sysbus_props', 'time': '-', 'props': {'SubState': 'stop-sigterm'}},
+        {'unit': 'mock_bgp.service', 'evt_src': 'sysbus_props', 'time': '-', 'props': {'UnitFileState': 'enabled'}},
+        {'unit': 'mock_radv.service', 'evt_src': 'sysbus', 'time': '-'},
+        {'unit': 'mock_bgp.service', 'evt_src': 'sysbus', 'time': '-'},
+    ])
+    assert mock_check_unit_status.call_args_list == [call('mock_bgp.service'), call('mock_radv.service')]
+    assert sysmon.unit_cache['mock_bgp.service']['SubState'] == 'stop-sigterm'
+
+
+def test_monitor_sysbus_properties_changed():
+    task = MonitorSystemBusTask(MagicMock())
+    task.task_stopping_event = MagicMock(is_set=MagicMock(return_value=False))
+    assert MonitorSystemBusTask.unit_name_from_path(
+        '/org/freedesktop/systemd1/unit/bgp_2eservice') == 'bgp.service'
+    assert MonitorSystemBusTask.unit_name_from_path(
+        '/org/freedesktop/systemd1/unit/system_2dhealth_2eservice') == 'system-health.service'
+
+    task.unit_paths = {'/org/freedesktop/systemd1/unit/bgp_2eservice': 'bgp.service'}
+    task.on_properties_changed(MonitorSystemBusTask.UNIT_INTERFACE,
+                               {'ActiveState': 'active', 'SubState': 'running', 'ActiveEnterTimestamp': 1}, [],
+                               path='/org/freedesktop/systemd1/unit/bgp_2eservice')
+    msg = task.task_queue.put.call_args[0][0]
+    assert msg['unit'] == 'bgp.service'
+    assert msg['props'] == {'ActiveState': 'active', 'SubState': 'running'}
+    assert 'full' not in msg
+
+    # Properties which are not cached are not sent
+    task.task_queue.put.reset_mock()
+    task.on_properties_changed(MonitorSystemBusTask.UNIT_INTERFACE, {'ActiveEnterTimestamp': 1}, [],
+                               path='/org/freedesktop/systemd1/unit/bgp_2eservice')
+    task.on_properties_changed(MonitorSystemBusTask.UNIT_INTERFACE, {'ActiveState': 'active'}, [],
+                               path='/org/freedesktop/systemd1/unit/some_2etimer')
+    task.task_queue.put.assert_not_called()
+
+    # All properties of a unit which is not known yet are sent
+    task.get_unit_properties = MagicMock(return_value=mock_srv_props['mock_radv.service'])
+    task.on_properties_changed(MonitorSystemBusTask.UNIT_INTERFACE, {'ActiveState': 'active'}, [],
+                               path='/org/freedesktop/systemd1/unit/radv_2eservice')
+    msg = task.task_queue.put.call_args[0][0]
+    assert msg['unit'] == 'radv.service'
+    assert msg['full']
+    assert task.unit_paths['/org/freedesktop/systemd1/unit/radv_2eservice'] == 'radv.service'
+
+
 def test_post_unit_status():
     sysmon = Sysmonitor()
     sysmon.post_unit_status("mock_bgp", 'OK', 'Down', 'mock reason', '-')